@@ -2,6 +2,19 @@ import pandas as pd
 import re
 import os
 from pathlib import Path
+from ivparser import IVCurveReader
+from ivwriter import write_summary, check_workbook
+from ivstore import open_store, ingest_file, summary_sheets, store_counts
+
+# Output settings
+OUTPUT_FORMAT = 'xlsx'   # 'xlsx', or 'csv' / 'parquet' (one file per sheet) for runs too large for Excel
+EXCEL_ENGINE  = 'fast'   # 'fast' = streaming writer (xlsxwriter or openpyxl write-only), 'pandas' = pd.ExcelWriter
+VERIFY_WORKBOOK = True  # check the written xlsx's sheet list and sizes (reads XML only, not cells)
+
+# Campaign store: every ingested sample is kept in STORE_NAME next to the output, files already
+# seen (same contents) are skipped, and the sheets cover the whole store. False = rebuild from the given CSVs only.
+USE_STORE  = True
+STORE_NAME = 'iv_store.sqlite'
 
 def get_csv_files():
     """
@@ -38,70 +51,13 @@ def parse_iv_curve_file(filename):
     """
     Parse an IV curve file and extract metadata for all samples
     """
-    samples = []
-    current_sample = None
-    
-    # Read the entire file and remove BOM
-    with open(filename, 'r', encoding='utf-8-sig') as file:
-        content = file.read()
-    
-    # Process line by line
-    lines = content.split('\n')
-    for line_num, line in enumerate(lines, 1):
-        line = line.strip()
-        
-        # Skip empty lines
-        if not line:
-            continue
-            
-        # Detect new sample
-        if ('"Sample No."' in line and line.split(',')[0].endswith('"Sample No."')) or \
-           (line.startswith('"Sample No."') or line.startswith('\ufeff"Sample No."') or \
-            line.startswith('ï»¿"Sample No."')):
-            
-            # Save the current sample if it exists
-            if current_sample is not None:
-                samples.append(current_sample)
-            
-            # Start new sample
-            current_sample = {
-                'metadata': {},
-                'data': [],
-                'source_file': os.path.basename(filename)
-            }
-            
-            # Clean the line from any BOM characters
-            clean_line = line.replace('\ufeff', '').replace('ï»¿', '').strip()
-            parts = clean_line.split(',')
-            if len(parts) >= 2:
-                sample_no = parts[1].strip('"')
-                current_sample['metadata']['Sample No.'] = sample_no
-            
-        elif current_sample is not None:
-            # Check if this is the data header line (skip data parsing since we only need metadata)
-            if line == '"V (V)","I (A)","P (W)"':
-                continue
-            
-            # Parse metadata lines (key-value pairs)
-            if line.startswith('"') and ',' in line:
-                parts = line.split(',', 1)
-                if len(parts) == 2:
-                    key = parts[0].strip('"')
-                    value = parts[1].strip('"')
-                    # Handle missing values
-                    if value == '-------':
-                        value = None
-                    current_sample['metadata'][key] = value
-
-    # Add the final sample
-    if current_sample is not None:
-        samples.append(current_sample)
-    
-    return samples
+    return list(IVCurveReader(filename))
 
 def process_multiple_csv_files(csv_files, output_filename="combined_iv_curve_summary.xlsx"):
     """
-    Process multiple CSV files and create a single combined Excel file
+    Process multiple CSV files and create a single combined Excel file.
+    Returns (output path, total samples, sheets, file count); with USE_STORE
+    the counts cover every file in the store, not just this run.
     """
     if not csv_files:
         raise ValueError("No CSV files provided")
@@ -110,6 +66,9 @@ def process_multiple_csv_files(csv_files, output_filename="combined_iv_curve_sum
     output_dir = os.path.dirname(csv_files[0])
     output_filepath = os.path.join(output_dir, output_filename)
     
+    if USE_STORE:
+        return _process_with_store(csv_files, output_dir, output_filepath)
+    
     # Prepare data for each sheet across all files
     vopen_data = []
     vmax_data = []
@@ -186,38 +145,49 @@ def process_multiple_csv_files(csv_files, output_filename="combined_iv_curve_sum
     df_imax = pd.DataFrame(imax_data)
     df_pmax = pd.DataFrame(pmax_data)
     
-    # Create Excel writer
-    with pd.ExcelWriter(output_filepath, engine='openpyxl') as writer:
-        # Write each DataFrame to a different sheet
-        if not df_vopen.empty:
-            df_vopen.to_excel(writer, sheet_name='Vopen', index=False)
-        if not df_vmax.empty:
-            df_vmax.to_excel(writer, sheet_name='Vmax', index=False)
-        if not df_imax.empty:
-            df_imax.to_excel(writer, sheet_name='Imax', index=False)
-        if not df_pmax.empty:
-            df_pmax.to_excel(writer, sheet_name='Pmax', index=False)
+    # Write each non-empty DataFrame to its own sheet
+    sheets = {name: df for name, df in [('Vopen', df_vopen), ('Vmax', df_vmax),
+                                        ('Imax', df_imax), ('Pmax', df_pmax)] if not df.empty}
+    output_filepath = write_summary(sheets, output_filepath, OUTPUT_FORMAT, EXCEL_ENGINE)[0]
+    
+    return output_filepath, total_samples, sheets, len(csv_files)
+
+def _process_with_store(csv_files, output_dir, output_filepath):
+    """
+    Ingest only the new CSV files into the campaign store, then write the four
+    sheets as queries over everything the store holds
+    """
+    conn = open_store(os.path.join(output_dir, STORE_NAME))
+    try:
+        for file_idx, csv_file in enumerate(csv_files, 1):
+            print(f"Processing file {file_idx}/{len(csv_files)}: {os.path.basename(csv_file)}")
+            
+            try:
+                added = ingest_file(conn, csv_file)
+            except Exception as e:
+                print(f"Error processing {csv_file}: {e}")
+                continue
+            
+            if added is None:
+                print("  Already in the store (same contents), skipped")
+            else:
+                print(f"  Added {added} new samples to the store")
         
-        # Auto-adjust column widths for all sheets
-        for sheet_name in writer.sheets:
-            worksheet = writer.sheets[sheet_name]
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+        sheets = summary_sheets(conn)
+        file_count, total_samples = store_counts(conn)
+    finally:
+        conn.close()
+    
+    print(f"Store now holds {total_samples} samples from {file_count} files")
+    output_filepath = write_summary(sheets, output_filepath, OUTPUT_FORMAT, EXCEL_ENGINE)[0]
     
-    return output_filepath, total_samples, len(df_vopen), len(df_vmax), len(df_imax), len(df_pmax)
+    return output_filepath, total_samples, sheets, file_count
 
-def verify_output_file(output_filepath, total_samples, vopen_count, vmax_count, imax_count, pmax_count):
+def verify_output_file(output_filepath, total_samples, sheets, file_count):
     """
-    Verify the output file and show summary
+    Verify the output file and show summary.
+    Statistics come from the in-memory sheets that were written; the file
+    itself only gets a cheap structural check (sheet list and sizes).
     """
     if not os.path.exists(output_filepath):
         print("Error: Output file was not created successfully.")
@@ -230,35 +200,34 @@ def verify_output_file(output_filepath, total_samples, vopen_count, vmax_count,
     print(f"File size: {os.path.getsize(output_filepath)} bytes")
     
     # Show summary
+    counts = {name: len(sheets.get(name, ())) for name in ('Vopen', 'Vmax', 'Imax', 'Pmax')}
     print(f"\nOverall Summary:")
-    print(f"  Total CSV files processed: {len(csv_files)}")
+    print(f"  Total CSV files processed: {file_count}")
     print(f"  Total samples found: {total_samples}")
-    print(f"  Vopen measurements: {vopen_count}")
-    print(f"  Vmax measurements: {vmax_count}")
-    print(f"  Imax measurements: {imax_count}")
-    print(f"  Pmax measurements: {pmax_count}")
+    print(f"  Vopen measurements: {counts['Vopen']}")
+    print(f"  Vmax measurements: {counts['Vmax']}")
+    print(f"  Imax measurements: {counts['Imax']}")
+    print(f"  Pmax measurements: {counts['Pmax']}")
+    
+    if VERIFY_WORKBOOK and output_filepath.endswith('.xlsx'):
+        problems = check_workbook(output_filepath, sheets)
+        print(f"\nWorkbook check: " + ("OK" if not problems else "; ".join(problems)))
     
     # Show sheet details
-    try:
-        excel_file = pd.ExcelFile(output_filepath)
-        print(f"\nSheets in output file: {excel_file.sheet_names}")
+    print(f"\nSheets in output file: {list(sheets)}")
+    
+    for sheet, df in sheets.items():
+        print(f"\n{sheet} sheet:")
+        print(f"  Rows: {len(df)}")
+        print(f"  Columns: {list(df.columns)}")
+        print(f"  Source files: {df['Source File'].nunique()} unique files")
         
-        for sheet in excel_file.sheet_names:
-            df = pd.read_excel(output_filepath, sheet_name=sheet)
-            print(f"\n{sheet} sheet:")
-            print(f"  Rows: {len(df)}")
-            print(f"  Columns: {list(df.columns)}")
-            print(f"  Source files: {df['Source File'].nunique()} unique files")
-            
-            if 'Sample No.' in df.columns:
-                print(f"  Unique samples: {df['Sample No.'].nunique()}")
-            
-            if len(df) > 0:
-                print(f"  First few entries:")
-                print(df.head(3).to_string(index=False))
-                
-    except Exception as e:
-        print(f"Error reading output file: {e}")
+        if 'Sample No.' in df.columns:
+            print(f"  Unique samples: {df['Sample No.'].nunique()}")
+        
+        if len(df) > 0:
+            print(f"  First few entries:")
+            print(df.head(3).to_string(index=False))
 
 # Main execution
 if __name__ == "__main__":
@@ -282,10 +251,10 @@ if __name__ == "__main__":
         
         # Process all CSV files and create combined Excel
         print(f"\nProcessing {len(csv_files)} CSV files...")
-        output_file, total_samples, vopen_count, vmax_count, imax_count, pmax_count = process_multiple_csv_files(csv_files)
+        output_file, total_samples, sheets, file_count = process_multiple_csv_files(csv_files)
         
-        # Verify and show summary
-        verify_output_file(output_file, total_samples, vopen_count, vmax_count, imax_count, pmax_count)
+        # Verify and show summary (counts cover the whole store when USE_STORE is on)
+        verify_output_file(output_file, total_samples, sheets, file_count)
         
         # Show the directory where the file was saved
         output_dir = os.path.dirname(output_file)
@@ -2,11 +2,21 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
+import argparse
+from datetime import timedelta
 from fnmatch import fnmatch
 from matplotlib.dates import DateFormatter
-import statsmodels.api as sm
+from scipy import stats
 from datetime import datetime
 from itertools import combinations
+import hashlib
+import io
+import shutil
+import tempfile
+import traceback
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 
 # ========== Configuration ==========
 LOWER_THRESHOLD  = 30     # °C — hard physical lower limit
@@ -20,6 +30,21 @@ MAX_SPREAD_2     = 4.0    # °C — max allowed difference when exactly 2 sensor
 NW_LAGS          = 1      # lags for Newey-West autocorrelation correction
 LAG_WINDOW       = 5      # number of timestamps to look ahead for stabilisation
 LAG_THRESHOLD    = 1.5    # °C — if reconnected sensor is this far from median, check for lag
+CACHE_ENABLED    = True   # reuse parsed Excel files between runs
+CACHE_MAX_BYTES  = 2 * 1024**3   # parsed-file cache size limit (least recently used evicted)
+CACHE_DIR_NAME   = ".xlsx_cache" # created next to the output folder
+CACHE_VERSION    = 1      # bump when read_logger_file changes, orphans old entries
+LOAD_WORKERS     = None   # processes used to load files (None = all cores, 1 = no pool)
+PLOT_WORKERS     = None   # processes used to render the ten plots (None = all cores, 1 = no pool)
+SENSITIVITY_POINTS = 50   # thresholds on the sensitivity curve (plot 7); raise for a smoother curve
+PLOT_MAX_POINTS  = None   # decimate time-series lines (plots 1, 2, 4, 5) to ~this many points (None = every sample)
+
+# Settings a worker process needs to reproduce this process' configuration
+CONFIG_NAMES = [
+    'LOWER_THRESHOLD', 'UPPER_THRESHOLD', 'CHANNELS', 'PANEL_1_CHANNELS', 'PANEL_2_CHANNELS',
+    'MAX_SPREAD_4', 'MIN_OUTSIDER_GAP', 'MAX_SPREAD_2', 'NW_LAGS', 'LAG_WINDOW', 'LAG_THRESHOLD',
+    'CACHE_ENABLED', 'CACHE_MAX_BYTES', 'SENSITIVITY_POINTS', 'PLOT_MAX_POINTS',
+]
 
 # Colour codes for the plot (what happened at each timestamp)
 COLORS = {
@@ -29,18 +54,192 @@ COLORS = {
     'dropped':     '#d62728',   # red    — timestamp dropped (shown as scatter markers)
 }
 
+# Integer status codes used by the vectorised cluster filter (index into STATUS_LABELS)
+STATUS_LABELS      = np.array(list(COLORS), dtype=object)
+STATUS_ALL_OK      = 0
+STATUS_ONE_DROPPED = 1
+STATUS_TWO_SENSORS = 2
+STATUS_DROPPED     = 3
+
 
 # ============================================================
 # LAG CORRECTION — detects reconnecting/stabilising sensors
 # ============================================================
 
-def apply_lag_correction(df, panel_channels, lag_window=LAG_WINDOW, lag_threshold=LAG_THRESHOLD):
+def apply_lag_correction(df, panel_channels, lag_window=LAG_WINDOW, lag_threshold=LAG_THRESHOLD,
+                         engine='vectorized'):
     """
     Detect sensors that have just reconnected (NaN -> valid) and are
     "lagging" (slowly converging to the other sensors).
     For these timestamps, set the channel to NaN so the average uses the other 3 sensors.
     Applied per panel, per file.
+
+    engine='vectorized' evaluates every reconnection of a channel at once on
+    NumPy arrays; engine='reference' is the original per-reconnection loop
+    (slow, kept for equivalence checks). Both give identical results.
+    """
+    if engine == 'reference':
+        return _apply_lag_correction_rows(df, panel_channels, lag_window, lag_threshold)
+    if engine != 'vectorized':
+        raise ValueError(f"Unknown engine '{engine}' (use 'vectorized' or 'reference')")
+
+    df_copy = df.copy()
+    cols = [f"Channel - {ch}" for ch in panel_channels if f"Channel - {ch}" in df_copy.columns]
+    if len(cols) < 2 or len(df_copy) == 0:
+        return df_copy  # a lone channel has no other channels to compare against
+
+    values    = df_copy[cols].to_numpy(dtype=float, copy=True)  # NaN'd as we go
+    original  = values.copy()
+    others    = _others_median(values)   # median of the other panel channels, per row
+    file_codes, _ = pd.factorize(df_copy['File'], sort=True)
+
+    for j in range(len(cols)):
+        events = _reconnection_points(original[:, j], file_codes)
+        null_mask = _lag_null_mask(values[:, j], others[:, j], events, lag_window, lag_threshold)
+        if not null_mask.any():
+            continue
+        values[null_mask, j] = np.nan
+        # Later channels see this channel's nullifications in their medians
+        changed = np.flatnonzero(null_mask)
+        others[changed] = _others_median(values[changed])
+
+    for j, col in enumerate(cols):
+        nullified = np.isnan(values[:, j]) & ~np.isnan(original[:, j])
+        if nullified.any():
+            df_copy.loc[nullified, col] = np.nan
+    return df_copy
+
+
+def _row_nanmedian(matrix):
+    """Row-wise median ignoring NaNs, matching pandas' Series.median() exactly."""
+    vals = np.sort(matrix, axis=1)
+    n    = np.count_nonzero(~np.isnan(vals), axis=1)
+    rows = np.arange(len(vals))
+    lo   = vals[rows, np.maximum((n - 1) // 2, 0)]
+    hi   = vals[rows, np.maximum(n // 2, 0)]
+    med  = np.where(n % 2 == 1, lo, (lo + hi) / 2)
+    med[n == 0] = np.nan
+    return med
+
+
+def _others_median(values):
+    """(N x k) matrix whose column j is the row median of every column except j."""
+    out = np.empty_like(values)
+    for j in range(values.shape[1]):
+        out[:, j] = _row_nanmedian(np.delete(values, j, axis=1))
+    return out
+
+
+def _reconnection_points(series, file_codes):
+    """
+    Row positions where a channel is valid now but was NaN in either of the
+    previous 2 rows of the same file (the first 2 rows of a file count too).
+    Returned in processing order: file by file, then by position.
+    """
+    in_file = np.flatnonzero(file_codes >= 0)
+    order   = in_file[np.argsort(file_codes[in_file], kind='stable')]
+    codes   = file_codes[order]
+    valid   = ~np.isnan(series[order])
+
+    prev1_valid = np.zeros(len(order), dtype=bool)
+    prev2_valid = np.zeros(len(order), dtype=bool)
+    prev1_valid[1:] = valid[:-1] & (codes[1:] == codes[:-1])
+    prev2_valid[2:] = valid[:-2] & (codes[2:] == codes[:-2])
+    return order[valid & ~(prev1_valid & prev2_valid)]
+
+
+def _lag_null_mask(col, med, events, lag_window, lag_threshold):
+    """
+    Boolean mask of rows to nullify for one channel.
+
+    `col` is the channel, `med` the median of the other channels, `events` the
+    reconnection positions in processing order. Each event reads rows
+    [p, p + lookahead] and may write rows [p, p + lookahead - 1]. Events whose
+    reads overlap an earlier event's writes are replayed one by one so the
+    result matches the sequential rules; all others are judged in one batch.
     """
+    n_rows = len(col)
+    null_mask = np.zeros(n_rows, dtype=bool)
+    if len(events) == 0 or lag_window < 1:
+        return null_mask
+
+    lookahead = np.minimum(lag_window, n_rows - events - 1)
+
+    # Pairs (earlier, later) in processing order where the earlier write window
+    # reaches into the later read window
+    rank = np.full(n_rows, -1)
+    rank[events] = np.arange(len(events))
+    ahead_at = np.full(n_rows, -1)
+    ahead_at[events] = lookahead
+    conflicted = np.zeros(len(events), dtype=bool)
+    for offset in range(-(lag_window - 1), lag_window + 1):
+        other = events + offset
+        inside = (offset != 0) & (other >= 0) & (other < n_rows)
+        other = np.where(inside, other, 0)
+        earlier = inside & (rank[other] >= 0) & (rank[other] < rank[events])
+        overlaps = earlier & (other + ahead_at[other] - 1 >= events) & (other <= events + lookahead)
+        conflicted |= overlaps
+        conflicted[rank[other[overlaps]]] = True
+
+    batch = events[~conflicted]
+    if len(batch):
+        null_mask |= _lag_null_mask_batch(col, med, batch, lookahead[~conflicted],
+                                          lag_window, lag_threshold)
+
+    # Sequential replay for overlapping events, on a copy that only sees their writes
+    work = col.copy()
+    for p, max_lookahead in zip(events[conflicted], lookahead[conflicted]):
+        if np.isnan(med[p]) or abs(work[p] - med[p]) < lag_threshold or max_lookahead < 1:
+            continue
+        diffs = []
+        for k in range(1, max_lookahead + 1):
+            if np.isnan(work[p + k]) or np.isnan(med[p + k]):
+                break
+            diffs.append(abs(work[p + k] - med[p + k]))
+        if not diffs:
+            continue
+        if diffs[-1] < diffs[0] - 0.3 or diffs[-1] < lag_threshold / 2:
+            for k in range(max_lookahead):
+                if k < 3 or (not np.isnan(med[p + k]) and abs(work[p + k] - med[p + k]) > lag_threshold):
+                    work[p + k] = np.nan
+                    null_mask[p + k] = True
+    return null_mask
+
+
+def _lag_null_mask_batch(col, med, events, lookahead, lag_window, lag_threshold):
+    """Evaluate independent reconnection events on (E x lag_window+1) strided windows."""
+    n_rows = len(col)
+    k      = np.arange(lag_window + 1)
+    pos    = np.minimum(events[:, None] + k, n_rows - 1)
+    in_win = k <= lookahead[:, None]
+    win_col, win_med = col[pos], med[pos]
+
+    with np.errstate(invalid='ignore'):
+        dist = np.abs(win_col - win_med)
+        start_ok = ~np.isnan(win_med[:, 0]) & ~(dist[:, 0] < lag_threshold) & (lookahead >= 1)
+
+        # Look-ahead diffs for k = 1..lookahead, stopping at the first NaN
+        step_ok = in_win[:, 1:] & ~np.isnan(win_col[:, 1:]) & ~np.isnan(win_med[:, 1:])
+        step_ok = np.logical_and.accumulate(step_ok, axis=1)
+        n_diffs = step_ok.sum(axis=1)
+        rows    = np.arange(len(events))
+        first   = dist[:, 1]
+        last    = dist[rows, np.maximum(n_diffs, 1)]
+        converging = (n_diffs > 0) & ((last < first - 0.3) | (last < lag_threshold / 2))
+
+        lagging = start_ok & converging
+        write = (k < lookahead[:, None]) & (
+            (k < 3) | (~np.isnan(win_med) & (dist > lag_threshold))
+        )
+    write &= lagging[:, None]
+
+    null_mask = np.zeros(n_rows, dtype=bool)
+    null_mask[pos[write]] = True
+    return null_mask
+
+
+def _apply_lag_correction_rows(df, panel_channels, lag_window, lag_threshold):
+    """Per-reconnection reference implementation of apply_lag_correction."""
     df_copy = df.copy()
     for ch in panel_channels:
         col = f"Channel - {ch}"
@@ -170,9 +369,101 @@ def assess_timestamp(readings):
     return None, 'dropped'
 
 
-def apply_within_panel_filter(df, channels, panel_label):
+def assess_timestamps_batch(values):
+    """
+    Vectorised version of assess_timestamp for a whole panel at once.
+
+    `values` is an (N x k) array of readings (NaN = sensor inactive), k <= 4.
+    Every row is sorted along axis 1 and judged with exactly the same rules
+    (MAX_SPREAD_2, MAX_SPREAD_4, MIN_OUTSIDER_GAP) as assess_timestamp.
+
+    Returns (sorted_vals, kept, codes):
+      sorted_vals — (N x 4) readings sorted per row, NaNs last
+      kept        — (N x 4) boolean mask of the readings that are averaged
+      codes       — (N,) index into STATUS_LABELS for each row
+    """
+    values = np.asarray(values, dtype=float)
+    n_rows = values.shape[0]
+    padded = np.full((n_rows, 4), np.nan)
+    padded[:, :values.shape[1]] = values
+    vals = np.sort(padded, axis=1)
+    n    = np.count_nonzero(~np.isnan(vals), axis=1)
+
+    kept  = np.zeros((n_rows, 4), dtype=bool)
+    codes = np.full(n_rows, STATUS_DROPPED, dtype=np.int8)
+    rows  = np.arange(n_rows)
+
+    # n == 2 → both kept if they agree
+    two_ok = (n == 2) & (vals[:, 1] - vals[:, 0] <= MAX_SPREAD_2)
+    codes[two_ok]    = STATUS_TWO_SENSORS
+    kept[two_ok, :2] = True
+
+    # n == 3 or 4 → all kept if the full spread is small enough
+    spread = vals[rows, np.maximum(n - 1, 0)] - vals[:, 0]
+    all_ok = (n >= 3) & (spread <= MAX_SPREAD_4)
+    codes[all_ok] = STATUS_ALL_OK
+    kept[all_ok]  = ~np.isnan(vals[all_ok])
+
+    # n == 4 with a wide spread → look for exactly one tight trio whose
+    # outsider sits more than MIN_OUTSIDER_GAP from every trio member
+    wide4 = (n == 4) & ~all_ok
+    n_valid_groups = np.zeros(n_rows, dtype=np.int8)
+    outsider_pos   = np.zeros(n_rows, dtype=np.int8)
+    for outsider in range(4):
+        trio = [i for i in range(4) if i != outsider]
+        ok = wide4 & (vals[:, trio[-1]] - vals[:, trio[0]] <= MAX_SPREAD_4)
+        for g in trio:
+            ok &= np.abs(vals[:, outsider] - vals[:, g]) > MIN_OUTSIDER_GAP
+        n_valid_groups += ok
+        outsider_pos[ok] = outsider
+    one_dropped = n_valid_groups == 1
+    codes[one_dropped] = STATUS_ONE_DROPPED
+    kept[one_dropped]  = True
+    kept[rows[one_dropped], outsider_pos[one_dropped]] = False
+
+    return vals, kept, codes
+
+
+def _kept_mean_std(vals, kept):
+    """
+    Row-wise mean and sample std (ddof=1) of the kept readings.
+    Sums run left to right over the sorted columns, the same order np.mean /
+    np.std use on the short lists in the per-row path, so results are bit-identical.
+    """
+    n_kept = np.count_nonzero(kept, axis=1)
+    total  = np.zeros(len(vals))
+    for j in range(vals.shape[1]):
+        total = total + np.where(kept[:, j], vals[:, j], 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / n_kept
+        sq_total = np.zeros(len(vals))
+        for j in range(vals.shape[1]):
+            dev = np.where(kept[:, j], vals[:, j] - mean, 0.0)
+            sq_total = sq_total + dev * dev
+        std = np.sqrt(sq_total / (n_kept - 1))
+    return mean, std, n_kept
+
+
+def _dropped_reason(valid_vals):
+    n_valid = len(valid_vals)
+    if n_valid == 0:
+        return "no valid readings after hard limits"
+    if n_valid == 1:
+        return "only 1 sensor active — cannot assess agreement"
+    if n_valid == 2:
+        return (f"2 sensors active, disagreement > {MAX_SPREAD_2} °C "
+                f"(values: {[round(v,2) for v in valid_vals]})")
+    return "no clear majority cluster (ambiguous or 2-2 split)"
+
+
+def apply_within_panel_filter(df, channels, panel_label, engine='vectorized'):
     """
     Apply the timestamp-level cluster filter to one panel's channels.
+
+    engine='vectorized' judges all timestamps at once with assess_timestamps_batch;
+    engine='reference' walks the rows one by one with assess_timestamp
+    (slow, kept for equivalence checks). Both give identical results.
+
     Returns:
       averages  — Series of per-timestamp averages (NaN where dropped)
       stdevs    — Series of per-timestamp standard deviations (NaN if dropped)
@@ -180,7 +471,49 @@ def apply_within_panel_filter(df, channels, panel_label):
       statuses  — Series of per-timestamp status strings
       summary   — dict with counts and dropped details
     """
-    cols     = [f"Channel - {ch}" for ch in channels if f"Channel - {ch}" in df.columns]
+    cols = [f"Channel - {ch}" for ch in channels if f"Channel - {ch}" in df.columns]
+    if engine == 'reference' or len(cols) > 4:
+        # assess_timestamp only ever looks at 4 sensors; more than that is
+        # left to the per-row rules rather than re-implemented here
+        return _apply_within_panel_filter_rows(df, cols, panel_label)
+    if engine != 'vectorized':
+        raise ValueError(f"Unknown engine '{engine}' (use 'vectorized' or 'reference')")
+
+    # Coerce to float first — Excel cells can come in as strings
+    raw = np.column_stack(
+        [pd.to_numeric(df[c], errors='coerce').to_numpy(dtype=float) for c in cols]
+    ) if cols else np.empty((len(df), 0))
+
+    vals, kept, codes = assess_timestamps_batch(raw)
+    mean, std, n_kept = _kept_mean_std(vals, kept)
+    dropped = codes == STATUS_DROPPED
+
+    averages = pd.Series(np.where(dropped, np.nan, mean), index=df.index)
+    stdevs   = pd.Series(np.where(dropped, np.nan, std),  index=df.index)
+    n_active = pd.Series(np.where(dropped, np.nan, n_kept.astype(float)), index=df.index)
+    statuses = pd.Series(STATUS_LABELS[codes], index=df.index)
+
+    code_counts = np.bincount(codes, minlength=len(STATUS_LABELS))
+    counts = {label: int(code_counts[i]) for i, label in enumerate(STATUS_LABELS)}
+
+    dropped_details = []
+    drop_pos  = np.flatnonzero(dropped)
+    drop_dt   = df['DateTime'].iloc[drop_pos].tolist()
+    for dt, row in zip(drop_dt, raw[drop_pos]):
+        valid_vals = row[~np.isnan(row)].tolist()
+        dropped_details.append((dt, _dropped_reason(valid_vals), valid_vals))
+
+    summary = {
+        "panel":            panel_label,
+        "n_rows":           len(df),
+        "counts":           counts,
+        "dropped_details":  dropped_details,
+    }
+    return averages, stdevs, n_active, statuses, summary
+
+
+def _apply_within_panel_filter_rows(df, cols, panel_label):
+    """Per-row reference implementation of apply_within_panel_filter."""
     averages = pd.Series(np.nan,  index=df.index)
     stdevs   = pd.Series(np.nan,  index=df.index)
     n_active = pd.Series(np.nan,  index=df.index)
@@ -201,7 +534,6 @@ def apply_within_panel_filter(df, channels, panel_label):
             except (TypeError, ValueError):
                 raw_vals.append(np.nan)
         valid_vals = [v for v in raw_vals if not np.isnan(v)]
-        n_valid    = len(valid_vals)
 
         result, status = assess_timestamp(valid_vals)
         statuses[idx]  = status
@@ -216,16 +548,7 @@ def apply_within_panel_filter(df, channels, panel_label):
             else:
                 stdevs[idx] = 0.0
         else:
-            if n_valid == 0:
-                reason = "no valid readings after hard limits"
-            elif n_valid == 1:
-                reason = "only 1 sensor active — cannot assess agreement"
-            elif n_valid == 2:
-                reason = (f"2 sensors active, disagreement > {MAX_SPREAD_2} °C "
-                          f"(values: {[round(v,2) for v in valid_vals]})")
-            else:
-                reason = "no clear majority cluster (ambiguous or 2-2 split)"
-            dropped_details.append((row['DateTime'], reason, valid_vals))
+            dropped_details.append((row['DateTime'], _dropped_reason(valid_vals), valid_vals))
 
     summary = {
         "panel":            panel_label,
@@ -240,27 +563,50 @@ def apply_within_panel_filter(df, channels, panel_label):
 # FILE PROCESSING
 # ============================================================
 
-def process_file(filepath):
-    """Load one Excel file, apply hard physical limits, return cleaned DataFrame."""
-    df = pd.read_excel(filepath)
+def read_logger_file(filepath):
+    """
+    Parse one logger workbook into a typed DataFrame: DateTime plus every
+    `Channel - N` column as numbers. No limits are applied here.
+    Returns (df, n_bad_timestamps), or None if the timestamps cannot be built.
+    """
+    raw = pd.read_excel(filepath)
     try:
-        df['DateTime'] = pd.to_datetime(
-            df['Date:'].astype(str) + ' ' + df['Time:'].astype(str),
+        date_time = pd.to_datetime(
+            raw['Date:'].astype(str) + ' ' + raw['Time:'].astype(str),
             dayfirst=True, errors='coerce'
         )
     except Exception as e:
         print(f"  Could not parse timestamps in {filepath}: {e}")
         return None
 
-    bad_dt = df['DateTime'].isna().sum()
+    df = pd.DataFrame({'DateTime': date_time})
+    for col in raw.columns:
+        if str(col).startswith('Channel - '):
+            df[col] = pd.to_numeric(raw[col], errors='coerce')
+
+    bad_dt = int(df['DateTime'].isna().sum())
     if bad_dt:
-        print(f"  Warning: {bad_dt} row(s) with unparseable timestamps dropped.")
         df = df.dropna(subset=['DateTime'])
+    return df, bad_dt
+
+
+def process_file(filepath, cache_dir=None):
+    """
+    Load one Excel file, apply hard physical limits, return cleaned DataFrame.
+    With a cache_dir the parsed workbook is reused from the cache when the file is unchanged.
+    """
+    parsed = (load_logger_file(filepath, cache_dir, CACHE_MAX_BYTES) if cache_dir
+              else read_logger_file(filepath))
+    if parsed is None:
+        return None
+    df, bad_dt = parsed
+
+    if bad_dt:
+        print(f"  Warning: {bad_dt} row(s) with unparseable timestamps dropped.")
 
     for ch in CHANNELS:
         col = f"Channel - {ch}"
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
             df[col] = df[col].where(
                 (df[col] >= LOWER_THRESHOLD) & (df[col] <= UPPER_THRESHOLD)
             )
@@ -270,6 +616,236 @@ def process_file(filepath):
     return df
 
 
+# ============================================================
+# PARSED-FILE CACHE — skips Excel parsing on reruns
+# ============================================================
+#
+# <cache_dir>/objects/<sha256>.npz  one array per column, named by the workbook's content hash
+# <cache_dir>/keys/<key>            "<sha256>\n<path>" where key = hash(path, mtime, size, version)
+#
+# A file whose path, mtime and size are unchanged is looked up without being read.
+# Otherwise its content is hashed, so a touched or copied workbook still reuses
+# the same object. Every file is written atomically, so parallel loaders can share
+# one cache. Objects are touched on use and the least recently used are evicted
+# once the cache grows past CACHE_MAX_BYTES.
+
+def default_cache_dir(output_dir):
+    """Cache folder next to the output folder, shared by every run that writes beside it."""
+    parent = os.path.dirname(os.path.abspath(output_dir))
+    return os.path.join(parent, CACHE_DIR_NAME)
+
+
+def _file_sha256(filepath):
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_key(filepath, st):
+    ident = f"{os.path.abspath(filepath)}|{st.st_mtime_ns}|{st.st_size}|v{CACHE_VERSION}"
+    return hashlib.sha1(ident.encode('utf-8')).hexdigest()
+
+
+def _atomic_write(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def load_logger_file(filepath, cache_dir, max_bytes=CACHE_MAX_BYTES):
+    """read_logger_file through the cache. Same return value."""
+    keys_dir    = os.path.join(cache_dir, 'keys')
+    objects_dir = os.path.join(cache_dir, 'objects')
+    os.makedirs(keys_dir, exist_ok=True)
+    os.makedirs(objects_dir, exist_ok=True)
+
+    key_path = os.path.join(keys_dir, _cache_key(filepath, os.stat(filepath)))
+    digest = None
+    if os.path.exists(key_path):
+        with open(key_path, encoding='utf-8') as f:
+            digest = f.readline().strip()
+    if not digest:
+        digest = f"{_file_sha256(filepath)}-v{CACHE_VERSION}"
+        _atomic_write(key_path, lambda tmp: _write_text(tmp, f"{digest}\n{os.path.abspath(filepath)}\n"))
+
+    obj_path = os.path.join(objects_dir, f"{digest}.npz")
+    if os.path.exists(obj_path):
+        try:
+            parsed = _read_cache_object(obj_path)
+            os.utime(obj_path)   # mark as recently used
+            return parsed
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable (e.g. evicted mid-read) — parse again below
+
+    parsed = read_logger_file(filepath)
+    if parsed is not None:
+        _atomic_write(obj_path, lambda tmp: _write_cache_object(tmp, *parsed))
+        evict_cache(cache_dir, max_bytes)
+    return parsed
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _write_cache_object(path, df, bad_dt):
+    arrays = {f"c{i}": df[col].to_numpy() for i, col in enumerate(df.columns)}
+    with open(path, 'wb') as f:
+        np.savez(f, _columns=np.array(df.columns, dtype=str), _bad_dt=np.int64(bad_dt), **arrays)
+
+
+def _read_cache_object(path):
+    with np.load(path, allow_pickle=False) as z:
+        columns = z['_columns'].tolist()
+        df = pd.DataFrame({col: z[f"c{i}"] for i, col in enumerate(columns)})
+        return df, int(z['_bad_dt'])
+
+
+def evict_cache(cache_dir, max_bytes=CACHE_MAX_BYTES):
+    """
+    Delete least recently used objects until the cache fits in max_bytes; drop
+    dangling keys. Temp files of writes in flight (other workers') are left alone.
+    """
+    objects_dir = os.path.join(cache_dir, 'objects')
+    keys_dir    = os.path.join(cache_dir, 'keys')
+    if not os.path.isdir(objects_dir):
+        return
+    entries = []
+    for name in os.listdir(objects_dir):
+        if not name.endswith('.npz'):
+            continue
+        path = os.path.join(objects_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+    live = {name[:-len('.npz')] for name in os.listdir(objects_dir) if name.endswith('.npz')}
+    for name in os.listdir(keys_dir):
+        if name.endswith('.tmp'):
+            continue
+        path = os.path.join(keys_dir, name)
+        try:
+            with open(path, encoding='utf-8') as f:
+                digest = f.readline().strip()
+            if digest not in live:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def invalidate_cache(cache_dir, filepath=None):
+    """
+    Forget cached parses. With a filepath, only that workbook's entries are removed
+    (whatever its mtime was when cached); without one the whole cache is cleared.
+    Returns the number of objects deleted.
+    """
+    keys_dir    = os.path.join(cache_dir, 'keys')
+    objects_dir = os.path.join(cache_dir, 'objects')
+    if not os.path.isdir(keys_dir):
+        return 0
+    target = os.path.abspath(filepath) if filepath else None
+    digests = set()
+    for name in os.listdir(keys_dir):
+        path = os.path.join(keys_dir, name)
+        try:
+            with open(path, encoding='utf-8') as f:
+                digest, cached_path = (f.read().splitlines() + ['', ''])[:2]
+        except OSError:
+            continue
+        if target is None or cached_path == target:
+            digests.add(digest)
+            os.remove(path)
+    if target is None and os.path.isdir(objects_dir):
+        digests.update(n[:-len('.npz')] for n in os.listdir(objects_dir) if n.endswith('.npz'))
+    removed = 0
+    for digest in digests:
+        try:
+            os.remove(os.path.join(objects_dir, f"{digest}.npz"))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+# ============================================================
+# PARALLEL LOADING
+# ============================================================
+
+def current_config():
+    """Snapshot of the module settings listed in CONFIG_NAMES."""
+    return {name: globals()[name] for name in CONFIG_NAMES}
+
+
+def apply_config(config):
+    """Install a settings snapshot (used as the initializer of worker processes)."""
+    globals().update(config)
+
+
+def _load_file_job(filepath, cache_dir):
+    """Run process_file in a worker, capturing what it prints so the parent can replay it in order."""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        df = process_file(filepath, cache_dir)
+    return df, out.getvalue()
+
+
+def load_files(file_paths, cache_dir=None, workers=None):
+    """
+    Parse, timestamp and hard-limit-filter every file, in a process pool when
+    workers != 1 (None = the LOAD_WORKERS setting at call time). Returns the
+    DataFrames in sorted file order, skipping files process_file rejected.
+    Messages are printed per file in that same order, exactly as a serial run
+    would print them.
+    """
+    file_paths = sorted(file_paths)
+    if workers is None:
+        workers = LOAD_WORKERS
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(file_paths)))
+
+    df_list = []
+    if workers == 1:
+        for fp in file_paths:
+            print(f"  Processing: {os.path.basename(fp)}")
+            df = process_file(fp, cache_dir)
+            if df is not None:
+                df_list.append(df)
+        return df_list
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=apply_config,
+                             initargs=(current_config(),)) as pool:
+        futures = [pool.submit(_load_file_job, fp, cache_dir) for fp in file_paths]
+        for fp, future in zip(file_paths, futures):
+            print(f"  Processing: {os.path.basename(fp)}")
+            df, messages = future.result()   # re-raises the worker's exception, as a serial run would
+            print(messages, end='')
+            if df is not None:
+                df_list.append(df)
+    return df_list
+
+
 # ============================================================
 # REPORT FORMATTING (updated to include new steps)
 # ============================================================
@@ -344,71 +920,199 @@ def format_report(date_input, p1_summary, p2_summary):
 # STATISTICS (now returns standard error)
 # ============================================================
 
+def _lag_products(e, codes, n_groups, max_lag):
+    """
+    sum_t e[t] * e[t-j] within each group for j = 0..max_lag, shape
+    (n_groups, max_lag + 1). Rows must be grouped together (codes sorted)
+    and in time order inside each group; codes=None means one group.
+    """
+    out = np.zeros((n_groups, max_lag + 1))
+    for j in range(min(max_lag + 1, len(e))):      # longer lags have no pairs
+        if codes is None:
+            out[0, j] = e[j:] @ e[:len(e) - j]
+            continue
+        same = codes[j:] == codes[:len(codes) - j]
+        out[:, j] = np.bincount(codes[j:][same], weights=(e[j:] * e[:len(e) - j])[same],
+                                minlength=n_groups)
+    return out
+
+
+def _hac_mean(values, codes, n_groups, lags):
+    """n, mean and HAC standard error (n_groups x len(lags)) of grouped, NaN-free values."""
+    if codes is None:
+        n = np.array([float(len(values))])
+        mean = np.array([values.mean()]) if len(values) else np.array([np.nan])
+        e = values - mean[0]
+    else:
+        n = np.bincount(codes, minlength=n_groups).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(codes, weights=values, minlength=n_groups) / n
+        e = values - mean[codes]
+    products = _lag_products(e, codes, n_groups, int(lags.max(initial=0)))
+
+    # Bartlett weights, one row per maxlags value (lag 0 counted once, the others twice)
+    j = np.arange(products.shape[1])
+    weights = np.where(j <= lags[:, None], 1 - j / (lags[:, None] + 1), 0.0)
+    weights[:, 1:] *= 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        se = np.sqrt((products @ weights.T) / n[:, None] ** 2)
+    se[n < 2] = np.nan
+    return n, mean, se
+
+
+def newey_west_mean(values, groups=None, maxlags=NW_LAGS):
+    """
+    Newey-West (HAC) test of mean == 0, per group and for several maxlags.
+
+    Closed form of sm.OLS(y, ones).fit(cov_type='HAC', cov_kwds={'maxlags': L})
+    with its defaults (Bartlett kernel, no small-sample correction, normal
+    p-values): the residuals are e = y - mean, and
+
+        var(mean) = (g0 + 2 * sum_{j<=L} (1 - j/(L+1)) * gj) / n^2
+
+    with gj = sum_t e[t] * e[t-j]. The lag products are computed once up to
+    the largest L, so each extra maxlags value costs only a weighted sum.
+
+    values:  1-D values in time order (NaN rows are left out)
+    groups:  optional labels of the same length (file, run, hour bin...);
+             lags never cross groups. None tests all values as one series.
+    maxlags: an int or a list of ints.
+
+    Returns a DataFrame with one row per (group, maxlags): Group, Maxlags,
+    N, Mean, SE, t, p, df_resid. Groups with fewer than 2 values get NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    lags = np.atleast_1d(np.asarray(maxlags, dtype=np.intp))
+    if groups is None:
+        labels = np.array([None], dtype=object)
+        values, codes = values[~np.isnan(values)], None
+    else:
+        codes, labels = pd.factorize(np.asarray(groups), sort=True)
+        ok = ~np.isnan(values) & (codes >= 0)
+        order = np.argsort(codes[ok], kind='stable')   # group rows together, time order kept
+        values, codes = values[ok][order], codes[ok][order]
+
+    n, mean, se = _hac_mean(values, codes, len(labels), lags)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = mean[:, None] / se
+    valid = n >= 2
+    return pd.DataFrame({
+        'Group':    np.repeat(labels, len(lags)),
+        'Maxlags':  np.tile(lags, len(labels)),
+        'N':        np.repeat(n, len(lags)).astype(int),
+        'Mean':     np.repeat(np.where(valid, mean, np.nan), len(lags)),
+        'SE':       se.ravel(),
+        't':        t.ravel(),
+        'p':        2 * stats.norm.sf(np.abs(t.ravel())),
+        'df_resid': np.repeat(np.where(valid, n - 1, np.nan), len(lags)),
+    })
+
+
 def newey_west_t_test(series, maxlags=NW_LAGS):
-    y = series.dropna()
+    """(t, p, df_resid, standard error of the mean) of the HAC test of mean == 0; see newey_west_mean."""
+    y = np.asarray(series, dtype=float)
+    y = y[~np.isnan(y)]
     if len(y) < 2:
         return np.nan, np.nan, np.nan, np.nan
-    X = np.ones((len(y), 1))
-    model = sm.OLS(np.asarray(y), X).fit(cov_type='HAC', cov_kwds={'maxlags': maxlags})
-    t_stat = float(model.tvalues[0])
-    p_val  = float(model.pvalues[0])
-    df_adj = float(model.df_resid)
-    se     = float(model.bse[0])  # standard error of the mean
-    return t_stat, p_val, df_adj, se
+    n, mean, se = _hac_mean(y, None, 1, np.array([maxlags], dtype=np.intp))
+    se = float(se[0, 0])
+    t_stat = float(mean[0]) / se if se > 0 else np.nan
+    p_val  = float(2 * stats.norm.sf(abs(t_stat)))
+    return t_stat, p_val, float(n[0] - 1), se
+
+
+def time_trend(time_sec, y):
+    """
+    Slope and p-value of the ordinary least-squares fit y = a + b * time_sec
+    (the same numbers as sm.OLS(y, sm.add_constant(time_sec)).fit()).
+    NaN when there are fewer than 3 points or time_sec is constant.
+    """
+    x = np.asarray(time_sec, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 3:
+        return np.nan, np.nan
+    dx = x - x.mean()
+    dy = y - y.mean()
+    sxx = dx @ dx
+    if sxx == 0:
+        return np.nan, np.nan
+    slope = (dx @ dy) / sxx
+    resid = dy - slope * dx
+    se = np.sqrt((resid @ resid) / (n - 2) / sxx)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = 2 * stats.t.sf(abs(slope / se), n - 2)
+    return float(slope), float(p)
 
 
 # ============================================================
 # RUN INTERVAL ANALYSIS (BOTH DIRECTIONS) + UPGRADED QUALITY FLAGS
 # ============================================================
 
+RUN_COLUMNS = ['File', 'run_number', 'start_time', 'end_time', 'length', 'direction',
+               'start_row', 'end_row']
+
+
 def get_run_intervals(df, group_col='File', diff_col='Diff', datetime_col='DateTime'):
     """
     For each file, find consecutive runs where:
         - Diff > 0  (Panel 2 colder)
         - Diff < 0  (Panel 1 colder)
     Returns two DataFrames: (df_positive, df_negative)
-    Each has columns: File, run_number, start_time, end_time, length, direction
+    Each has columns: File, run_number, start_time, end_time, length, direction,
+    start_row, end_row.
+    start_row / end_row are the positions of the first and last row of the run
+    within that file's rows sorted by time, so a run is group.iloc[start_row:end_row + 1].
+
+    Runs are found by run-length encoding the sign of Diff, so both directions
+    come out of a single pass over each file.
     """
-    records_pos = []
-    records_neg = []
+    parts_pos = []
+    parts_neg = []
     for file_name, group in df.groupby(group_col):
-        group = group.sort_values(datetime_col)
-        mask_pos = group[diff_col] > 0
-        mask_neg = group[diff_col] < 0
-
-        def extract_runs(mask, direction):
-            runs = []
-            i = 0
-            n = len(group)
-            run_num = 0
-            while i < n:
-                if mask.iloc[i]:
-                    start_idx = i
-                    while i < n and mask.iloc[i]:
-                        i += 1
-                    end_idx = i - 1
-                    run_num += 1
-                    start_time = group.iloc[start_idx][datetime_col]
-                    end_time   = group.iloc[end_idx][datetime_col]
-                    length = end_idx - start_idx + 1
-                    runs.append({
-                        'File': file_name,
-                        'run_number': run_num,
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'length': length,
-                        'direction': direction
-                    })
-                else:
-                    i += 1
-            return runs
+        group = group.sort_values(datetime_col, kind='stable')
+        sign  = np.sign(group[diff_col].to_numpy(dtype=float))
+        sign[np.isnan(sign)] = 0
+        times = group[datetime_col].to_numpy()
+
+        # A new segment starts wherever the sign changes
+        starts = np.flatnonzero(np.diff(sign, prepend=np.nan) != 0)
+        ends   = np.append(starts[1:], len(sign)) - 1
+        seg_sign = sign[starts]
+
+        for target, direction, parts in [(1, 'P2 colder', parts_pos), (-1, 'P1 colder', parts_neg)]:
+            keep = seg_sign == target
+            if not keep.any():
+                continue
+            s, e = starts[keep], ends[keep]
+            parts.append(pd.DataFrame({
+                'File':       file_name,
+                'run_number': np.arange(1, len(s) + 1),
+                'start_time': times[s],
+                'end_time':   times[e],
+                'length':     e - s + 1,
+                'direction':  direction,
+                'start_row':  s,
+                'end_row':    e,
+            }))
+
+    df_pos = pd.concat(parts_pos, ignore_index=True) if parts_pos else pd.DataFrame(columns=RUN_COLUMNS)
+    df_neg = pd.concat(parts_neg, ignore_index=True) if parts_neg else pd.DataFrame(columns=RUN_COLUMNS)
+    return df_pos, df_neg
 
-        records_pos.extend(extract_runs(mask_pos, 'P2 colder'))
-        records_neg.extend(extract_runs(mask_neg, 'P1 colder'))
 
-    df_pos = pd.DataFrame(records_pos) if records_pos else pd.DataFrame(columns=['File','run_number','start_time','end_time','length','direction'])
-    df_neg = pd.DataFrame(records_neg) if records_neg else pd.DataFrame(columns=['File','run_number','start_time','end_time','length','direction'])
-    return df_pos, df_neg
+def _segment_mean_std(values, seg, n_seg):
+    """
+    np.nanmean and np.nanstd(ddof=1) of values for every label 0..n_seg-1 in
+    seg at once; NaN where a segment has no values (or one, for the std).
+    """
+    valid = ~np.isnan(values)
+    n = np.bincount(seg, weights=valid, minlength=n_seg)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(seg, weights=np.where(valid, values, 0.0), minlength=n_seg) / n
+        dev  = np.where(valid, values - mean[seg], 0.0)
+        var  = np.bincount(seg, weights=dev * dev, minlength=n_seg) / (n - 1)
+    return mean, np.where(n > 1, np.sqrt(var), np.nan)
 
 
 def flag_noisy_runs(run_df, combined_df, panel1_cols, panel2_cols, threshold=1.5):
@@ -423,55 +1127,70 @@ def flag_noisy_runs(run_df, combined_df, panel1_cols, panel2_cols, threshold=1.5
     if run_df.empty:
         return run_df
     flagged = run_df.copy()
-    flagged['std_p1'] = np.nan
-    flagged['std_p2'] = np.nan
-    flagged['std_p1_volatility'] = np.nan
-    flagged['std_p2_volatility'] = np.nan
-    flagged['flag'] = ''
-
-    for idx, row in flagged.iterrows():
-        # Get rows belonging to this run
-        mask = (combined_df['File'] == row['File']) & (combined_df['DateTime'] >= row['start_time']) & (combined_df['DateTime'] <= row['end_time'])
-        run_data = combined_df[mask]
-        if run_data.empty:
-            continue
 
-        # Calculate the Standard Deviation for EVERY second in this run
-        p1_std_series = run_data[panel1_cols].std(axis=1)
-        p2_std_series = run_data[panel2_cols].std(axis=1)
-
-        # 1. Average spread (the old metric)
-        p1_mean_std = p1_std_series.mean()
-        p2_mean_std = p2_std_series.mean()
-
-        # 2. Volatility of the spread (the new metric!)
-        # If this is high, the sensors are "wobbling" (intermittent glitch).
-        # If this is low, the spread is "constant" (steady gradient or calibration).
-        p1_volatility = p1_std_series.std()
-        p2_volatility = p2_std_series.std()
-
-        flagged.loc[idx, 'std_p1'] = p1_mean_std
-        flagged.loc[idx, 'std_p2'] = p2_mean_std
-        flagged.loc[idx, 'std_p1_volatility'] = p1_volatility
-        flagged.loc[idx, 'std_p2_volatility'] = p2_volatility
-
-        # --- The new intelligent flagging logic ---
-        # Check if ANY panel exceeds the threshold
-        if p1_mean_std > threshold or p2_mean_std > threshold:
+    # Standard deviation of the sensors at EVERY second, computed once for the whole table
+    p1_std_all = combined_df[panel1_cols].std(axis=1).to_numpy(dtype=float)
+    p2_std_all = combined_df[panel2_cols].std(axis=1).to_numpy(dtype=float)
+
+    # Each file's rows in time order (the order start_row/end_row count in),
+    # laid end to end, so a run is the range offset + start_row .. offset + end_row
+    datetimes = combined_df['DateTime'].to_numpy()
+    offsets, order, pos = {}, [], 0
+    for file_name, rows in combined_df.groupby('File').indices.items():
+        offsets[file_name] = pos
+        order.append(rows[np.argsort(datetimes[rows], kind='stable')])
+        pos += len(rows)
+    order = np.concatenate(order) if order else np.empty(0, dtype=np.intp)
+
+    offset = flagged['File'].map(offsets).to_numpy(dtype=float)
+    start  = offset + flagged['start_row'].to_numpy(dtype=float)
+    end    = offset + flagged['end_row'].to_numpy(dtype=float)
+    runs   = np.flatnonzero(~np.isnan(offset) & (end >= start))
+
+    # One label per row of every run, so the stats are grouped reductions
+    lengths = (end[runs] - start[runs] + 1).astype(np.intp)
+    seg     = np.repeat(np.arange(len(runs)), lengths)
+    within  = np.arange(len(seg)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rows    = order[start[runs].astype(np.intp)[seg] + within]
+
+    # 1. Average spread (the old metric)
+    # 2. Volatility of the spread (the new metric!)
+    # If this is high, the sensors are "wobbling" (intermittent glitch).
+    # If this is low, the spread is "constant" (steady gradient or calibration).
+    run_stats = np.full((len(flagged), 4), np.nan)   # p1 mean, p2 mean, p1 volatility, p2 volatility
+    for k, std_all in enumerate((p1_std_all, p2_std_all)):
+        run_stats[runs, k], run_stats[runs, k + 2] = _segment_mean_std(std_all[rows], seg, len(runs))
+
+    p1_mean_std, p2_mean_std, p1_volatility, p2_volatility = run_stats.T
+    flagged['std_p1'] = p1_mean_std
+    flagged['std_p2'] = p2_mean_std
+    flagged['std_p1_volatility'] = p1_volatility
+    flagged['std_p2_volatility'] = p2_volatility
+
+    # --- The new intelligent flagging logic ---
+    # Check if ANY panel exceeds the threshold
+    high_spread = (p1_mean_std > threshold) | (p2_mean_std > threshold)
+    stable      = (p1_volatility < 0.3) & (p2_volatility < 0.3)
+    wobbling    = (p1_volatility > 0.5) | (p2_volatility > 0.5)
+    flagged['flag'] = np.select(
+        [
             # Case A: High average spread, BUT it's stable (volatility < 0.3)
-            if p1_volatility < 0.3 and p2_volatility < 0.3:
-                flagged.loc[idx, 'flag'] = 'stable_offset (likely real gradient)'
+            high_spread & stable,
             # Case B: High average spread AND it wobbles (volatility > 0.5)
-            elif p1_volatility > 0.5 or p2_volatility > 0.5:
-                flagged.loc[idx, 'flag'] = 'erratic_wobble (intermittent glitch)'
-            else:
-                flagged.loc[idx, 'flag'] = 'high_variance'
-
-        # BONUS: Catch the "intermittent spike" scenario (low average, but high volatility)
-        # This catches cases where the average spread is < threshold, but the spread jumps wildly.
-        elif p1_volatility > 0.5 or p2_volatility > 0.5:
-            flagged.loc[idx, 'flag'] = 'hidden_spikes (low avg but unstable)'
-
+            high_spread & wobbling,
+            high_spread,
+            # BONUS: Catch the "intermittent spike" scenario (low average, but high volatility)
+            # This catches cases where the average spread is < threshold, but the spread jumps wildly.
+            wobbling,
+        ],
+        [
+            'stable_offset (likely real gradient)',
+            'erratic_wobble (intermittent glitch)',
+            'high_variance',
+            'hidden_spikes (low avg but unstable)',
+        ],
+        default='',
+    )
     return flagged
 
 
@@ -485,6 +1204,57 @@ def _time_axis(ax):
     ax.grid(True, alpha=0.3)
 
 
+def decimate_minmax(x, y, max_points):
+    """
+    Indices (sorted) of a min/max decimation of the time series (x, y).
+
+    The x range is cut into max_points // 2 equal buckets (a pixel column
+    each, at the usual figure widths) and every bucket keeps the rows of its
+    lowest and highest y, so spikes and the envelope of the line survive.
+    The first and last rows are always kept, and a bucket holding NaN also
+    keeps its first NaN row so gaps in the line stay gaps. Series of at most
+    max_points rows are returned whole.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if not max_points or n <= max_points:
+        return np.arange(n)
+    xv = np.asarray(x)
+    if xv.dtype.kind == 'M':
+        xv = xv.astype('datetime64[ns]').astype(np.int64)
+    xv = xv.astype(float)
+
+    n_buckets = max(1, max_points // 2)
+    lo, hi = np.nanmin(xv), np.nanmax(xv)
+    if hi > lo:
+        bucket = np.minimum(((xv - lo) / (hi - lo) * n_buckets).astype(np.intp), n_buckets - 1)
+    else:
+        bucket = np.zeros(n, dtype=np.intp)
+
+    isnan = np.isnan(y)
+    keep = [np.array([0, n - 1])]
+    for extreme in (np.where(isnan, np.inf, y), np.where(isnan, np.inf, -y)):
+        order = np.lexsort((extreme, bucket))          # by bucket, then lowest first
+        _, first = np.unique(bucket[order], return_index=True)
+        keep.append(order[first])
+    nan_rows = np.flatnonzero(isnan)
+    _, first = np.unique(bucket[nan_rows], return_index=True)
+    keep.append(nan_rows[first])
+    return np.unique(np.concatenate(keep))
+
+
+def thin_line(x, y, max_points=None):
+    """
+    (x, y) Series reduced with decimate_minmax to about max_points points
+    (default PLOT_MAX_POINTS); returned unchanged when that is None.
+    """
+    max_points = PLOT_MAX_POINTS if max_points is None else max_points
+    if not max_points or len(y) <= max_points:
+        return x, y
+    idx = decimate_minmax(x, y, max_points)
+    return x.iloc[idx], y.iloc[idx]
+
+
 def plot_panel_avg_with_status(ax, df, avg_col, status_col, panel_label):
     for status, color in COLORS.items():
         mask = df[status_col] == status
@@ -503,9 +1273,10 @@ def plot_panel_avg_with_status(ax, df, avg_col, status_col, panel_label):
                 'one_dropped': f'One sensor dropped ({mask.sum()})',
                 'two_sensors': f'2 sensors, agreed ({mask.sum()})',
             }
-            ax.scatter(sub['DateTime'], sub[avg_col],
+            x, y = thin_line(sub['DateTime'], sub[avg_col])
+            ax.scatter(x, y,
                        color=color, s=12, zorder=3, label=label_map[status])
-            ax.plot(sub['DateTime'], sub[avg_col],
+            ax.plot(x, y,
                     color=color, linewidth=0.8, alpha=0.5)
     ax.set_title(panel_label, fontsize=11)
     ax.set_ylabel('Temperature (°C)')
@@ -514,293 +1285,183 @@ def plot_panel_avg_with_status(ax, df, avg_col, status_col, panel_label):
 
 
 # ============================================================
-# MAIN
+# THRESHOLD SWEEPS
 # ============================================================
 
-def main():
-    while True:
-        date_input = input("Enter date (dd-mm-yyyy): ").strip()
-        try:
-            datetime.strptime(date_input, '%d-%m-%Y')
-            break
-        except ValueError:
-            print("  Invalid format. Use dd-mm-yyyy")
-
-    FILE_PATTERN = f"{date_input} *.xlsx"
+def threshold_sweep(spread, values, thresholds):
+    """
+    Mean of `values` and number of rows kept when only rows with
+    spread <= threshold are kept, for every threshold at once.
+
+    The rows are sorted by spread once; each threshold is then a prefix of
+    that order, found with searchsorted and summed from running totals, so
+    the cost is O(N log N + T) rather than a filter per threshold. NaN values
+    are left out of the mean but counted as kept, like DataFrame filtering.
+    Works for any spread metric (Max_Spread, one panel's Std, ...) and for
+    any subset of rows, e.g. one file at a time via groupby.
+
+    Returns a DataFrame with columns Threshold, Mean (NaN when nothing is
+    kept) and Count.
+    """
+    spread = np.asarray(spread, dtype=float)
+    values = np.asarray(values, dtype=float)
+    thresholds = np.asarray(thresholds, dtype=float)
+
+    order = np.argsort(spread, kind='stable')
+    sorted_spread = spread[order]
+    sorted_values = values[order]
+    has_value = ~np.isnan(sorted_values)
+    value_sum = np.concatenate([[0.0], np.cumsum(np.where(has_value, sorted_values, 0.0))])
+    value_n   = np.concatenate([[0], np.cumsum(has_value)])
+
+    # NaN spreads sort last and never pass a threshold, as with <= filtering
+    kept = np.searchsorted(sorted_spread, thresholds, side='right')
+    kept = np.minimum(kept, np.count_nonzero(~np.isnan(sorted_spread)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(value_n[kept] > 0, value_sum[kept] / value_n[kept], np.nan)
+    return pd.DataFrame({'Threshold': thresholds, 'Mean': mean, 'Count': kept})
+
+
+def half_hour_codes(hour):
+    """
+    Integer half-hour bin of each fractional hour: round(hour * 2), so bin k
+    is k / 2 hours (0 .. 48). Ties round to even, like Python's round().
+    """
+    return np.rint(np.asarray(hour, dtype=float) * 2).astype(np.int64)
 
-    while True:
-        INPUT_DIR = input("Enter input folder path: ").strip()
-        if os.path.isdir(INPUT_DIR):
-            break
-        print("  Invalid directory")
 
-    while True:
-        OUTPUT_DIR = input("Enter output folder path: ").strip()
-        if OUTPUT_DIR:
-            break
-        print("  Cannot be empty")
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+def coverage_sweep(bin_codes, spread, thresholds):
+    """
+    Number of distinct bins that still hold at least one row with
+    spread <= threshold, for every threshold.
 
-    # ----- Load files -----
-    file_paths = [
-        os.path.join(INPUT_DIR, f)
-        for f in os.listdir(INPUT_DIR)
-        if fnmatch(f.lower(), FILE_PATTERN.lower())
-    ]
-    if not file_paths:
-        print(f"No files matching '{FILE_PATTERN}' in {INPUT_DIR}")
-        return
-    print(f"\nFound {len(file_paths)} file(s). Processing...")
+    A bin stays alive exactly while the threshold is at or above the lowest
+    spread inside it, so the per-bin minimum is taken once and the curve is
+    a searchsorted over those (at most 49) minima. Rows with NaN spread never
+    count.
+    """
+    codes = np.asarray(bin_codes)
+    spread = np.asarray(spread, dtype=float)
+    ok = ~np.isnan(spread)
+    if not ok.any():
+        return np.zeros(len(np.atleast_1d(thresholds)), dtype=np.intp)
+    bin_min = pd.Series(spread[ok]).groupby(codes[ok]).min().to_numpy()
+    return np.searchsorted(np.sort(bin_min), np.asarray(thresholds, dtype=float), side='right')
 
-    df_list = []
-    for fp in sorted(file_paths):
-        print(f"  Processing: {os.path.basename(fp)}")
-        df = process_file(fp)
-        if df is not None:
-            df_list.append(df)
-    if not df_list:
-        print("No valid data after processing.")
-        return
 
-    combined_df = pd.concat(df_list).sort_values('DateTime').reset_index(drop=True)
-    print(f"\nCombined dataset: {len(combined_df)} rows after hard-limit filtering.")
+# ============================================================
+# SHARED PLOT FEATURES
+# ============================================================
 
-    # ----- Step 2: Lag correction -----
-    print("Step 2: Applying lag correction (detecting reconnecting/stabilising sensors)...")
-    combined_df = apply_lag_correction(combined_df, PANEL_1_CHANNELS)
-    combined_df = apply_lag_correction(combined_df, PANEL_2_CHANNELS)
+class DerivedFeatures:
+    """
+    The per-row values plots 5-10 derive from combined_df, computed once.
+
+    Rows are those with Diff and both panel Stds present (the "clean" rows
+    every one of those plots starts from). features['Max_Spread'] etc. return
+    a read-only Series over those rows; each array is built on first use and
+    kept, so the ten plots share one copy instead of each filtering and
+    copying the frame again.
+
+      DateTime, Diff, Panel_1_Std, Panel_2_Std - the clean rows
+      Max_Spread   - larger of the two panel Stds
+      Hour         - fractional hour of day (10.5 for 10:30)
+      Hour_Of_Day  - integer hour of day
+      Half_Hour    - half_hour_codes(Hour)
+      Diff_smooth, P1_std_smooth, P2_std_smooth - centred rolling means
+    """
 
-    # ----- Step 3: within-panel cluster filter (now with uncertainty) -----
-    print("Step 3: within-panel cluster filter ...")
-    p1_avg, p1_std, p1_n, p1_status, p1_summary = apply_within_panel_filter(
-        combined_df, PANEL_1_CHANNELS, "Panel 1")
-    p2_avg, p2_std, p2_n, p2_status, p2_summary = apply_within_panel_filter(
-        combined_df, PANEL_2_CHANNELS, "Panel 2")
+    SMOOTH_WINDOW = 60    # points (~1 minute at 1 reading/sec)
+    SMOOTH_MIN    = 10    # min_periods of the rolling means
+    SOURCE        = ['DateTime', 'Diff', 'Panel_1_Std', 'Panel_2_Std']
+    NAMES         = SOURCE + ['Max_Spread', 'Hour', 'Hour_Of_Day', 'Half_Hour',
+                              'Diff_smooth', 'P1_std_smooth', 'P2_std_smooth']
+
+    def __init__(self, df, arrays=None):
+        self.df = df
+        self._arrays = dict(arrays or {})
+
+    def _build(self, name):
+        if name == 'mask':
+            return self.df[['Diff', 'Panel_1_Std', 'Panel_2_Std']].notna().all(axis=1).to_numpy()
+        if name == 'DateTime':
+            dt = self.df['DateTime']
+            if not pd.api.types.is_datetime64_any_dtype(dt):
+                dt = pd.to_datetime(dt)
+            return dt.to_numpy()[self.array('mask')]
+        if name in self.SOURCE:
+            return self.df[name].to_numpy()[self.array('mask')]
+        if name == 'Max_Spread':
+            return np.maximum(self.array('Panel_1_Std'), self.array('Panel_2_Std'))
+        if name == 'Hour':
+            dt = pd.DatetimeIndex(self.array('DateTime'))
+            return dt.hour + dt.minute / 60.0
+        if name == 'Hour_Of_Day':
+            return pd.DatetimeIndex(self.array('DateTime')).hour.to_numpy()
+        if name == 'Half_Hour':
+            return half_hour_codes(self.array('Hour'))
+        smoothed = {'Diff_smooth': 'Diff', 'P1_std_smooth': 'Panel_1_Std', 'P2_std_smooth': 'Panel_2_Std'}
+        if name in smoothed:
+            return (pd.Series(self.array(smoothed[name]))
+                    .rolling(window=self.SMOOTH_WINDOW, center=True, min_periods=self.SMOOTH_MIN)
+                    .mean().to_numpy())
+        raise KeyError(name)
+
+    def array(self, name):
+        """The named feature as a NumPy array (built and memoised on first use)."""
+        if name not in self._arrays:
+            values = np.asarray(self._build(name))
+            values.flags.writeable = False
+            self._arrays[name] = values
+        return self._arrays[name]
+
+    def __getitem__(self, name):
+        return pd.Series(self.array(name), name=name, copy=False)
+
+    def __len__(self):
+        return len(self.array('Diff'))
+
+    def build_all(self):
+        """Every feature, as {name: array}; used to ship them to plot workers."""
+        return {name: self.array(name) for name in self.NAMES}
 
-    combined_df['Panel_1_Avg'] = p1_avg
-    combined_df['Panel_1_Std'] = p1_std
-    combined_df['Panel_1_N']   = p1_n
-    combined_df['Panel_1_Status'] = p1_status
 
-    combined_df['Panel_2_Avg'] = p2_avg
-    combined_df['Panel_2_Std'] = p2_std
-    combined_df['Panel_2_N']   = p2_n
-    combined_df['Panel_2_Status'] = p2_status
+# ============================================================
+# DIAGNOSTIC PLOTS (each reads combined_df only and writes one PNG)
+# ============================================================
 
-    combined_df['Diff'] = combined_df['Panel_1_Avg'] - combined_df['Panel_2_Avg']
+def plot_panel_averages(df, output_dir, mean_diff, features=None):
+    """Plot 1 — panel averages, colour coded by data-quality status."""
+    fig, axes = plt.subplots(2, 1, figsize=(16, 10), sharex=True)
+    for ax, avg_col, status_col, panel_label in [
+        (axes[0], 'Panel_1_Avg', 'Panel_1_Status', 'Panel 1  (channels 3, 4, 5, 7)'),
+        (axes[1], 'Panel_2_Avg', 'Panel_2_Status', 'Panel 2  (channels 9, 10, 11, 12)'),
+    ]:
+        ax.set_ylim(LOWER_THRESHOLD - 3, UPPER_THRESHOLD + 3)
+        plot_panel_avg_with_status(ax, df, avg_col, status_col, panel_label)
 
-    # Standard Error of the Mean (instantaneous)
-    combined_df['Panel_1_SEM'] = combined_df['Panel_1_Std'] / np.sqrt(combined_df['Panel_1_N'])
-    combined_df['Panel_2_SEM'] = combined_df['Panel_2_Std'] / np.sqrt(combined_df['Panel_2_N'])
+    legend_text = (
+        f"■ Blue   = all sensors agreed\n"
+        f"■ Orange = one sensor dropped, averaged from 3\n"
+        f"■ Green  = 2 sensors active, agreed (diff ≤ {MAX_SPREAD_2} °C)\n"
+        f"✕ Red    = timestamp dropped entirely"
+    )
+    fig.text(0.01, 0.01, legend_text, fontsize=8,
+             verticalalignment='bottom',
+             bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
+    fig.suptitle('Panel average temperatures — colour coded by data quality',
+                 fontsize=13, fontweight='bold')
+    plt.tight_layout(rect=[0, 0.08, 1, 1])
+    p = os.path.join(output_dir, "panel_averages_colour_coded.png")
+    plt.savefig(p, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"Colour-coded panel plot saved to: {p}")
 
-    # ----- Report (outlier details) -----
-    report = format_report(date_input, p1_summary, p2_summary)
-    print(report)
 
-    # ============================================================
-    # RUN INTERVAL ANALYSIS FOR BOTH DIRECTIONS + UPGRADED QUALITY FLAGS
-    # ============================================================
-    df_pos, df_neg = get_run_intervals(combined_df)
-
-    def process_run_df(run_df, label, direction_name):
-        if run_df.empty:
-            print(f"\nNo runs where {direction_name}.\n")
-            return None, None
-
-        panel1_cols = [f"Channel - {ch}" for ch in PANEL_1_CHANNELS if f"Channel - {ch}" in combined_df.columns]
-        panel2_cols = [f"Channel - {ch}" for ch in PANEL_2_CHANNELS if f"Channel - {ch}" in combined_df.columns]
-        flagged_df = flag_noisy_runs(run_df, combined_df, panel1_cols, panel2_cols, threshold=1.5)
-
-        total_rows = flagged_df['length'].sum()
-        print(f"\n{'='*62}")
-        print(f"CONTINUOUS RUNS: {direction_name}")
-        print(f"{'='*62}")
-        print(f"Total timestamps in runs: {total_rows}")
-        for file in flagged_df['File'].unique():
-            sub = flagged_df[flagged_df['File'] == file]
-            total_here = sub['length'].sum()
-            print(f"\n  {file}: {len(sub)} runs, total {total_here} rows")
-            for idx, row in sub.head(5).iterrows():
-                flag_str = f"  [{row['flag']}]" if row['flag'] else ""
-                print(f"    Run {row['run_number']}: {row['start_time']}  →  {row['end_time']}  (length {row['length']}){flag_str}")
-            if len(sub) > 5:
-                print(f"    ... and {len(sub)-5} more runs (see detailed CSV).")
-        print("")
-
-        csv_path = os.path.join(OUTPUT_DIR, f"continuous_runs_{label}.csv")
-        flagged_df.to_csv(csv_path, index=False)
-        print(f"Detailed run intervals (with upgraded flags) saved to: {csv_path}")
-
-        # Also save a text summary (with flag symbols)
-        summary_lines = []
-        for file in flagged_df['File'].unique():
-            sub = flagged_df[flagged_df['File'] == file]
-            run_str_list = []
-            for _, row in sub.iterrows():
-                if row['flag']:
-                    run_str_list.append(f"{row['length']}*")
-                else:
-                    run_str_list.append(str(row['length']))
-            run_str = ', '.join(run_str_list)
-            summary_lines.append(f"  {file}: runs = [{run_str}]  (total {sub['length'].sum()} rows)")
-        summary_text = "\n".join([
-            "",
-            f"CONTINUOUS RUNS: {direction_name}",
-            "="*62,
-            f"Total timestamps: {total_rows}",
-            "(* = flagged run - check the CSV for specific reason)",
-            "Per file:",
-        ] + summary_lines + [""])
-        txt_path = os.path.join(OUTPUT_DIR, f"continuous_runs_{label}.txt")
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(summary_text)
-        print(f"Text summary saved to: {txt_path}")
-
-        return summary_text, flagged_df
-
-    summary_pos, flagged_pos = process_run_df(df_pos, "p2_colder", "Panel 2 colder than Panel 1")
-    summary_neg, flagged_neg = process_run_df(df_neg, "p1_colder", "Panel 1 colder than Panel 2")
-    run_summary_text = (summary_pos or "") + "\n" + (summary_neg or "")
-
-    # ============================================================
-    # STATISTICAL ANALYSIS (including overall uncertainty)
-    # ============================================================
-    diff_clean = combined_df['Diff'].dropna()
-    if len(diff_clean) < 2:
-        print("Not enough valid data points for statistics.")
-        return
-
-    mean_diff = diff_clean.mean()
-    std_diff  = diff_clean.std()
-    n         = len(diff_clean)
-
-    if mean_diff > 0:
-        diff_statement = f"Panel 1 averaged {abs(mean_diff):.3f} °C warmer than Panel 2."
-    elif mean_diff < 0:
-        diff_statement = f"Panel 2 averaged {abs(mean_diff):.3f} °C warmer than Panel 1."
-    else:
-        diff_statement = "Both panels averaged the same temperature."
-
-    t_stat, p_val, df_adj, hac_se = newey_west_t_test(diff_clean)
-
-    s1 = combined_df['Panel_1_Avg'].dropna().std()
-    s2 = combined_df['Panel_2_Avg'].dropna().std()
-    pooled_std = np.sqrt((s1**2 + s2**2) / 2) if (s1 > 0 and s2 > 0) else np.nan
-    effect_size = mean_diff / pooled_std if (pooled_std and not np.isnan(pooled_std)) else np.nan
-
-    combined_df['Time_sec'] = (
-        combined_df['DateTime'] - combined_df['DateTime'].iloc[0]
-    ).dt.total_seconds()
-    valid_reg = combined_df[['Panel_1_Avg', 'Panel_2_Avg', 'Time_sec']].dropna()
-    if len(valid_reg) > 5:
-        X_reg = sm.add_constant(valid_reg[['Time_sec']])
-        y_reg = valid_reg['Panel_1_Avg'] - valid_reg['Panel_2_Avg']
-        time_mdl = sm.OLS(y_reg, X_reg).fit()
-        time_coef = time_mdl.params['Time_sec']
-        time_p = time_mdl.pvalues['Time_sec']
-    else:
-        time_coef, time_p = np.nan, np.nan
-
-    def _effect_label(d):
-        if np.isnan(d): return "N/A"
-        d = abs(d)
-        if d < 0.2: return "negligible"
-        if d < 0.5: return "small"
-        if d < 0.8: return "medium"
-        return "large"
-
-    # Compute 95% CI for the mean difference
-    ci_lower = mean_diff - 1.96 * hac_se if not np.isnan(hac_se) else np.nan
-    ci_upper = mean_diff + 1.96 * hac_se if not np.isnan(hac_se) else np.nan
-
-    results_text = f"""
-==================================================
-TEMPERATURE COMPARISON: PANEL 1 vs PANEL 2
-==================================================
-Date                    : {date_input}
-Hard limits             : [{LOWER_THRESHOLD}, {UPPER_THRESHOLD}] °C
-Max spread (3-4 sensors): {MAX_SPREAD_4} °C
-Max spread (2 sensors)  : {MAX_SPREAD_2} °C
-Data points (n)         : {n}
-
-DESCRIPTIVE STATISTICS:
-  Mean Panel 1 avg          : {combined_df['Panel_1_Avg'].mean():.3f} °C
-  Mean Panel 2 avg          : {combined_df['Panel_2_Avg'].mean():.3f} °C
-  Mean difference (P1 - P2) : {mean_diff:.3f} °C
-  Std deviation of diff     : {std_diff:.3f} °C
-  {diff_statement}
-
-UNCERTAINTY:
-  Instantaneous uncertainty (average SEM):
-    Panel 1: ±{combined_df['Panel_1_SEM'].mean():.3f} °C
-    Panel 2: ±{combined_df['Panel_2_SEM'].mean():.3f} °C
-  Overall uncertainty (Newey-West HAC standard error of mean diff):
-    ±{hac_se:.4f} °C
-  95% Confidence Interval for mean diff:
-    [{ci_lower:.4f}, {ci_upper:.4f}] °C
-
-INFERENTIAL STATISTICS (Newey-West HAC, lags={NW_LAGS}):
-  H0: mean difference = 0
-    t-statistic                   = {t_stat:.4f}
-    degrees of freedom (residual) = {df_adj:.2f}
-    p-value                       = {p_val:.6f}
-  {'Reject H0' if p_val < 0.05 else 'Fail to reject H0'} at alpha = 0.05.
-  -> There {"IS" if p_val < 0.05 else "is NOT"} a statistically significant mean difference.
-
-EFFECT SIZE:
-  Cohen's d (approx.) = {effect_size:.3f}  [{_effect_label(effect_size)}]
-
-REGRESSION WITH TIME TREND:
-  Change in difference per second : {time_coef:.6f} °C/s
-  p-value for time trend          : {time_p:.4f}
-  {'Significant time trend detected.' if time_p < 0.05 else 'No significant time trend.'}
-
-CONCLUSION:
-  {'Statistically and practically meaningful temperature difference.' if (p_val<0.05 and abs(effect_size)>0.2) else 'Statistically significant but negligible effect size.' if p_val<0.05 else 'No strong evidence of a meaningful temperature difference.'}
-==================================================
-"""
-    print(results_text)
-
-    # Save full report
-    full_report = report + run_summary_text + results_text
-    stats_path = os.path.join(OUTPUT_DIR, "statistical_comparison.txt")
-    with open(stats_path, 'w', encoding='utf-8') as f:
-        f.write(full_report)
-    print(f"Full report saved to: {stats_path}")
-
-    # ============================================================
-    # PLOTS
-    # ============================================================
-
-    # Plot 1 — panel averages with colour-coded status
-    fig, axes = plt.subplots(2, 1, figsize=(16, 10), sharex=True)
-    for ax, avg_col, status_col, panel_label in [
-        (axes[0], 'Panel_1_Avg', 'Panel_1_Status', 'Panel 1  (channels 3, 4, 5, 7)'),
-        (axes[1], 'Panel_2_Avg', 'Panel_2_Status', 'Panel 2  (channels 9, 10, 11, 12)'),
-    ]:
-        ax.set_ylim(LOWER_THRESHOLD - 3, UPPER_THRESHOLD + 3)
-        plot_panel_avg_with_status(ax, combined_df, avg_col, status_col, panel_label)
-
-    legend_text = (
-        f"■ Blue   = all sensors agreed\n"
-        f"■ Orange = one sensor dropped, averaged from 3\n"
-        f"■ Green  = 2 sensors active, agreed (diff ≤ {MAX_SPREAD_2} °C)\n"
-        f"✕ Red    = timestamp dropped entirely"
-    )
-    fig.text(0.01, 0.01, legend_text, fontsize=8,
-             verticalalignment='bottom',
-             bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
-    fig.suptitle('Panel average temperatures — colour coded by data quality',
-                 fontsize=13, fontweight='bold')
-    plt.tight_layout(rect=[0, 0.08, 1, 1])
-    p = os.path.join(OUTPUT_DIR, "panel_averages_colour_coded.png")
-    plt.savefig(p, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Colour-coded panel plot saved to: {p}")
-
-    # Plot 2 — difference over time
+def plot_difference(df, output_dir, mean_diff, features=None):
+    """Plot 2 — difference over time."""
     fig, ax = plt.subplots(figsize=(12, 4))
-    ax.plot(combined_df['DateTime'], combined_df['Diff'],
+    ax.plot(*thin_line(df['DateTime'], df['Diff']),
             color='#1f77b4', linewidth=1.5, alpha=0.9, label='P1 − P2')
     ax.axhline(0, color='grey', linestyle=':', linewidth=1)
     ax.axhline(mean_diff, color='red', linestyle='--', linewidth=1.5,
@@ -811,12 +1472,15 @@ CONCLUSION:
     ax.legend(fontsize=9)
     _time_axis(ax)
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "temperature_difference.png")
+    p = os.path.join(output_dir, "temperature_difference.png")
     plt.savefig(p, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Difference plot saved to: {p}")
 
-    # Plot 3 — distribution of differences
+
+def plot_difference_distribution(df, output_dir, mean_diff, features=None):
+    """Plot 3 — distribution of differences (histogram + KDE)."""
+    diff_clean = df['Diff'].dropna()
     fig, ax = plt.subplots(figsize=(8, 4))
     diff_clean.hist(bins=30, ax=ax, color='steelblue', edgecolor='white',
                     alpha=0.8, density=True)
@@ -829,12 +1493,14 @@ CONCLUSION:
     ax.set_title('Distribution of temperature differences (post-filter)')
     ax.legend()
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "difference_distribution.png")
+    p = os.path.join(output_dir, "difference_distribution.png")
     plt.savefig(p, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Distribution plot saved to: {p}")
 
-    # Plot 4 — individual channels vs panel average
+
+def plot_channels_vs_average(df, output_dir, mean_diff, features=None):
+    """Plot 4 — individual channels vs panel average."""
     fig, axes = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
     ch_colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
     for ax, (panel_label, channels, avg_col) in zip(axes, [
@@ -843,10 +1509,10 @@ CONCLUSION:
     ]):
         for ch, col in zip(channels, ch_colors):
             cname = f"Channel - {ch}"
-            if cname in combined_df.columns:
-                ax.plot(combined_df['DateTime'], combined_df[cname],
+            if cname in df.columns:
+                ax.plot(*thin_line(df['DateTime'], df[cname]),
                         color=col, alpha=0.45, linewidth=1, label=f'Ch {ch}')
-        ax.plot(combined_df['DateTime'], combined_df[avg_col],
+        ax.plot(*thin_line(df['DateTime'], df[avg_col]),
                 color='black', linewidth=2, label='Panel average (filtered)')
         ax.set_title(panel_label, fontsize=11)
         ax.set_ylabel('°C')
@@ -855,30 +1521,18 @@ CONCLUSION:
     plt.suptitle('Individual channel readings vs filtered panel average',
                  fontsize=13, fontweight='bold')
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "channels_vs_panel_average.png")
+    p = os.path.join(output_dir, "channels_vs_panel_average.png")
     plt.savefig(p, dpi=150, bbox_inches='tight')
     plt.close()
     print(f"Channel detail plot saved to: {p}")
 
-    # ============================================================
-    # ==== NEW PLOT 5: Difference vs Standard Deviation (Sensor Spread) ====
-    # ============================================================
-        # ============================================================
-    # PLOT 5 — Time series with rolling average (smooth)
-    # ============================================================
+
+def plot_diff_vs_spread_smooth(df, output_dir, mean_diff, features=None):
+    """Plot 5 — difference and sensor spread over time, with a rolling average."""
     fig, ax1 = plt.subplots(figsize=(14, 6))
     
-    # Drop rows where Diff or Std is NaN
-    plot_data = combined_df.dropna(subset=['Diff', 'Panel_1_Std', 'Panel_2_Std'])
-    
-    # --- Calculate rolling averages (smoothing) ---
-    # Adjust window size: 60 data points = ~1 minute (if 1 reading/sec), 
-    # but you can change it based on your sampling rate.
-    WINDOW = 60  
-    plot_data = plot_data.copy()
-    plot_data['Diff_smooth'] = plot_data['Diff'].rolling(window=WINDOW, center=True, min_periods=10).mean()
-    plot_data['P1_std_smooth'] = plot_data['Panel_1_Std'].rolling(window=WINDOW, center=True, min_periods=10).mean()
-    plot_data['P2_std_smooth'] = plot_data['Panel_2_Std'].rolling(window=WINDOW, center=True, min_periods=10).mean()
+    # Rows where Diff and both Stds exist, with their rolling averages (SMOOTH_WINDOW points)
+    plot_data = DerivedFeatures(df) if features is None else features
     
     # --- Left Y-axis: Temperature Difference ---
     color1 = 'tab:blue'
@@ -886,10 +1540,10 @@ CONCLUSION:
     ax1.set_ylabel('Temperature Difference P1 - P2 (°C)', color=color1, fontsize=11)
     
     # Plot RAW diff as a thin, transparent line (for context)
-    ax1.plot(plot_data['DateTime'], plot_data['Diff'], 
+    ax1.plot(*thin_line(plot_data['DateTime'], plot_data['Diff']), 
              color=color1, linewidth=0.5, alpha=0.3, label='Diff (raw)')
     # Plot SMOOTH diff as a thick, opaque line (the trend)
-    ax1.plot(plot_data['DateTime'], plot_data['Diff_smooth'], 
+    ax1.plot(*thin_line(plot_data['DateTime'], plot_data['Diff_smooth']), 
              color='darkblue', linewidth=2.5, alpha=1, label='Diff (smooth, 60pt avg)')
     ax1.axhline(0, color='grey', linestyle=':', linewidth=1, alpha=0.7)
     ax1.tick_params(axis='y', labelcolor=color1)
@@ -899,15 +1553,15 @@ CONCLUSION:
     ax2.set_ylabel('Sensor Standard Deviation (°C)', color='tab:orange', fontsize=11)
     
     # RAW spreads (thin, transparent)
-    ax2.plot(plot_data['DateTime'], plot_data['Panel_1_Std'], 
+    ax2.plot(*thin_line(plot_data['DateTime'], plot_data['Panel_1_Std']), 
              color='tab:orange', linewidth=0.5, alpha=0.2, label='P1 Std (raw)')
-    ax2.plot(plot_data['DateTime'], plot_data['Panel_2_Std'], 
+    ax2.plot(*thin_line(plot_data['DateTime'], plot_data['Panel_2_Std']), 
              color='tab:green', linewidth=0.5, alpha=0.2, label='P2 Std (raw)')
     
     # SMOOTH spreads (thick, solid)
-    ax2.plot(plot_data['DateTime'], plot_data['P1_std_smooth'], 
+    ax2.plot(*thin_line(plot_data['DateTime'], plot_data['P1_std_smooth']), 
              color='darkorange', linewidth=2, alpha=0.9, label='P1 Std (smooth)')
-    ax2.plot(plot_data['DateTime'], plot_data['P2_std_smooth'], 
+    ax2.plot(*thin_line(plot_data['DateTime'], plot_data['P2_std_smooth']), 
              color='darkgreen', linewidth=2, alpha=0.9, label='P2 Std (smooth)')
     
     # Flagging threshold (1.5 °C)
@@ -924,34 +1578,34 @@ CONCLUSION:
     
     _time_axis(ax1)
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "temperature_diff_vs_spread_smooth.png")
+    p = os.path.join(output_dir, "temperature_diff_vs_spread_smooth.png")
     plt.savefig(p, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Smoothed Diff vs Spread plot saved to: {p}")
 
-    # ============================================================
-    # PLOT 6 — Scatter: Difference vs Maximum Sensor Spread
-    # ============================================================
+
+def plot_diff_vs_spread_scatter(df, output_dir, mean_diff, features=None):
+    """Plot 6 — scatter of difference vs maximum sensor spread."""
     # This plot eliminates time entirely and shows the *quality* of the data.
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Calculate the maximum spread between the two panels at each timestamp
-    scatter_data = combined_df.dropna(subset=['Diff', 'Panel_1_Std', 'Panel_2_Std']).copy()
-    scatter_data['Max_Spread'] = scatter_data[['Panel_1_Std', 'Panel_2_Std']].max(axis=1)
+    # Maximum spread between the two panels at each timestamp (shared features)
+    scatter_data = DerivedFeatures(df) if features is None else features
+    diff, max_spread = scatter_data['Diff'], scatter_data['Max_Spread']
     
     # Create a density scatter plot (alpha for transparency)
     # Color points by whether the spread is above or below the threshold
-    mask_low = scatter_data['Max_Spread'] <= 1.5
-    mask_high = scatter_data['Max_Spread'] > 1.5
+    mask_low = max_spread <= 1.5
+    mask_high = max_spread > 1.5
     
     # Plot low-spread points (clean data) in blue
-    ax.scatter(scatter_data.loc[mask_low, 'Diff'], 
-               scatter_data.loc[mask_low, 'Max_Spread'],
+    ax.scatter(diff[mask_low], 
+               max_spread[mask_low],
                c='#1f77b4', s=8, alpha=0.4, label='Spread ≤ 1.5 °C (clean)')
     
     # Plot high-spread points (flagged data) in red
-    ax.scatter(scatter_data.loc[mask_high, 'Diff'], 
-               scatter_data.loc[mask_high, 'Max_Spread'],
+    ax.scatter(diff[mask_high], 
+               max_spread[mask_high],
                c='#d62728', s=8, alpha=0.6, label='Spread > 1.5 °C (flagged)')
     
     # Add vertical line at zero difference
@@ -967,26 +1621,22 @@ CONCLUSION:
     ax.legend(fontsize=10)
     ax.grid(True, alpha=0.3)
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "diff_vs_spread_scatter.png")
+    p = os.path.join(output_dir, "diff_vs_spread_scatter.png")
     plt.savefig(p, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Scatter diagnostic plot saved to: {p}")
 
-        # ============================================================
-    # PLOT 7 — Sensitivity Curve (Conservative vs Liberal Dial)
-    # ============================================================
+
+def plot_sensitivity_curve(df, output_dir, mean_diff, features=None):
+    """Plot 7 — sensitivity curve: mean difference and data kept vs SD threshold."""
     # How does the mean difference and data retention change with SD threshold?
-    scatter_data = combined_df.dropna(subset=['Diff', 'Panel_1_Std', 'Panel_2_Std']).copy()
-    scatter_data['Max_Spread'] = scatter_data[['Panel_1_Std', 'Panel_2_Std']].max(axis=1)
+    scatter_data = DerivedFeatures(df) if features is None else features
     
-    thresholds = np.linspace(0.1, 5.0, 50)
-    mean_diffs = []
-    counts = []
-    
-    for thresh in thresholds:
-        filtered = scatter_data[scatter_data['Max_Spread'] <= thresh]
-        mean_diffs.append(filtered['Diff'].mean())
-        counts.append(len(filtered))
+    thresholds = np.linspace(0.1, 5.0, SENSITIVITY_POINTS)
+    sweep = threshold_sweep(scatter_data['Max_Spread'], scatter_data['Diff'], thresholds)
+    mean_diffs = sweep['Mean']
+    counts = sweep['Count']
+    markevery = max(1, len(thresholds) // 50)
     
     fig, ax1 = plt.subplots(figsize=(10, 6))
     
@@ -994,7 +1644,7 @@ CONCLUSION:
     color1 = 'tab:blue'
     ax1.set_xlabel('Sensor Spread Threshold (Max Std Dev, °C)', fontsize=12)
     ax1.set_ylabel('Mean Temperature Difference P1 − P2 (°C)', color=color1, fontsize=12)
-    ax1.plot(thresholds, mean_diffs, color=color1, linewidth=2.5, marker='o', markersize=4, label='Mean Diff')
+    ax1.plot(thresholds, mean_diffs, color=color1, linewidth=2.5, marker='o', markersize=4, markevery=markevery, label='Mean Diff')
     ax1.axhline(scatter_data['Diff'].mean(), color='grey', linestyle='--', alpha=0.5, label='Overall Mean (no filter)')
     ax1.tick_params(axis='y', labelcolor=color1)
     
@@ -1002,7 +1652,7 @@ CONCLUSION:
     ax2 = ax1.twinx()
     color2 = 'tab:red'
     ax2.set_ylabel('Number of Timestamps Kept', color=color2, fontsize=12)
-    ax2.plot(thresholds, counts, color=color2, linewidth=2, linestyle='--', marker='s', markersize=4, label='Data retained')
+    ax2.plot(thresholds, counts, color=color2, linewidth=2, linestyle='--', marker='s', markersize=4, markevery=markevery, label='Data retained')
     ax2.tick_params(axis='y', labelcolor=color2)
     
     # Add a vertical line at the current threshold (1.5 °C)
@@ -1019,21 +1669,17 @@ CONCLUSION:
     
     ax1.grid(True, alpha=0.3)
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "sensitivity_curve.png")
+    p = os.path.join(output_dir, "sensitivity_curve.png")
     plt.savefig(p, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Sensitivity curve saved to: {p}")
 
 
-        # ============================================================
-    # PLOT 8 — Temporal Coverage Heatmap
-    # ============================================================
+def plot_coverage_heatmap(df, output_dir, mean_diff, features=None):
+    """Plot 8 — temporal coverage heatmap: time of day vs SD threshold."""
     # This shows if your threshold kills specific times of the day.
-    scatter_data = combined_df.dropna(subset=['Diff', 'Panel_1_Std', 'Panel_2_Std']).copy()
-    scatter_data['Max_Spread'] = scatter_data[['Panel_1_Std', 'Panel_2_Std']].max(axis=1)
-    
-    # Extract fractional hour (e.g., 10.5 for 10:30)
-    scatter_data['Hour'] = scatter_data['DateTime'].dt.hour + scatter_data['DateTime'].dt.minute / 60.0
+    # Max_Spread and fractional hour (e.g., 10.5 for 10:30) come from the shared features
+    scatter_data = DerivedFeatures(df) if features is None else features
     
     # Define bins for the 2D histogram
     hour_bins = np.arange(0, 24.5, 0.5)          # 30-minute bins across the day
@@ -1066,38 +1712,16 @@ CONCLUSION:
     cbar.set_label('Number of Datapoints Retained', fontsize=11)
     ax.legend(loc='upper right')
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "temporal_coverage_heatmap.png")
+    p = os.path.join(output_dir, "temporal_coverage_heatmap.png")
     plt.savefig(p, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Temporal coverage heatmap saved to: {p}")
 
-    # ============================================================
-    # PLOT 9 — Active Hours Coverage Curve
-    # ============================================================
-    # This shows how many unique hours of the day have data as you turn the dial.
-        # ============================================================
-    # PLOT 9 — Active Hours Coverage Curve (FIXED)
-    # ============================================================
-    # This shows how many unique hours of the day have data as you turn the dial.
-    
-    # Ensure DateTime is actually a datetime object
-        # ============================================================
-    # PLOT 9 — Active Hours Coverage Curve (FIXED)
-    # ============================================================
-    # This shows how many unique hours of the day have data as you turn the dial.
-    
-    # Ensure we have a clean copy with all needed columns
-    scatter_data = combined_df.dropna(subset=['Diff', 'Panel_1_Std', 'Panel_2_Std']).copy()
-    
-    # --- CRITICAL FIX: Add the Max_Spread column ---
-    scatter_data['Max_Spread'] = scatter_data[['Panel_1_Std', 'Panel_2_Std']].max(axis=1)
-    
-    # Ensure DateTime is actually a datetime object
-    if not pd.api.types.is_datetime64_any_dtype(scatter_data['DateTime']):
-        scatter_data['DateTime'] = pd.to_datetime(scatter_data['DateTime'])
-    
-    # Extract fractional hour (e.g., 10.5 for 10:30)
-    scatter_data['Hour'] = scatter_data['DateTime'].dt.hour + scatter_data['DateTime'].dt.minute / 60.0
+
+def plot_active_hours(df, output_dir, mean_diff, features=None):
+    """Plot 9 — active half-hour bins vs SD threshold."""
+    # Clean rows with Max_Spread, fractional hour and half-hour bins (shared features)
+    scatter_data = DerivedFeatures(df) if features is None else features
     
     # Debug prints (these will show up in the console)
     print(f"  Debug: Hour range in data: {scatter_data['Hour'].min():.1f} to {scatter_data['Hour'].max():.1f}")
@@ -1105,18 +1729,9 @@ CONCLUSION:
     print(f"  Debug: Max_Spread range: {scatter_data['Max_Spread'].min():.2f} to {scatter_data['Max_Spread'].max():.2f} °C")
     
     thresholds = np.linspace(0.1, 5.0, 50)
-    active_hours = []
-    data_counts = []
-    
-    for thresh in thresholds:
-        temp_df = scatter_data[scatter_data['Max_Spread'] <= thresh]
-        if not temp_df.empty:
-            # Round to nearest half-hour to count unique bins
-            unique_hours = temp_df['Hour'].apply(lambda x: round(x * 2) / 2).nunique()
-        else:
-            unique_hours = 0
-        active_hours.append(unique_hours)
-        data_counts.append(len(temp_df))
+    # Half-hour bin of each row (nearest half hour), then bins alive per threshold
+    bins = scatter_data['Half_Hour']
+    active_hours = coverage_sweep(bins, scatter_data['Max_Spread'], thresholds)
     
     fig, ax = plt.subplots(figsize=(10, 6))
     
@@ -1124,11 +1739,11 @@ CONCLUSION:
     ax.plot(thresholds, active_hours, color='darkgreen', linewidth=2.5, marker='s', markersize=4, label='Active Hours')
     
     # Calculate the maximum possible half-hour bins from the actual data range
-    if not scatter_data.empty:
+    if len(scatter_data):
         min_hour = scatter_data['Hour'].min()
         max_hour = scatter_data['Hour'].max()
         # Count how many unique half-hour bins exist in the full dataset
-        full_hours = scatter_data['Hour'].apply(lambda x: round(x * 2) / 2).nunique()
+        full_hours = len(np.unique(bins))
         ax.axhline(full_hours, color='grey', linestyle='--', alpha=0.5, 
                    label=f'Max possible (from data: {full_hours} bins)')
     else:
@@ -1145,33 +1760,27 @@ CONCLUSION:
     ax.legend(loc='lower right')
     ax.grid(True, alpha=0.3)
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "active_hours_coverage.png")
+    p = os.path.join(output_dir, "active_hours_coverage.png")
     plt.savefig(p, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Active hours coverage saved to: {p}")
-        # ============================================================
-    # PLOT 10 — Hour-by-Hour Coverage Bar Chart
-    # ============================================================
+
+
+def plot_hourly_retention(df, output_dir, mean_diff, features=None):
+    """Plot 10 — percentage of timestamps kept per hour of the day."""
     # This shows which specific hours of the day survive the filter,
     # so you can see if the threshold biases certain times.
     
-    # Use the same scatter_data (with Max_Spread already computed)
-    scatter_data = combined_df.dropna(subset=['Diff', 'Panel_1_Std', 'Panel_2_Std']).copy()
-    scatter_data['Max_Spread'] = scatter_data[['Panel_1_Std', 'Panel_2_Std']].max(axis=1)
-    
-    # Ensure DateTime is a datetime object
-    if not pd.api.types.is_datetime64_any_dtype(scatter_data['DateTime']):
-        scatter_data['DateTime'] = pd.to_datetime(scatter_data['DateTime'])
-    
-    # Extract hour (integer, e.g., 10, 11, 12, 13, 14, 15)
-    scatter_data['Hour'] = scatter_data['DateTime'].dt.hour
+    # Use the shared features (Max_Spread and the integer hour, e.g. 10, 11, 12)
+    scatter_data = DerivedFeatures(df) if features is None else features
+    hour = scatter_data['Hour_Of_Day']
     
     # Group by hour and count timestamps BEFORE any filter
-    total_by_hour = scatter_data.groupby('Hour').size()
+    total_by_hour = hour.groupby(hour).size()
     
     # Now apply the current threshold (1.5 °C) and count again
-    filtered_data = scatter_data[scatter_data['Max_Spread'] <= 1.5]
-    kept_by_hour = filtered_data.groupby('Hour').size()
+    filtered_hour = hour[scatter_data['Max_Spread'] <= 1.5]
+    kept_by_hour = filtered_hour.groupby(filtered_hour).size()
     
     # Calculate percentage retained per hour
     all_hours = sorted(total_by_hour.index.unique())
@@ -1211,12 +1820,393 @@ CONCLUSION:
     ax.legend(fontsize=10)
     ax.grid(True, alpha=0.3, axis='y')
     plt.tight_layout()
-    p = os.path.join(OUTPUT_DIR, "hour_by_hour_retention.png")
+    p = os.path.join(output_dir, "hour_by_hour_retention.png")
     plt.savefig(p, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Hour-by-hour retention plot saved to: {p}")
+
+
+# The ten diagnostic plots, in the order they are written and reported
+DIAGNOSTIC_PLOTS = [
+    plot_panel_averages, plot_difference, plot_difference_distribution,
+    plot_channels_vs_average, plot_diff_vs_spread_smooth, plot_diff_vs_spread_scatter,
+    plot_sensitivity_curve, plot_coverage_heatmap, plot_active_hours, plot_hourly_retention,
+]
+
+
+# ============================================================
+# PARALLEL PLOT RENDERING
+# ============================================================
+#
+# The plots only read combined_df. Rather than pickling the frame to every
+# worker, the columns they use are written once as .npy files and each worker
+# maps them read-only (np.load(mmap_mode='r')), so the pages are shared
+# through the OS page cache. Status strings are stored as integer codes.
+# The DerivedFeatures arrays are built once in the parent and shipped the
+# same way, so no worker recomputes the clean rows or the rolling means.
+
+def _plot_columns(df):
+    """The combined_df columns the diagnostic plots read."""
+    cols = ['DateTime', 'Panel_1_Avg', 'Panel_1_Std', 'Panel_1_Status',
+            'Panel_2_Avg', 'Panel_2_Std', 'Panel_2_Status', 'Diff']
+    cols += [f"Channel - {ch}" for ch in PANEL_1_CHANNELS + PANEL_2_CHANNELS]
+    return [c for c in cols if c in df.columns]
+
+
+def write_plot_snapshot(df, snapshot_dir, features=None):
+    """
+    Write the plot columns of df as one .npy file per column (strings as
+    codes + labels), plus every DerivedFeatures array when features is given.
+    """
+    columns = _plot_columns(df)
+    np.save(os.path.join(snapshot_dir, '_columns.npy'), np.array(columns, dtype=str))
+    for i, col in enumerate(columns):
+        values = df[col].to_numpy()
+        if values.dtype.kind in 'OUT':
+            codes, labels = pd.factorize(df[col])
+            np.save(os.path.join(snapshot_dir, f"c{i}.npy"), codes.astype(np.int8))
+            np.save(os.path.join(snapshot_dir, f"c{i}_labels.npy"), np.array(labels, dtype=str))
+        else:
+            np.save(os.path.join(snapshot_dir, f"c{i}.npy"), values)
+    if features is not None:
+        for name, values in features.build_all().items():
+            np.save(os.path.join(snapshot_dir, f"f_{name}.npy"), values)
+
+
+def read_plot_snapshot(snapshot_dir):
+    """The DataFrame written by write_plot_snapshot, numeric columns memory-mapped read-only."""
+    columns = np.load(os.path.join(snapshot_dir, '_columns.npy')).tolist()
+    data = {}
+    for i, col in enumerate(columns):
+        values = np.load(os.path.join(snapshot_dir, f"c{i}.npy"), mmap_mode='r')
+        labels_path = os.path.join(snapshot_dir, f"c{i}_labels.npy")
+        if os.path.exists(labels_path):
+            labels = np.append(np.load(labels_path).astype(object), np.nan)
+            values = labels[values]              # code -1 (missing) picks the trailing NaN
+        data[col] = pd.Series(values, copy=False)
+    return pd.DataFrame(data, copy=False)
+
+
+def read_plot_features(snapshot_dir, df):
+    """DerivedFeatures over df from the arrays in the snapshot (memory-mapped), if any were written."""
+    arrays = {}
+    for name in DerivedFeatures.NAMES:
+        path = os.path.join(snapshot_dir, f"f_{name}.npy")
+        if os.path.exists(path):
+            arrays[name] = np.load(path, mmap_mode='r')
+    return DerivedFeatures(df, arrays)
+
+
+def _plot_worker_init(config):
+    """Worker initializer for render_plots: settings from the parent, file-only plotting."""
+    apply_config(config)
+    plt.switch_backend('Agg')
+
+
+def _render_plot_job(plot, snapshot_dir, output_dir, mean_diff):
+    """Render one plot from the shared snapshot, returning what it printed."""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        df = read_plot_snapshot(snapshot_dir)
+        plot(df, output_dir, mean_diff, read_plot_features(snapshot_dir, df))
+    return out.getvalue()
+
+
+def render_plots(df, output_dir, mean_diff, workers=None):
+    """
+    Render every plot in DIAGNOSTIC_PLOTS into output_dir, in a process pool
+    when workers != 1 (None = the PLOT_WORKERS setting at call time). The
+    files and the printed messages (in plot order) are the same as rendering
+    them one after another. The plots share one DerivedFeatures of df.
+    """
+    if workers is None:
+        workers = PLOT_WORKERS
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(DIAGNOSTIC_PLOTS)))
+    features = DerivedFeatures(df)
+    if workers == 1:
+        for plot in DIAGNOSTIC_PLOTS:
+            plot(df, output_dir, mean_diff, features)
+        return
+
+    snapshot_dir = tempfile.mkdtemp(prefix='plot_snapshot_')
+    try:
+        write_plot_snapshot(df, snapshot_dir, features)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_plot_worker_init,
+                                 initargs=(current_config(),)) as pool:
+            futures = [pool.submit(_render_plot_job, plot, snapshot_dir, output_dir, mean_diff)
+                       for plot in DIAGNOSTIC_PLOTS]
+            for future in futures:
+                print(future.result(), end='')
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    while True:
+        date_input = input("Enter date (dd-mm-yyyy): ").strip()
+        try:
+            datetime.strptime(date_input, '%d-%m-%Y')
+            break
+        except ValueError:
+            print("  Invalid format. Use dd-mm-yyyy")
+
+    while True:
+        INPUT_DIR = input("Enter input folder path: ").strip()
+        if os.path.isdir(INPUT_DIR):
+            break
+        print("  Invalid directory")
+
+    while True:
+        OUTPUT_DIR = input("Enter output folder path: ").strip()
+        if OUTPUT_DIR:
+            break
+        print("  Cannot be empty")
+    run_pipeline(date_input, INPUT_DIR, OUTPUT_DIR)
+
+
+def run_pipeline(date_input, input_dir, output_dir, load_workers=None, plot_workers=None):
+    """
+    Run the full analysis for one date: load every '<date> *.xlsx' file in
+    input_dir, clean, compare the panels, and write all reports and plots
+    to output_dir. Thresholds are read from the module settings.
+    Returns a dict of headline results for the date, or None if there was no usable data.
+    """
+    FILE_PATTERN = f"{date_input} *.xlsx"
+    os.makedirs(output_dir, exist_ok=True)
+
+    # ----- Load files -----
+    file_paths = [
+        os.path.join(input_dir, f)
+        for f in os.listdir(input_dir)
+        if fnmatch(f.lower(), FILE_PATTERN.lower())
+    ]
+    if not file_paths:
+        print(f"No files matching '{FILE_PATTERN}' in {input_dir}")
+        return
+    print(f"\nFound {len(file_paths)} file(s). Processing...")
+
+    cache_dir = default_cache_dir(output_dir) if CACHE_ENABLED else None
+    df_list = load_files(file_paths, cache_dir, load_workers)
+    if not df_list:
+        print("No valid data after processing.")
+        return
+
+    combined_df = pd.concat(df_list).sort_values('DateTime').reset_index(drop=True)
+    print(f"\nCombined dataset: {len(combined_df)} rows after hard-limit filtering.")
+
+    # ----- Step 2: Lag correction -----
+    print("Step 2: Applying lag correction (detecting reconnecting/stabilising sensors)...")
+    combined_df = apply_lag_correction(combined_df, PANEL_1_CHANNELS, LAG_WINDOW, LAG_THRESHOLD)
+    combined_df = apply_lag_correction(combined_df, PANEL_2_CHANNELS, LAG_WINDOW, LAG_THRESHOLD)
+
+    # ----- Step 3: within-panel cluster filter (now with uncertainty) -----
+    print("Step 3: within-panel cluster filter ...")
+    p1_avg, p1_std, p1_n, p1_status, p1_summary = apply_within_panel_filter(
+        combined_df, PANEL_1_CHANNELS, "Panel 1")
+    p2_avg, p2_std, p2_n, p2_status, p2_summary = apply_within_panel_filter(
+        combined_df, PANEL_2_CHANNELS, "Panel 2")
+
+    combined_df['Panel_1_Avg'] = p1_avg
+    combined_df['Panel_1_Std'] = p1_std
+    combined_df['Panel_1_N']   = p1_n
+    combined_df['Panel_1_Status'] = p1_status
+
+    combined_df['Panel_2_Avg'] = p2_avg
+    combined_df['Panel_2_Std'] = p2_std
+    combined_df['Panel_2_N']   = p2_n
+    combined_df['Panel_2_Status'] = p2_status
+
+    combined_df['Diff'] = combined_df['Panel_1_Avg'] - combined_df['Panel_2_Avg']
+
+    # Standard Error of the Mean (instantaneous)
+    combined_df['Panel_1_SEM'] = combined_df['Panel_1_Std'] / np.sqrt(combined_df['Panel_1_N'])
+    combined_df['Panel_2_SEM'] = combined_df['Panel_2_Std'] / np.sqrt(combined_df['Panel_2_N'])
+
+    # ----- Report (outlier details) -----
+    report = format_report(date_input, p1_summary, p2_summary)
+    print(report)
+
+    # ============================================================
+    # RUN INTERVAL ANALYSIS FOR BOTH DIRECTIONS + UPGRADED QUALITY FLAGS
+    # ============================================================
+    df_pos, df_neg = get_run_intervals(combined_df)
+
+    def process_run_df(run_df, label, direction_name):
+        if run_df.empty:
+            print(f"\nNo runs where {direction_name}.\n")
+            return None, None
+
+        panel1_cols = [f"Channel - {ch}" for ch in PANEL_1_CHANNELS if f"Channel - {ch}" in combined_df.columns]
+        panel2_cols = [f"Channel - {ch}" for ch in PANEL_2_CHANNELS if f"Channel - {ch}" in combined_df.columns]
+        flagged_df = flag_noisy_runs(run_df, combined_df, panel1_cols, panel2_cols, threshold=1.5)
+
+        total_rows = flagged_df['length'].sum()
+        print(f"\n{'='*62}")
+        print(f"CONTINUOUS RUNS: {direction_name}")
+        print(f"{'='*62}")
+        print(f"Total timestamps in runs: {total_rows}")
+        for file in flagged_df['File'].unique():
+            sub = flagged_df[flagged_df['File'] == file]
+            total_here = sub['length'].sum()
+            print(f"\n  {file}: {len(sub)} runs, total {total_here} rows")
+            for idx, row in sub.head(5).iterrows():
+                flag_str = f"  [{row['flag']}]" if row['flag'] else ""
+                print(f"    Run {row['run_number']}: {row['start_time']}  →  {row['end_time']}  (length {row['length']}){flag_str}")
+            if len(sub) > 5:
+                print(f"    ... and {len(sub)-5} more runs (see detailed CSV).")
+        print("")
+
+        csv_path = os.path.join(output_dir, f"continuous_runs_{label}.csv")
+        flagged_df.to_csv(csv_path, index=False)
+        print(f"Detailed run intervals (with upgraded flags) saved to: {csv_path}")
+
+        # Also save a text summary (with flag symbols)
+        summary_lines = []
+        for file in flagged_df['File'].unique():
+            sub = flagged_df[flagged_df['File'] == file]
+            run_str_list = []
+            for _, row in sub.iterrows():
+                if row['flag']:
+                    run_str_list.append(f"{row['length']}*")
+                else:
+                    run_str_list.append(str(row['length']))
+            run_str = ', '.join(run_str_list)
+            summary_lines.append(f"  {file}: runs = [{run_str}]  (total {sub['length'].sum()} rows)")
+        summary_text = "\n".join([
+            "",
+            f"CONTINUOUS RUNS: {direction_name}",
+            "="*62,
+            f"Total timestamps: {total_rows}",
+            "(* = flagged run - check the CSV for specific reason)",
+            "Per file:",
+        ] + summary_lines + [""])
+        txt_path = os.path.join(output_dir, f"continuous_runs_{label}.txt")
+        with open(txt_path, 'w', encoding='utf-8') as f:
+            f.write(summary_text)
+        print(f"Text summary saved to: {txt_path}")
+
+        return summary_text, flagged_df
+
+    summary_pos, flagged_pos = process_run_df(df_pos, "p2_colder", "Panel 2 colder than Panel 1")
+    summary_neg, flagged_neg = process_run_df(df_neg, "p1_colder", "Panel 1 colder than Panel 2")
+    run_summary_text = (summary_pos or "") + "\n" + (summary_neg or "")
+
+    # ============================================================
+    # STATISTICAL ANALYSIS (including overall uncertainty)
+    # ============================================================
+    diff_clean = combined_df['Diff'].dropna()
+    if len(diff_clean) < 2:
+        print("Not enough valid data points for statistics.")
+        return
+
+    mean_diff = diff_clean.mean()
+    std_diff  = diff_clean.std()
+    n         = len(diff_clean)
+
+    if mean_diff > 0:
+        diff_statement = f"Panel 1 averaged {abs(mean_diff):.3f} °C warmer than Panel 2."
+    elif mean_diff < 0:
+        diff_statement = f"Panel 2 averaged {abs(mean_diff):.3f} °C warmer than Panel 1."
+    else:
+        diff_statement = "Both panels averaged the same temperature."
+
+    t_stat, p_val, df_adj, hac_se = newey_west_t_test(diff_clean, NW_LAGS)
+
+    s1 = combined_df['Panel_1_Avg'].dropna().std()
+    s2 = combined_df['Panel_2_Avg'].dropna().std()
+    pooled_std = np.sqrt((s1**2 + s2**2) / 2) if (s1 > 0 and s2 > 0) else np.nan
+    effect_size = mean_diff / pooled_std if (pooled_std and not np.isnan(pooled_std)) else np.nan
+
+    combined_df['Time_sec'] = (
+        combined_df['DateTime'] - combined_df['DateTime'].iloc[0]
+    ).dt.total_seconds()
+    valid_reg = combined_df[['Panel_1_Avg', 'Panel_2_Avg', 'Time_sec']].dropna()
+    if len(valid_reg) > 5:
+        time_coef, time_p = time_trend(valid_reg['Time_sec'],
+                                       valid_reg['Panel_1_Avg'] - valid_reg['Panel_2_Avg'])
+    else:
+        time_coef, time_p = np.nan, np.nan
+
+    def _effect_label(d):
+        if np.isnan(d): return "N/A"
+        d = abs(d)
+        if d < 0.2: return "negligible"
+        if d < 0.5: return "small"
+        if d < 0.8: return "medium"
+        return "large"
+
+    # Compute 95% CI for the mean difference
+    ci_lower = mean_diff - 1.96 * hac_se if not np.isnan(hac_se) else np.nan
+    ci_upper = mean_diff + 1.96 * hac_se if not np.isnan(hac_se) else np.nan
+
+    results_text = f"""
+==================================================
+TEMPERATURE COMPARISON: PANEL 1 vs PANEL 2
+==================================================
+Date                    : {date_input}
+Hard limits             : [{LOWER_THRESHOLD}, {UPPER_THRESHOLD}] °C
+Max spread (3-4 sensors): {MAX_SPREAD_4} °C
+Max spread (2 sensors)  : {MAX_SPREAD_2} °C
+Data points (n)         : {n}
+
+DESCRIPTIVE STATISTICS:
+  Mean Panel 1 avg          : {combined_df['Panel_1_Avg'].mean():.3f} °C
+  Mean Panel 2 avg          : {combined_df['Panel_2_Avg'].mean():.3f} °C
+  Mean difference (P1 - P2) : {mean_diff:.3f} °C
+  Std deviation of diff     : {std_diff:.3f} °C
+  {diff_statement}
+
+UNCERTAINTY:
+  Instantaneous uncertainty (average SEM):
+    Panel 1: ±{combined_df['Panel_1_SEM'].mean():.3f} °C
+    Panel 2: ±{combined_df['Panel_2_SEM'].mean():.3f} °C
+  Overall uncertainty (Newey-West HAC standard error of mean diff):
+    ±{hac_se:.4f} °C
+  95% Confidence Interval for mean diff:
+    [{ci_lower:.4f}, {ci_upper:.4f}] °C
+
+INFERENTIAL STATISTICS (Newey-West HAC, lags={NW_LAGS}):
+  H0: mean difference = 0
+    t-statistic                   = {t_stat:.4f}
+    degrees of freedom (residual) = {df_adj:.2f}
+    p-value                       = {p_val:.6f}
+  {'Reject H0' if p_val < 0.05 else 'Fail to reject H0'} at alpha = 0.05.
+  -> There {"IS" if p_val < 0.05 else "is NOT"} a statistically significant mean difference.
+
+EFFECT SIZE:
+  Cohen's d (approx.) = {effect_size:.3f}  [{_effect_label(effect_size)}]
+
+REGRESSION WITH TIME TREND:
+  Change in difference per second : {time_coef:.6f} °C/s
+  p-value for time trend          : {time_p:.4f}
+  {'Significant time trend detected.' if time_p < 0.05 else 'No significant time trend.'}
+
+CONCLUSION:
+  {'Statistically and practically meaningful temperature difference.' if (p_val<0.05 and abs(effect_size)>0.2) else 'Statistically significant but negligible effect size.' if p_val<0.05 else 'No strong evidence of a meaningful temperature difference.'}
+==================================================
+"""
+    print(results_text)
+
+    # Save full report
+    full_report = report + run_summary_text + results_text
+    stats_path = os.path.join(output_dir, "statistical_comparison.txt")
+    with open(stats_path, 'w', encoding='utf-8') as f:
+        f.write(full_report)
+    print(f"Full report saved to: {stats_path}")
+
+    # ============================================================
+    # PLOTS (rendered in parallel, see render_plots)
+    # ============================================================
+    render_plots(combined_df, output_dir, mean_diff, plot_workers)
+
     # ----- Save CSV with uncertainty columns -----
-    csv_path = os.path.join(OUTPUT_DIR, "temperature_averages.csv")
+    csv_path = os.path.join(output_dir, "temperature_averages.csv")
     combined_df[[
         'DateTime',
         'Panel_1_Avg', 'Panel_1_Std', 'Panel_1_N', 'Panel_1_SEM', 'Panel_1_Status',
@@ -1226,6 +2216,166 @@ CONCLUSION:
     print(f"Averaged data (with uncertainty) saved to: {csv_path}")
     print("\nAll outputs written successfully.")
 
+    return {
+        'Date':             date_input,
+        'Files':            len(df_list),
+        'Rows':             len(combined_df),
+        'N':                n,
+        'Mean_P1':          combined_df['Panel_1_Avg'].mean(),
+        'Mean_P2':          combined_df['Panel_2_Avg'].mean(),
+        'Mean_Diff':        mean_diff,
+        'Std_Diff':         std_diff,
+        'HAC_SE':           hac_se,
+        'CI_Lower':         ci_lower,
+        'CI_Upper':         ci_upper,
+        't_stat':           t_stat,
+        'p_value':          p_val,
+        'Cohens_d':         effect_size,
+        'Trend_per_s':      time_coef,
+        'Trend_p':          time_p,
+        'P1_Dropped':       p1_summary['counts']['dropped'],
+        'P2_Dropped':       p2_summary['counts']['dropped'],
+    }
+
+
+# ============================================================
+# BATCH COMMAND LINE — many dates, no prompts
+# ============================================================
+
+def parse_date_list(dates=None, date_from=None, date_to=None):
+    """Sorted unique dd-mm-yyyy strings from an explicit list and/or an inclusive range."""
+    days = set()
+    for d in dates or []:
+        days.add(datetime.strptime(d, '%d-%m-%Y'))
+    if date_from or date_to:
+        if not (date_from and date_to):
+            raise ValueError("--from and --to must be given together")
+        day, last = datetime.strptime(date_from, '%d-%m-%Y'), datetime.strptime(date_to, '%d-%m-%Y')
+        if last < day:
+            raise ValueError(f"--to {date_to} is before --from {date_from}")
+        while day <= last:
+            days.add(day)
+            day += timedelta(days=1)
+    return [d.strftime('%d-%m-%Y') for d in sorted(days)]
+
+
+def _batch_init(config):
+    """Worker initializer for run_batch: settings from the parent, file-only plotting."""
+    apply_config(config)
+    plt.switch_backend('Agg')
+
+
+def _run_date_job(date_input, input_dir, output_root, load_workers, plot_workers=1):
+    """Run one date into <output_root>/<date>, logging its console output to run_log.txt."""
+    output_dir = os.path.join(output_root, date_input)
+    os.makedirs(output_dir, exist_ok=True)
+    log_path = os.path.join(output_dir, "run_log.txt")
+    with open(log_path, 'w', encoding='utf-8') as log, redirect_stdout(log):
+        try:
+            result = run_pipeline(date_input, input_dir, output_dir, load_workers, plot_workers)
+        except Exception as e:
+            print(f"Error: {e}")
+            traceback.print_exc(file=log)
+            return {'Date': date_input, 'Status': f"error: {e}"}
+    if result is None:
+        return {'Date': date_input, 'Status': 'no valid data (see run_log.txt)'}
+    return {'Status': 'ok', **result}
+
+
+def run_batch(dates, input_dir, output_root, workers=None):
+    """
+    Run the pipeline for every date, dates in parallel across processes.
+    Each date writes to its own folder under output_root. The headline numbers
+    of all dates are collected in <output_root>/cross_day_summary.csv, which is
+    returned as a DataFrame.
+    """
+    os.makedirs(output_root, exist_ok=True)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(dates)))
+    # Files within a date are loaded and plotted serially when the dates themselves run in parallel
+    load_workers = 1 if workers > 1 else LOAD_WORKERS
+    plot_workers = 1 if workers > 1 else PLOT_WORKERS
+
+    rows = []
+    if workers == 1:
+        plt.switch_backend('Agg')
+        for d in dates:
+            row = _run_date_job(d, input_dir, output_root, load_workers, plot_workers)
+            print(f"  {d}: {row['Status']}")
+            rows.append(row)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_batch_init,
+                                 initargs=(current_config(),)) as pool:
+            futures = [pool.submit(_run_date_job, d, input_dir, output_root, load_workers, plot_workers)
+                       for d in dates]
+            for d, future in zip(dates, futures):
+                row = future.result()
+                print(f"  {d}: {row['Status']}")
+                rows.append(row)
+
+    summary = pd.DataFrame(rows)
+    # Dates without results leave gaps in the counts; keep them integers, not 12.0
+    for col in ('Files', 'Rows', 'N', 'P1_Dropped', 'P2_Dropped'):
+        if col in summary.columns:
+            summary[col] = summary[col].astype('Int64')
+    summary_path = os.path.join(output_root, "cross_day_summary.csv")
+    summary.to_csv(summary_path, index=False)
+    print(f"\nCross-day summary saved to: {summary_path}")
+    return summary
+
+
+def batch_main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Panel temperature comparison for many dates without prompts. "
+                    "Each date is written to <output>/<dd-mm-yyyy>/.")
+    parser.add_argument('--input', required=True, help="folder with the 'dd-mm-yyyy *.xlsx' files")
+    parser.add_argument('--output', required=True, help="root output folder")
+    parser.add_argument('--dates', nargs='+', metavar='DD-MM-YYYY', help="dates to process")
+    parser.add_argument('--from', dest='date_from', metavar='DD-MM-YYYY', help="first date of a range")
+    parser.add_argument('--to', dest='date_to', metavar='DD-MM-YYYY', help="last date of a range (inclusive)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="dates processed in parallel (default: all cores)")
+    parser.add_argument('--no-cache', action='store_true', help="always re-parse the Excel files")
+    parser.add_argument('--lower-threshold',  type=float, default=LOWER_THRESHOLD)
+    parser.add_argument('--upper-threshold',  type=float, default=UPPER_THRESHOLD)
+    parser.add_argument('--max-spread-4',     type=float, default=MAX_SPREAD_4)
+    parser.add_argument('--max-spread-2',     type=float, default=MAX_SPREAD_2)
+    parser.add_argument('--min-outsider-gap', type=float, default=MIN_OUTSIDER_GAP)
+    parser.add_argument('--lag-window',       type=int,   default=LAG_WINDOW)
+    parser.add_argument('--lag-threshold',    type=float, default=LAG_THRESHOLD)
+    parser.add_argument('--nw-lags',          type=int,   default=NW_LAGS)
+    parser.add_argument('--plot-max-points',  type=int,   default=PLOT_MAX_POINTS,
+                        help="decimate time-series plots to about this many points per line")
+    args = parser.parse_args(argv)
+
+    try:
+        dates = parse_date_list(args.dates, args.date_from, args.date_to)
+    except ValueError as e:
+        parser.error(str(e))
+    if not dates:
+        parser.error("give --dates and/or --from/--to")
+    if not os.path.isdir(args.input):
+        parser.error(f"input folder not found: {args.input}")
+
+    apply_config({
+        'LOWER_THRESHOLD':  args.lower_threshold,
+        'UPPER_THRESHOLD':  args.upper_threshold,
+        'MAX_SPREAD_4':     args.max_spread_4,
+        'MAX_SPREAD_2':     args.max_spread_2,
+        'MIN_OUTSIDER_GAP': args.min_outsider_gap,
+        'LAG_WINDOW':       args.lag_window,
+        'LAG_THRESHOLD':    args.lag_threshold,
+        'NW_LAGS':          args.nw_lags,
+        'CACHE_ENABLED':    not args.no_cache,
+        'PLOT_MAX_POINTS':  args.plot_max_points,
+    })
+    print(f"Processing {len(dates)} date(s): {dates[0]} … {dates[-1]}")
+    run_batch(dates, args.input, args.output, args.workers)
+
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        batch_main()
+    else:
+        main()
@@ -3,6 +3,13 @@ import matplotlib.pyplot as plt
 import os
 from datetime import datetime
 import numpy as np
+import io
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from plotout import finish_figure, plots_enabled
+
+# Panel workbooks are loaded in parallel worker processes; 1 = one after the other
+LOAD_WORKERS = 2
 
 def get_file_path(prompt):
     """
@@ -18,6 +25,19 @@ def get_file_path(prompt):
             print(f"Error: File '{file_path}' not found.")
             print("Please make sure you enter the full path including the file extension.\n")
 
+# Date formats tried in order, each with a regex that accepts the same strings
+# as datetime.strptime does for that format (1-2 digit fields, 1+ spaces)
+_D, _MO, _Y = r'(?:3[01]|[12]\d|0[1-9]|[1-9]| [1-9])', r'(?:1[0-2]|0[1-9]|[1-9])', r'\d{4}'
+_H, _MI, _S = r'(?:2[0-3]|[01]\d|\d)', r'(?:[0-5]\d|\d)', r'(?:[0-5]\d|\d)'
+DATE_FORMATS = [
+    ('%d-%m-%Y %H:%M',    rf'{_D}-{_MO}-{_Y}\s+{_H}:{_MI}'),          # DD-MM-YYYY HH:MM
+    ('%Y-%m-%d %H:%M:%S', rf'{_Y}-{_MO}-{_D}\s+{_H}:{_MI}:{_S}'),     # YYYY-MM-DD HH:MM:SS
+    ('%d-%m-%Y',          rf'{_D}-{_MO}-{_Y}'),                       # DD-MM-YYYY
+    ('%Y-%m-%d',          rf'{_Y}-{_MO}-{_D}'),                       # YYYY-MM-DD
+    ('%m/%d/%Y %H:%M',    rf'{_MO}/{_D}/{_Y}\s+{_H}:{_MI}'),          # MM/DD/YYYY HH:MM
+    ('%Y/%m/%d %H:%M:%S', rf'{_Y}/{_MO}/{_D}\s+{_H}:{_MI}:{_S}'),     # YYYY/MM/DD HH:MM:SS
+]
+
 def parse_mixed_date(date_str):
     """
     Handle mixed date formats: DD-MM-YYYY and YYYY-MM-DD
@@ -29,16 +49,7 @@ def parse_mixed_date(date_str):
     date_str = str(date_str)
     
     # Try different date formats
-    date_formats = [
-        '%d-%m-%Y %H:%M',    # DD-MM-YYYY HH:MM
-        '%Y-%m-%d %H:%M:%S', # YYYY-MM-DD HH:MM:SS
-        '%d-%m-%Y',          # DD-MM-YYYY
-        '%Y-%m-%d',          # YYYY-MM-DD
-        '%m/%d/%Y %H:%M',    # MM/DD/YYYY HH:MM
-        '%Y/%m/%d %H:%M:%S', # YYYY/MM/DD HH:MM:SS
-    ]
-    
-    for fmt in date_formats:
+    for fmt, _ in DATE_FORMATS:
         try:
             return datetime.strptime(date_str, fmt)
         except ValueError:
@@ -47,12 +58,49 @@ def parse_mixed_date(date_str):
     # If all formats fail, return NaT
     return pd.NaT
 
-def load_sheet_data(file_path, sheet_name, panel_name):
+def parse_mixed_dates(values):
+    """
+    Vectorised parse_mixed_date for a whole column (same results, same NaT).
+
+    Each distinct string is parsed once. Strings are bucketed by the format
+    whose pattern they match, and each bucket goes through one
+    pd.to_datetime(format=...) call. Anything the buckets leave unparsed
+    falls back to parse_mixed_date, so edge cases behave exactly as before.
+    """
+    values = pd.Series(values)
+    present = values.notna().to_numpy()
+    if not present.any():
+        return values.apply(parse_mixed_date)
+
+    codes, uniques = pd.factorize(values[present].astype(str))
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[us]')
+    todo = np.ones(len(uniques), dtype=bool)
+    for fmt, pattern in DATE_FORMATS:
+        hit = todo & uniques.str.fullmatch(pattern).to_numpy(dtype=bool, na_value=False)
+        if hit.any():
+            parsed[hit] = pd.to_datetime(uniques[hit], format=fmt, errors='coerce')
+            todo &= ~hit
+
+    # Strings no bucket could parse (or that pandas rejected) take the slow path
+    left = parsed.isna().to_numpy()
+    if left.any():
+        parsed[left] = pd.to_datetime(uniques[left].map(parse_mixed_date))
+
+    # apply() infers datetime64[s] when every value is NaT; keep that dtype
+    unit = 'datetime64[us]' if parsed.notna().any() else 'datetime64[s]'
+    result = np.full(len(values), np.datetime64('NaT'), dtype=unit)
+    result[present] = parsed.to_numpy().astype(unit)[codes]
+    return pd.Series(result, index=values.index, name=values.name)
+
+def load_sheet_data(file_path, sheet_name, panel_name, df=None):
     """
-    Load data from a specific sheet and handle mixed date formats
+    Load data from a specific sheet and handle mixed date formats.
+    Pass df (the sheet already read from the workbook) to skip reading file_path again.
     """
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        if df is None:
+            df = pd.read_excel(file_path, sheet_name=sheet_name)
         print(f"Loaded {sheet_name} sheet: {len(df)} rows")
         print(f"Columns: {list(df.columns)}")
         print(f"First few date values: {df.iloc[:, 1].head().tolist()}")
@@ -78,7 +126,7 @@ def load_sheet_data(file_path, sheet_name, panel_name):
             
             # Handle mixed date formats
             print("Converting dates...")
-            clean_df['Date & Time'] = clean_df['Date & Time'].apply(parse_mixed_date)
+            clean_df['Date & Time'] = parse_mixed_dates(clean_df['Date & Time'])
             
             # Remove rows where either date or parameter value is missing
             initial_count = len(clean_df)
@@ -104,27 +152,53 @@ def load_sheet_data(file_path, sheet_name, panel_name):
 
 def load_all_data(file_path, panel_name):
     """
-    Load data from all sheets in the Excel file
+    Load data from all sheets in the Excel file.
+    The workbook is opened and parsed once; every sheet comes from that one read.
     """
     data = {}
     
-    # First, get all sheet names
+    # Read every sheet in one pass over the workbook
     try:
-        excel_file = pd.ExcelFile(file_path)
-        sheet_names = excel_file.sheet_names
-        print(f"\nSheets found in {panel_name}: {sheet_names}")
+        sheets = pd.read_excel(file_path, sheet_name=None)
+        print(f"\nSheets found in {panel_name}: {list(sheets)}")
     except Exception as e:
-        print(f"Error reading sheet names: {e}")
-        sheet_names = ['Vopen', 'Vmax', 'Imax', 'Pmax']
+        print(f"Error reading workbook: {e}")
+        sheets = {name: None for name in ['Vopen', 'Vmax', 'Imax', 'Pmax']}
     
-    for sheet_name in sheet_names:
+    for sheet_name, sheet_df in sheets.items():
         print(f"\nProcessing {sheet_name} sheet...")
-        df = load_sheet_data(file_path, sheet_name, panel_name)
+        df = load_sheet_data(file_path, sheet_name, panel_name, sheet_df)
         if not df.empty:
             data[sheet_name] = df
     
     return data
 
+def _load_all_data_job(file_path, panel_name):
+    """Run load_all_data in a worker, capturing what it prints so the parent can replay it in order."""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        data = load_all_data(file_path, panel_name)
+    return data, out.getvalue()
+
+def load_panels(panels, workers=LOAD_WORKERS):
+    """
+    load_all_data for each (file_path, panel_name) pair, in a process pool when
+    workers != 1. Returns the data dicts in the given order; each panel's
+    messages are printed in that order too, as a serial run would print them.
+    """
+    workers = max(1, min(workers or 1, len(panels)))
+    if workers == 1:
+        return [load_all_data(fp, name) for fp, name in panels]
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_load_all_data_job, fp, name) for fp, name in panels]
+        for future in futures:
+            data, messages = future.result()
+            print(messages, end='')
+            results.append(data)
+    return results
+
 def create_comparative_plots(panel1_data, panel2_data, output_folder, panel1_name, panel2_name):
     """
     Create comparative plots for all four parameters
@@ -206,7 +280,7 @@ def create_comparative_plots(panel1_data, panel2_data, output_folder, panel1_nam
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_path = os.path.join(output_folder, f'panel_comparison_{timestamp}.png')
     plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.show()
+    finish_figure()
     
     return output_path
 
@@ -233,9 +307,9 @@ def main():
     print("\nLoading data...")
     
     try:
-        # Load data from both files
-        panel1_data = load_all_data(file1_path, panel1_name)
-        panel2_data = load_all_data(file2_path, panel2_name)
+        # Load data from both files (in parallel)
+        panel1_data, panel2_data = load_panels([(file1_path, panel1_name),
+                                                (file2_path, panel2_name)])
         
         print("\nData loaded successfully!")
         print(f"Panel 1 data summary:")
@@ -247,9 +321,12 @@ def main():
             print(f"  {param}: {len(df)} data points")
         
         # Create comparative plots
-        print("\nCreating comparative graphs...")
-        plot_path = create_comparative_plots(panel1_data, panel2_data, output_folder, panel1_name, panel2_name)
-        print(f"Comparative graphs saved to: {plot_path}")
+        if plots_enabled():
+            print("\nCreating comparative graphs...")
+            plot_path = create_comparative_plots(panel1_data, panel2_data, output_folder, panel1_name, panel2_name)
+            print(f"Comparative graphs saved to: {plot_path}")
+        else:
+            print("\nPlotting skipped (PLOT_MODE=off)")
         
     except Exception as e:
         print(f"Error: {e}")
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import os
 from fnmatch import fnmatch
 from matplotlib.dates import DateFormatter
+from plotout import finish_figure, plots_enabled
 
 # Configuration
 INPUT_DIR = r"D:\\PhD\\similarity\\temperatures\\day 2"
@@ -55,6 +56,10 @@ def main():
         return
     
     combined_df = pd.concat(df_list).sort_values('DateTime')
+
+    if not plots_enabled():
+        print("Plotting skipped (PLOT_MODE=off)")
+        return
     
     # Create time-only strings for x-axis labels
     combined_df['TimeLabel'] = combined_df['DateTime'].dt.strftime('%H:%M:%S')
@@ -106,7 +111,7 @@ def main():
     # Save plot
     plot_path = os.path.join(OUTPUT_DIR, "time_plot.png")
     plt.savefig(plot_path, dpi=300, bbox_inches='tight')
-    plt.show()
+    finish_figure()
     print(f"Time plot saved to: {plot_path}")
 
 if __name__ == "__main__":
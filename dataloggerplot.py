@@ -1,5 +1,6 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from plotout import finish_figure, plots_enabled
 
 # Read Excel file
 df = pd.read_excel(r"D:\PhD\similarity\day 1 2nd.xlsx")
@@ -33,31 +34,32 @@ for i in range(11, 16):
     df[channel] = pd.to_numeric(df[channel], errors='coerce')
     df[channel] = df[channel].where((df[channel] >= 50) & (df[channel] <= 70))  # Mask values <50 or >70
 
-# Plotting
-plt.figure(figsize=(14, 8))
+if plots_enabled():
+    # Plotting
+    plt.figure(figsize=(14, 8))
 
-# Panel 1 (Channels 1-5)
-plt.subplot(2, 1, 1)
-for i in range(1, 6):
-    channel = f"Channel - {i}"
-    plt.plot(df['Timestamp'], df[channel], label=channel, marker='o', markersize=3, linestyle='-')
-plt.title('Panel 1 Temperature Data (50-70°C only)')
-plt.ylabel('Temperature (°C)')
-plt.ylim(50, 70)  # Set y-axis limits
-plt.legend()
-plt.grid(True)
-
-# Panel 2 (Channels 11-15)
-plt.subplot(2, 1, 2)
-for i in range(11, 16):
-    channel = f"Channel - {i}"
-    plt.plot(df['Timestamp'], df[channel], label=channel, marker='o', markersize=3, linestyle='-')
-plt.title('Panel 2 Temperature Data (50-70°C only)')
-plt.xlabel('Time')
-plt.ylabel('Temperature (°C)')
-plt.ylim(50, 70)  # Set y-axis limits
-plt.legend()
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
+    # Panel 1 (Channels 1-5)
+    plt.subplot(2, 1, 1)
+    for i in range(1, 6):
+        channel = f"Channel - {i}"
+        plt.plot(df['Timestamp'], df[channel], label=channel, marker='o', markersize=3, linestyle='-')
+    plt.title('Panel 1 Temperature Data (50-70°C only)')
+    plt.ylabel('Temperature (°C)')
+    plt.ylim(50, 70)  # Set y-axis limits
+    plt.legend()
+    plt.grid(True)
+
+    # Panel 2 (Channels 11-15)
+    plt.subplot(2, 1, 2)
+    for i in range(11, 16):
+        channel = f"Channel - {i}"
+        plt.plot(df['Timestamp'], df[channel], label=channel, marker='o', markersize=3, linestyle='-')
+    plt.title('Panel 2 Temperature Data (50-70°C only)')
+    plt.xlabel('Time')
+    plt.ylabel('Temperature (°C)')
+    plt.ylim(50, 70)  # Set y-axis limits
+    plt.legend()
+    plt.grid(True)
+
+    plt.tight_layout()
+    finish_figure('dataloggerplot')
@@ -1,187 +1,404 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
-from scipy.interpolate import interp1d
+import os
+import io
+import sys
+import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from ivclean import clean_curves
+from ivmetrics import curve_metrics
+from ivspline import cubic_interpolator, set_cache_dir
+from plotout import configure, finish_figure, plots_enabled
 
-# Load and process data
-df = pd.read_excel(r"D:\bricks laid\2025 bitches\forpy1.py.xlsx")
+# Workbook analysed when the script is run without arguments
+DATA_FILE = r"D:\bricks laid\2025 bitches\forpy1.py.xlsx"
 
-# ================================================
-# 1. Process Calibrated Tracer Data with Voltage Transition Check
-# ================================================
-calib_data = df[['Voltage_Calib', 'Current_Calib']].dropna()
-voltage_calib_raw = calib_data['Voltage_Calib'].values
-current_calib_raw = calib_data['Current_Calib'].values * 1000  # mA to A
-
-# Identify where voltage drops rapidly below 1V from above 10V
-voltage_diff = np.diff(voltage_calib_raw)
-abrupt_drop_indices = np.where((voltage_calib_raw[:-1] > 10) & (voltage_calib_raw[1:] < 1))[0]
-
-if len(abrupt_drop_indices) > 0:
-    cutoff_idx = abrupt_drop_indices[0]
-    print(f"Warning: Found abrupt voltage drop at index {cutoff_idx} (from {voltage_calib_raw[cutoff_idx]:.2f}V to {voltage_calib_raw[cutoff_idx+1]:.2f}V)")
-    voltage_calib = voltage_calib_raw[:cutoff_idx+1]
-    current_calib = current_calib_raw[:cutoff_idx+1]
-else:
-    voltage_calib = voltage_calib_raw
-    current_calib = current_calib_raw
-
-# Further filter out any remaining low-voltage regions with current climbing
-low_voltage_mask = (voltage_calib >= 1) | (current_calib < np.percentile(current_calib[voltage_calib >= 1], 90))
-voltage_calib = voltage_calib[low_voltage_mask]
-current_calib = current_calib[low_voltage_mask]
+# Also drop points where the calibrated voltage sweeps backwards (off keeps the original cleaning)
+ENFORCE_MONOTONIC = False
+
+# Folder where large spline fits are kept between runs (None = memory only)
+SPLINE_CACHE_DIR = None
+
+CALIB_COLUMNS   = ['Voltage_Calib', 'Current_Calib']
+UNCALIB_COLUMNS = ['Voltage_Uncalib', 'Current_Uncalib']
+
+
+def _read_table(path):
+    """An .xlsx/.xls workbook (first sheet) or a .csv file as a DataFrame."""
+    if path.lower().endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_excel(path)
 
-# ================================================
-# 2. Process Uncalibrated Tracer Data
-# ================================================
-uncalib_data = df[['Voltage_Uncalib', 'Current_Uncalib']].dropna()
-voltage_uncalib = uncalib_data['Voltage_Uncalib'].values
-current_uncalib = uncalib_data['Current_Uncalib'].values
+
+def load_pair(calib_path, uncalib_path=None):
+    """
+    Raw calibrated and uncalibrated curves. Both come from one workbook with
+    all four columns, or the calibrated columns from calib_path and the
+    uncalibrated ones from uncalib_path.
+    """
+    df_calib = _read_table(calib_path)
+    df_uncalib = df_calib if uncalib_path is None else _read_table(uncalib_path)
+
+    calib_data = df_calib[CALIB_COLUMNS].dropna()
+    voltage_calib_raw = calib_data['Voltage_Calib'].values
+    current_calib_raw = calib_data['Current_Calib'].values * 1000  # mA to A
+
+    uncalib_data = df_uncalib[UNCALIB_COLUMNS].dropna()
+    voltage_uncalib = uncalib_data['Voltage_Uncalib'].values
+    current_uncalib = uncalib_data['Current_Uncalib'].values
+
+    return voltage_calib_raw, current_calib_raw, voltage_uncalib, current_uncalib
 
 # ================================================
-# 3. Data Validation
+# 1. Process Calibrated Tracer Data with Voltage Transition Check
 # ================================================
-print(f"\nCalibrated data points (after cleaning): {len(voltage_calib)}")
-print(f"Uncalibrated data points: {len(voltage_uncalib)}")
+def clean_calibrated(voltage_calib_raw, current_calib_raw):
+    """
+    Abrupt-drop truncation, optional monotonic voltage and the low-voltage
+    current-climb filter (see ivclean.py). Returns the kept voltage and
+    current, and the one-row cleaning report.
+    """
+    keep, report = clean_curves(voltage_calib_raw, current_calib_raw, monotonic=ENFORCE_MONOTONIC)
+    keep = keep[0]
+
+    cutoff_idx = report['Drop index'].iloc[0]
+    if cutoff_idx >= 0:
+        print(f"Warning: Found abrupt voltage drop at index {cutoff_idx} (from {voltage_calib_raw[cutoff_idx]:.2f}V to {voltage_calib_raw[cutoff_idx+1]:.2f}V)")
 
-if len(voltage_calib) == 0 or len(voltage_uncalib) == 0:
-    raise ValueError("One or both datasets are empty after cleaning")
+    return voltage_calib_raw[keep], current_calib_raw[keep], report.iloc[0]
 
 # ================================================
 # 4. Calculate Key Parameters
 # ================================================
 def calculate_iv_parameters(voltage, current, name):
-    power = voltage * current
-    
-    max_power_idx = np.argmax(power)
+    # Isc/Voc are interpolated at the zero crossings (see ivmetrics.py)
+    m = curve_metrics(voltage, current)
     results = {
-        'Pmax': power[max_power_idx],
-        'Vmax': voltage[max_power_idx],
-        'Imax': current[max_power_idx],
-        'Isc': current[np.argmin(voltage)],
-        'Voc': voltage[np.argmin(current)]
+        'Pmax': m['Pmax'],
+        'Vmax': m['Vmpp'],
+        'Imax': m['Impp'],
+        'Isc': m['Isc'],
+        'Voc': m['Voc'],
+        'FF': m['FF']
     }
-    
+
     print(f"\n=== {name.upper()} RESULTS ===")
     print(f"Maximum Power (Pmax): {results['Pmax']:.4f} W")
     print(f"Voltage at Pmax (Vmax): {results['Vmax']:.4f} V")
     print(f"Current at Pmax (Imax): {results['Imax']:.4f} A")
     print(f"Short Circuit Current (Isc): {results['Isc']:.4f} A")
     print(f"Open Circuit Voltage (Voc): {results['Voc']:.4f} V")
-    
-    return results
+    print(f"Fill Factor (FF): {results['FF']:.4f}")
 
-calib_results = calculate_iv_parameters(voltage_calib, current_calib, "CALIBRATED")
-uncalib_results = calculate_iv_parameters(voltage_uncalib, current_uncalib, "UNCALIBRATED")
+    return results
 
 # ================================================
 # 5. Interpolation and Improved Error Analysis
 # ================================================
-interp_func = interp1d(
-    voltage_uncalib, 
-    current_uncalib, 
-    kind='cubic',
-    bounds_error=False,
-    fill_value=(current_uncalib[0], current_uncalib[-1])
-)
-
-interpolated_current = interp_func(voltage_calib)
-
-# Calculate absolute error (in Amperes)
-absolute_error = np.abs(interpolated_current - current_calib)
-
-# Get key parameters from calibrated data
-Isc = calib_results['Isc']
-Pmax = calib_results['Pmax']
-Vmax = calib_results['Vmax']
-Voc = calib_results['Voc']
-
-# Define regions
-mpp_mask = (voltage_calib > 0.7*Vmax) & (voltage_calib < 0.6*Voc)
-isc_mask = voltage_calib < 0.1*Voc
-voc_mask = voltage_calib > 0.6*Voc
-
-# Calculate different error metrics for each region
-with np.errstate(divide='ignore', invalid='ignore'):
-    # MPP region - standard relative error
-    mpp_error = np.zeros_like(voltage_calib)
-    mpp_error[mpp_mask] = (absolute_error[mpp_mask] / current_calib[mpp_mask]) * 100
-    
-    # ISC region - error relative to Isc
-    isc_error = np.zeros_like(voltage_calib)
-    isc_error[isc_mask] = (absolute_error[isc_mask] / Isc) * 100
-    
-    # VOC region - absolute error in A (changed from mA)
-    voc_error = absolute_error.copy()  *.001 # Now in Amperes
-    
-    # Combined weighted error (emphasize MPP region)
-    combined_error = np.where(
-        mpp_mask, 
-        mpp_error,  # Full weight to MPP region
-        np.where(
-            isc_mask,
-            isc_error * 0.5,  # Half weight to ISC region
-            voc_error * 0.2    # Low weight to VOC region
-        )
+def _region_stats(values, mask):
+    """(mean, max) of values[mask], NaN for an empty region."""
+    if not mask.any():
+        return np.nan, np.nan
+    return np.mean(values[mask]), np.max(values[mask])
+
+def analyse_errors(voltage_calib, current_calib, voltage_uncalib, current_uncalib, calib_results):
+    """
+    Interpolate the uncalibrated curve at the calibrated voltages and compute
+    the MPP / ISC / VOC region errors. Returns the arrays needed for plotting
+    plus the summary statistics.
+    """
+    # Cubic spline, fitted once per uncalibrated curve (see ivspline.py)
+    interp_func = cubic_interpolator(
+        voltage_uncalib,
+        current_uncalib,
+        fill_value=(current_uncalib[0], current_uncalib[-1])
     )
 
-# Calculate statistics on valid points only
-valid_mask = ~np.isnan(combined_error)
-mean_abs_error = np.mean(absolute_error[valid_mask])
-mean_combined_error = np.mean(combined_error[valid_mask])
-max_combined_error = np.max(combined_error[valid_mask])
+    interpolated_current = interp_func(voltage_calib)
+
+    # Calculate absolute error (in Amperes)
+    absolute_error = np.abs(interpolated_current - current_calib)
+
+    # Get key parameters from calibrated data
+    Isc = calib_results['Isc']
+    Vmax = calib_results['Vmax']
+    Voc = calib_results['Voc']
+
+    # Define regions
+    mpp_mask = (voltage_calib > 0.7*Vmax) & (voltage_calib < 0.6*Voc)
+    isc_mask = voltage_calib < 0.1*Voc
+    voc_mask = voltage_calib > 0.6*Voc
+
+    # Calculate different error metrics for each region
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # MPP region - standard relative error
+        mpp_error = np.zeros_like(voltage_calib)
+        mpp_error[mpp_mask] = (absolute_error[mpp_mask] / current_calib[mpp_mask]) * 100
+
+        # ISC region - error relative to Isc
+        isc_error = np.zeros_like(voltage_calib)
+        isc_error[isc_mask] = (absolute_error[isc_mask] / Isc) * 100
+
+        # VOC region - absolute error in A (changed from mA)
+        voc_error = absolute_error.copy()  *.001 # Now in Amperes
+
+        # Combined weighted error (emphasize MPP region)
+        combined_error = np.where(
+            mpp_mask,
+            mpp_error,  # Full weight to MPP region
+            np.where(
+                isc_mask,
+                isc_error * 0.5,  # Half weight to ISC region
+                voc_error * 0.2    # Low weight to VOC region
+            )
+        )
+
+    # Calculate statistics on valid points only
+    valid_mask = ~np.isnan(combined_error)
+    stats = {
+        'Valid points': int(valid_mask.sum()),
+        'Mean abs error': np.mean(absolute_error[valid_mask]),
+        'Combined mean': np.mean(combined_error[valid_mask]),
+        'Combined max': np.max(combined_error[valid_mask]) if valid_mask.any() else np.nan,
+    }
+    for region, err, mask in [('MPP', mpp_error, mpp_mask), ('ISC', isc_error, isc_mask),
+                              ('VOC', voc_error, voc_mask)]:
+        stats[f'{region} mean'], stats[f'{region} max'] = _region_stats(err, mask)
+
+    return {
+        'interpolated_current': interpolated_current, 'absolute_error': absolute_error,
+        'mpp_mask': mpp_mask, 'isc_mask': isc_mask, 'voc_mask': voc_mask,
+        'mpp_error': mpp_error, 'isc_error': isc_error, 'voc_error': voc_error,
+        'combined_error': combined_error, 'valid_mask': valid_mask, 'stats': stats,
+    }
 
 # ================================================
 # 6. Plotting
 # ================================================
-plt.figure(figsize=(14, 6))
-
-# IV Curve Plot
-plt.subplot(1, 2, 1)
-plt.plot(voltage_calib, current_calib, 'b-', label='Calibrated (Cleaned)')
-plt.plot(voltage_uncalib, current_uncalib, 'ro', label='Uncalibrated (Raw)')
-plt.plot(voltage_calib, interpolated_current, 'g--', label='Uncalibrated (Interpolated)')
-
-# Highlight regions
-plt.axvspan(0.7*Vmax, 1.3*Vmax, alpha=0.1, color='green', label='MPP Region')
-plt.axvspan(0, 0.1*Voc, alpha=0.1, color='red', label='ISC Region')
-plt.axvspan(0.9*Voc, max(voltage_calib), alpha=0.1, color='blue', label='VOC Region')
-
-plt.xlabel('Voltage (V)')
-plt.ylabel('Current (mA)')
-plt.title('IV Curve with Analysis Regions')
-plt.legend()
-plt.grid(True)
-
-# Error Plot
-plt.subplot(1, 2, 2)
-plt.plot(voltage_calib[mpp_mask], mpp_error[mpp_mask], 'g-', label='MPP Error (%)')
-plt.plot(voltage_calib[isc_mask], isc_error[isc_mask], 'r-', label='ISC Error (% of Isc)')
-plt.plot(voltage_calib[voc_mask], voc_error[voc_mask], 'b-', label='VOC Error (A)')  # Changed from mA to A
-plt.plot(voltage_calib, combined_error, 'k--', label='Combined Weighted Error', linewidth=1)
-plt.axhline(y=5, color='gray', linestyle='--', label='5% Threshold')
-plt.xlabel('Voltage (V)')
-plt.ylabel('Error')
-plt.title('Region-Specific Error Analysis')
-plt.legend()
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
+def plot_analysis(voltage_calib, current_calib, voltage_uncalib, current_uncalib,
+                  calib_results, a, save_path=None):
+    """Curves and region errors side by side, ended by plotout (save_path overrides the default file name)."""
+    Vmax, Voc = calib_results['Vmax'], calib_results['Voc']
+    mpp_mask, isc_mask, voc_mask = a['mpp_mask'], a['isc_mask'], a['voc_mask']
+
+    plt.figure(figsize=(14, 6))
+
+    # IV Curve Plot
+    plt.subplot(1, 2, 1)
+    plt.plot(voltage_calib, current_calib, 'b-', label='Calibrated (Cleaned)')
+    plt.plot(voltage_uncalib, current_uncalib, 'ro', label='Uncalibrated (Raw)')
+    plt.plot(voltage_calib, a['interpolated_current'], 'g--', label='Uncalibrated (Interpolated)')
+
+    # Highlight regions
+    plt.axvspan(0.7*Vmax, 1.3*Vmax, alpha=0.1, color='green', label='MPP Region')
+    plt.axvspan(0, 0.1*Voc, alpha=0.1, color='red', label='ISC Region')
+    plt.axvspan(0.9*Voc, max(voltage_calib), alpha=0.1, color='blue', label='VOC Region')
+
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Current (mA)')
+    plt.title('IV Curve with Analysis Regions')
+    plt.legend()
+    plt.grid(True)
+
+    # Error Plot
+    plt.subplot(1, 2, 2)
+    plt.plot(voltage_calib[mpp_mask], a['mpp_error'][mpp_mask], 'g-', label='MPP Error (%)')
+    plt.plot(voltage_calib[isc_mask], a['isc_error'][isc_mask], 'r-', label='ISC Error (% of Isc)')
+    plt.plot(voltage_calib[voc_mask], a['voc_error'][voc_mask], 'b-', label='VOC Error (A)')  # Changed from mA to A
+    plt.plot(voltage_calib, a['combined_error'], 'k--', label='Combined Weighted Error', linewidth=1)
+    plt.axhline(y=5, color='gray', linestyle='--', label='5% Threshold')
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Error')
+    plt.title('Region-Specific Error Analysis')
+    plt.legend()
+    plt.grid(True)
+
+    plt.tight_layout()
+    finish_figure(save_path or 'error_analysis')
 
 # ================================================
 # 7. Results Output
 # ================================================
-print("\n===== COMPREHENSIVE ERROR ANALYSIS =====")
-print(f"Valid data points: {sum(valid_mask)}/{len(voltage_calib)}")
-print(f"\n--- Absolute Errors ---")
-print(f"Mean Absolute Error: {mean_abs_error:.4f} A")  # Changed from mA to A
-
-print(f"\n--- Region-Specific Errors ---")
-print(f"MPP Region (Relative): Mean = {np.mean(mpp_error[mpp_mask]):.2f}%, Max = {np.max(mpp_error[mpp_mask]):.2f}%")
-print(f"ISC Region (% of Isc): Mean = {np.mean(isc_error[isc_mask]):.2f}%, Max = {np.max(isc_error[isc_mask]):.2f}%")
-print(f"VOC Region (Absolute): Mean = {np.mean(voc_error[voc_mask]):.4f} A, Max = {np.max(voc_error[voc_mask]):.4f} A")  # Changed from mA to A
-
-print(f"\n--- Combined Weighted Error ---")
-print(f"Mean: {mean_combined_error:.2f}")
-print(f"Max: {max_combined_error:.2f}")
+def print_report(a, n_calib):
+    s = a['stats']
+    print("\n===== COMPREHENSIVE ERROR ANALYSIS =====")
+    print(f"Valid data points: {s['Valid points']}/{n_calib}")
+    print(f"\n--- Absolute Errors ---")
+    print(f"Mean Absolute Error: {s['Mean abs error']:.4f} A")  # Changed from mA to A
+
+    print(f"\n--- Region-Specific Errors ---")
+    print(f"MPP Region (Relative): Mean = {s['MPP mean']:.2f}%, Max = {s['MPP max']:.2f}%")
+    print(f"ISC Region (% of Isc): Mean = {s['ISC mean']:.2f}%, Max = {s['ISC max']:.2f}%")
+    print(f"VOC Region (Absolute): Mean = {s['VOC mean']:.4f} A, Max = {s['VOC max']:.4f} A")  # Changed from mA to A
+
+    print(f"\n--- Combined Weighted Error ---")
+    print(f"Mean: {s['Combined mean']:.2f}")
+    print(f"Max: {s['Combined max']:.2f}")
+
+
+def analyse_pair(calib_path, uncalib_path=None, plot_path=None):
+    """
+    The full analysis for one calibrated/uncalibrated pair: clean, parameters,
+    interpolation, region errors and the figure (plot_path=False skips it,
+    a path saves it there, None leaves it to the plot mode).
+    Returns (calib_results, uncalib_results, analysis, cleaning report).
+    """
+    voltage_calib_raw, current_calib_raw, voltage_uncalib, current_uncalib = load_pair(calib_path, uncalib_path)
+    voltage_calib, current_calib, cleaning = clean_calibrated(voltage_calib_raw, current_calib_raw)
+
+    # ================================================
+    # 3. Data Validation
+    # ================================================
+    print(f"\nCalibrated data points (after cleaning): {len(voltage_calib)}")
+    print(f"Uncalibrated data points: {len(voltage_uncalib)}")
+
+    if len(voltage_calib) == 0 or len(voltage_uncalib) == 0:
+        raise ValueError("One or both datasets are empty after cleaning")
+
+    calib_results = calculate_iv_parameters(voltage_calib, current_calib, "CALIBRATED")
+    uncalib_results = calculate_iv_parameters(voltage_uncalib, current_uncalib, "UNCALIBRATED")
+
+    a = analyse_errors(voltage_calib, current_calib, voltage_uncalib, current_uncalib, calib_results)
+    if plot_path is not False:
+        plot_analysis(voltage_calib, current_calib, voltage_uncalib, current_uncalib,
+                      calib_results, a, plot_path)
+    return calib_results, uncalib_results, a, cleaning
+
+
+def main():
+    set_cache_dir(SPLINE_CACHE_DIR)
+    _, _, a, cleaning = analyse_pair(DATA_FILE, plot_path=None if plots_enabled() else False)
+    print_report(a, cleaning['Kept'])
+
+# ================================================
+# 8. Batch Mode (many pairs, no plt.show)
+# ================================================
+def find_pairs(directory, exclude=()):
+    """
+    Every workbook/CSV in directory holding all four columns, as (name, path,
+    None) pairs. Paths in exclude (e.g. the batch's own output table) are skipped.
+    """
+    skip = {os.path.normcase(os.path.abspath(p)) for p in exclude if p}
+    pairs = []
+    for fn in sorted(os.listdir(directory)):
+        path = os.path.join(directory, fn)
+        if os.path.normcase(os.path.abspath(path)) in skip:
+            continue
+        if fn.lower().endswith(('.xlsx', '.xls', '.csv')) and not fn.startswith('~$'):
+            pairs.append((os.path.splitext(fn)[0], path, None))
+    return pairs
+
+
+def read_manifest(path):
+    """
+    Pairs from a CSV manifest with a 'calibrated' column, an optional
+    'uncalibrated' column (separate file) and an optional 'name' column.
+    Relative paths are taken relative to the manifest.
+    """
+    manifest = pd.read_csv(path)
+    base = os.path.dirname(os.path.abspath(path))
+    resolve = lambda p: p if os.path.isabs(p) else os.path.join(base, p)
+    pairs = []
+    for _, row in manifest.iterrows():
+        calib = resolve(str(row['calibrated']))
+        uncalib = row.get('uncalibrated')
+        uncalib = resolve(str(uncalib)) if isinstance(uncalib, str) and uncalib.strip() else None
+        name = row.get('name')
+        name = str(name) if isinstance(name, str) and name.strip() else os.path.splitext(os.path.basename(calib))[0]
+        pairs.append((name, calib, uncalib))
+    return pairs
+
+
+def _pair_job(name, calib_path, uncalib_path, plot_dir):
+    """One row of the consolidated table; the console output of the analysis is discarded."""
+    row = {'Pair': name, 'Calibrated': calib_path, 'Uncalibrated': uncalib_path or calib_path}
+    plot_path = os.path.join(plot_dir, f"{name}.png") if plot_dir else False
+    try:
+        with redirect_stdout(io.StringIO()):
+            calib, uncalib, a, cleaning = analyse_pair(calib_path, uncalib_path, plot_path)
+    except Exception as e:
+        row['Status'] = f"error: {e}"
+        return row
+    row['Status'] = 'ok'
+    row.update({f'Calib {k.lower()}': int(v) for k, v in cleaning.items()})
+    row.update({f'Calib {k}': v for k, v in calib.items()})
+    row.update({f'Uncalib {k}': v for k, v in uncalib.items()})
+    row.update(a['stats'])
+    return row
+
+
+def _batch_init(spline_cache_dir=None):
+    """Worker initializer for run_batch: file-only plotting, shared spline disk cache."""
+    configure(mode='save')
+    set_cache_dir(spline_cache_dir)
+
+
+def run_batch(pairs, output_csv, workers=None, plot_dir=None, spline_cache_dir=None):
+    """
+    Analyse every (name, calibrated path, uncalibrated path or None) pair in a
+    process pool and write one row per pair (parameters, mean/max error per
+    region) to output_csv. Figures are saved to plot_dir when given.
+    Returns the table as a DataFrame.
+    """
+    if plot_dir:
+        os.makedirs(plot_dir, exist_ok=True)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(pairs)))
+
+    rows = []
+    if workers == 1:
+        _batch_init(spline_cache_dir)
+        for name, calib, uncalib in pairs:
+            rows.append(_pair_job(name, calib, uncalib, plot_dir))
+            print(f"  {name}: {rows[-1]['Status']}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_batch_init,
+                                 initargs=(spline_cache_dir,)) as pool:
+            futures = [pool.submit(_pair_job, name, calib, uncalib, plot_dir)
+                       for name, calib, uncalib in pairs]
+            for (name, _, _), future in zip(pairs, futures):
+                rows.append(future.result())
+                print(f"  {name}: {rows[-1]['Status']}")
+
+    table = pd.DataFrame(rows)
+    table.to_csv(output_csv, index=False)
+    print(f"\nError table saved to: {output_csv}")
+    return table
+
+
+def batch_main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Calibrated vs uncalibrated error analysis for many curve pairs, "
+                    "written to one table (no interactive plots).")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--dir', help="folder of workbooks/CSVs, each with all four columns")
+    source.add_argument('--manifest', help="CSV with 'calibrated' [, 'uncalibrated', 'name'] columns")
+    parser.add_argument('--output', required=True, help="consolidated error table (.csv)")
+    parser.add_argument('--plots', metavar='DIR', help="also save one figure per pair here")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="pairs analysed in parallel (default: all cores)")
+    parser.add_argument('--spline-cache', metavar='DIR', default=SPLINE_CACHE_DIR,
+                        help="keep large spline fits here between runs")
+    args = parser.parse_args(argv)
+
+    if args.dir:
+        if not os.path.isdir(args.dir):
+            parser.error(f"folder not found: {args.dir}")
+        pairs = find_pairs(args.dir, exclude=[args.output])
+    else:
+        pairs = read_manifest(args.manifest)
+    if not pairs:
+        parser.error("no curve pairs found")
+
+    print(f"Analysing {len(pairs)} pairs...")
+    run_batch(pairs, args.output, args.workers, args.plots, args.spline_cache)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        batch_main()
+    else:
+        main()
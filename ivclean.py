@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+# Defaults of the calibrated-tracer cleaning in error.py
+DROP_FROM        = 10.0   # V: a step from above this...
+DROP_TO          = 1.0    # V: ...to below this ends the sweep
+LOW_VOLTAGE      = 1.0    # V: below this the current must not climb...
+CLIMB_PERCENTILE = 90     # ...above this percentile of the current at >= LOW_VOLTAGE
+
+
+def _row_percentile(values, valid, q):
+    """
+    np.percentile(row[valid], q) (linear method) for every row at once;
+    NaN for rows with no valid values.
+    """
+    if values.shape[1] == 0:
+        return np.full(len(values), np.nan)
+    data = np.sort(np.where(valid, values, np.nan), axis=1)   # NaN sorts last
+    n = valid.sum(axis=1)
+    pos = (n - 1) * (q / 100.0)
+    lo = np.floor(pos).astype(np.intp).clip(0)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+    rows = np.arange(len(data))
+    a, b = data[rows, lo], data[rows, hi]
+    t = pos - np.floor(pos)
+    # Same two-sided lerp as numpy, so results match np.percentile exactly
+    diff = b - a
+    out = np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+    return np.where(n > 0, out, np.nan)
+
+
+def clean_curves(V, I, lengths=None, monotonic=True, drop_from=DROP_FROM, drop_to=DROP_TO,
+                 low_voltage=LOW_VOLTAGE, climb_percentile=CLIMB_PERCENTILE):
+    """
+    Clean a batch of calibrated IV sweeps at once.
+
+    V, I:    (n_curves, n_points) arrays, NaN-padded (see ivmetrics.pad_curves)
+    lengths: number of real points per curve; defaults to every finite point
+
+    Applied in order, each as a mask over the whole batch:
+      1. abrupt drop   - cut everything after the first step from above
+                         drop_from to below drop_to volts (the tracer resetting)
+      2. monotonicity  - if monotonic, cut points whose voltage falls below
+                         the highest voltage already reached
+      3. current climb - below low_voltage, keep only points whose current is
+                         under the climb_percentile of the current at or
+                         above low_voltage
+
+    Returns (keep, report): keep is a boolean array shaped like V, and report
+    is a DataFrame with one row per curve: Points, Drop index (-1 if none),
+    Cut drop, Cut monotonic, Cut climb, Kept.
+    """
+    V = np.atleast_2d(np.asarray(V, dtype=float))
+    I = np.atleast_2d(np.asarray(I, dtype=float))
+    n, width = V.shape
+    valid = np.isfinite(V) & np.isfinite(I)
+    if lengths is not None:
+        valid &= np.arange(width) < np.asarray(lengths)[:, None]
+    cols = np.arange(width)
+
+    # 1. Abrupt drop: keep up to and including the last point before it
+    if width > 1:
+        step = valid[:, :-1] & valid[:, 1:] & (V[:, :-1] > drop_from) & (V[:, 1:] < drop_to)
+        has_drop = step.any(axis=1)
+        drop_idx = np.where(has_drop, np.argmax(step, axis=1), -1)
+    else:   # fewer than two points: nothing to drop from
+        has_drop = np.zeros(n, dtype=bool)
+        drop_idx = np.full(n, -1)
+    keep = valid & ~(has_drop[:, None] & (cols > drop_idx[:, None]))
+    cut_drop = valid.sum(axis=1) - keep.sum(axis=1)
+
+    # 2. Monotonic voltage: compare with the running maximum of the kept points
+    cut_mono = np.zeros(n, dtype=np.intp)
+    if monotonic:
+        running = np.fmax.accumulate(np.where(keep, V, np.nan), axis=1)
+        mono = keep & (V >= running)
+        cut_mono = keep.sum(axis=1) - mono.sum(axis=1)
+        keep = mono
+
+    # 3. Low-voltage current climb
+    above = keep & (V >= low_voltage)
+    threshold = _row_percentile(I, above, climb_percentile)
+    with np.errstate(invalid='ignore'):
+        climb = keep & (above | (I < threshold[:, None]))
+    cut_climb = keep.sum(axis=1) - climb.sum(axis=1)
+    keep = climb
+
+    report = pd.DataFrame({
+        'Points': valid.sum(axis=1),
+        'Drop index': drop_idx,
+        'Cut drop': cut_drop,
+        'Cut monotonic': cut_mono,
+        'Cut climb': cut_climb,
+        'Kept': keep.sum(axis=1),
+    })
+    return keep, report
+
+
+def compact(V, I, keep):
+    """
+    Move the kept points of each row to the front, in their original order.
+    Returns NaN-padded (V, I, lengths) ready for ivmetrics.iv_metrics.
+    """
+    V = np.atleast_2d(np.asarray(V, dtype=float))
+    I = np.atleast_2d(np.asarray(I, dtype=float))
+    order = np.argsort(~keep, axis=1, kind='stable')
+    lengths = keep.sum(axis=1)
+    width = int(lengths.max()) if len(lengths) else 0
+    filled = np.arange(width) < lengths[:, None]
+    Vc = np.where(filled, np.take_along_axis(V, order, axis=1)[:, :width], np.nan)
+    Ic = np.where(filled, np.take_along_axis(I, order, axis=1)[:, :width], np.nan)
+    return Vc, Ic, lengths
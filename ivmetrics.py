@@ -0,0 +1,121 @@
+import numpy as np
+
+
+def pad_curves(voltages, currents):
+    """
+    Stack ragged curves into NaN-padded 2-D arrays.
+    voltages, currents: sequences of 1-D arrays (one pair per curve).
+    Returns V, I of shape (n_curves, longest) and lengths of shape (n_curves,).
+    """
+    lengths = np.array([len(v) for v in voltages], dtype=np.intp)
+    width = int(lengths.max()) if len(lengths) else 0
+    filled = np.arange(width) < lengths[:, None]
+    V = np.full((len(lengths), width), np.nan)
+    I = np.full((len(lengths), width), np.nan)
+    if len(lengths):
+        V[filled] = np.concatenate([np.asarray(v, dtype=float) for v in voltages])
+        I[filled] = np.concatenate([np.asarray(i, dtype=float) for i in currents])
+    return V, I, lengths
+
+
+def pad_samples(samples, v_col='V (V)', i_col='I (A)'):
+    """pad_curves for samples read with ivparser's points=True (samples without a table give length 0)."""
+    voltages, currents = [], []
+    for s in samples:
+        cols = s.get('columns', [])
+        if s['data'].size and v_col in cols and i_col in cols:
+            voltages.append(s['data'][:, cols.index(v_col)])
+            currents.append(s['data'][:, cols.index(i_col)])
+        else:
+            voltages.append(np.empty(0))
+            currents.append(np.empty(0))
+    return pad_curves(voltages, currents)
+
+
+def _zero_crossing(x, y, valid):
+    """
+    For each row, y linearly interpolated where x crosses zero between two
+    consecutive valid points (the first such crossing in sample order).
+    Returns (value, found); value is NaN where no crossing exists.
+    """
+    if x.shape[1] < 2:
+        return np.full(len(x), np.nan), np.zeros(len(x), dtype=bool)
+    a, b = x[:, :-1], x[:, 1:]
+    pair = valid[:, :-1] & valid[:, 1:]
+    cross = pair & (a * b <= 0)
+    found = cross.any(axis=1)
+    k = np.argmax(cross, axis=1)
+    rows = np.arange(len(x))
+    xa, xb = a[rows, k], b[rows, k]
+    ya, yb = y[rows, k], y[rows, k + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(xb != xa, -xa / (xb - xa), 0.0)
+    value = np.where(found, ya + t * (yb - ya), np.nan)
+    return value, found
+
+
+def iv_metrics(V, I, lengths=None):
+    """
+    Pmax, Vmpp, Impp, Isc, Voc and fill factor for every curve at once.
+
+    V, I:    (n_curves, n_points) arrays, NaN-padded (see pad_curves)
+    lengths: number of real points per curve; defaults to using every
+             finite point
+
+    Isc is I interpolated linearly where V crosses 0, and Voc is V interpolated
+    where I crosses 0, between the two samples on either side. A curve that
+    never crosses zero falls back to the old nearest-sample rule (I at the
+    lowest V, V at the lowest I); Isc_interpolated / Voc_interpolated say
+    which rule was used. There is no extrapolation: for a sweep that starts
+    above 0 V, Isc is the current at the first voltage, not at 0 V.
+    Curves with no valid points give NaN throughout.
+
+    Returns a dict of 1-D arrays, one value per curve.
+    """
+    V = np.atleast_2d(np.asarray(V, dtype=float))
+    I = np.atleast_2d(np.asarray(I, dtype=float))
+    n, width = V.shape
+    if width == 0:
+        nan, no = np.full(n, np.nan), np.zeros(n, dtype=bool)
+        return {'Pmax': nan, 'Vmpp': nan.copy(), 'Impp': nan.copy(),
+                'Isc': nan.copy(), 'Voc': nan.copy(), 'FF': nan.copy(),
+                'Isc_interpolated': no, 'Voc_interpolated': no.copy()}
+    valid = np.isfinite(V) & np.isfinite(I)
+    if lengths is not None:
+        valid &= np.arange(width) < np.asarray(lengths)[:, None]
+    has_points = valid.any(axis=1)
+    rows = np.arange(n)
+
+    # Maximum power point
+    P = np.where(valid, V * I, -np.inf)
+    k_mpp = np.argmax(P, axis=1)
+    Pmax = np.where(has_points, P[rows, k_mpp], np.nan)
+    Vmpp = np.where(has_points, V[rows, k_mpp], np.nan)
+    Impp = np.where(has_points, I[rows, k_mpp], np.nan)
+
+    # Isc: I at V = 0; fallback I at the lowest voltage
+    Isc, isc_interp = _zero_crossing(V, I, valid)
+    k_vmin = np.argmin(np.where(valid, V, np.inf), axis=1)
+    Isc = np.where(isc_interp, Isc, np.where(has_points, I[rows, k_vmin], np.nan))
+
+    # Voc: V at I = 0; fallback V at the lowest current
+    Voc, voc_interp = _zero_crossing(I, V, valid)
+    k_imin = np.argmin(np.where(valid, I, np.inf), axis=1)
+    Voc = np.where(voc_interp, Voc, np.where(has_points, V[rows, k_imin], np.nan))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        FF = Pmax / (Voc * Isc)
+    FF = np.where(np.isfinite(FF), FF, np.nan)
+
+    return {
+        'Pmax': Pmax, 'Vmpp': Vmpp, 'Impp': Impp,
+        'Isc': Isc, 'Voc': Voc, 'FF': FF,
+        'Isc_interpolated': isc_interp, 'Voc_interpolated': voc_interp,
+    }
+
+
+def curve_metrics(voltage, current):
+    """iv_metrics for a single curve, as a dict of floats (plus the two interpolation flags)."""
+    m = iv_metrics(np.asarray(voltage, dtype=float)[None, :],
+                   np.asarray(current, dtype=float)[None, :])
+    return {k: (bool(v[0]) if v.dtype == bool else float(v[0])) for k, v in m.items()}
@@ -0,0 +1,197 @@
+import csv
+import os
+import re
+from array import array
+
+import numpy as np
+
+# Markers used by the IV tracer CSV exports
+SAMPLE_KEY   = 'Sample No.'   # first field of the line that starts a new sample
+TABLE_HEADER = 'V (V)'        # first field of the "V (V)","I (A)","P (W)" header
+MISSING      = '-------'      # the tracer's "no value" sentinel
+BOMS         = ('\ufeff', 'ï»¿')   # UTF-8 BOM, and the same bytes misread as cp1252
+
+# Older exports start a sample with "Sample 3" / "Sample: 3" instead of "Sample No.,3"
+SAMPLE_LINE  = re.compile(r'^sample(?:\s*no\.?)?\s*[:-]?\s*(\d*)$', re.IGNORECASE)
+
+
+def split_fields(line):
+    """
+    Split one stripped line into fields. Tab-separated lines are split on tabs,
+    everything else as CSV, so quoted and unquoted exports give the same fields.
+    """
+    if '\t' in line:
+        return [p.strip().strip('"').strip() for p in line.split('\t')]
+    if '"' not in line:
+        return [p.strip() for p in line.split(',')]
+    return [p.strip() for p in next(csv.reader([line], skipinitialspace=True))]
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _point_fields(fields, ncols):
+    """
+    The ncols fields of one V/I/P row, by position: trailing empty fields are
+    ignored and a short row is padded with ''. None if the row has more
+    values than the header has columns.
+    """
+    fields = list(fields)
+    while len(fields) > ncols and not fields[-1]:
+        fields.pop()
+    if len(fields) > ncols:
+        return None
+    return fields + [''] * (ncols - len(fields))
+
+
+def _point_row(fields):
+    """Float values of one V/I/P row; blank or unparseable fields become NaN."""
+    row = []
+    for v in fields:
+        try:
+            row.append(float(v))
+        except ValueError:
+            row.append(np.nan)
+    return row
+
+
+def _new_sample(fields, source_file):
+    sample = {'metadata': {}, 'data': [], 'source_file': source_file}
+    m = SAMPLE_LINE.match(fields[0])
+    number = m.group(1) or (fields[1] if len(fields) > 1 else '')
+    if number:
+        sample['metadata'][SAMPLE_KEY] = number
+    return sample
+
+
+def _close_sample(sample, columns, points, text=None):
+    """Turn the growing point buffer into a (n_points, n_columns) float64 array."""
+    if points is None:
+        return sample
+    if text is not None:
+        sample['text'] = text
+    ncols = len(columns)
+    data = np.frombuffer(points, dtype=np.float64) if points else np.empty(0)
+    sample['columns'] = columns
+    sample['data'] = data.reshape(-1, ncols) if ncols else np.empty((0, 0))
+    return sample
+
+
+def _keeps_text(keep_text, position):
+    """keep_text is True/False for every sample, or the sample positions to keep."""
+    if isinstance(keep_text, bool):
+        return keep_text
+    return position in keep_text
+
+
+def iter_iv_samples(lines, source_file=None, points=False, missing=None, keep_text=False):
+    """
+    Lazily parse IV tracer lines (any iterable of str, e.g. an open file) into samples.
+
+    Yields one dict per sample, as soon as the next sample starts:
+        {'metadata': {key: value or None}, 'data': [], 'source_file': source_file}
+    Metadata values are strings, with the '-------' sentinel turned into `missing`.
+    Only one sample is held in memory at a time however large the export is.
+
+    With points=False the rows of the V/I/P table are skipped. With points=True
+    they are converted to float while reading and collected in a growing float64
+    buffer; the sample then carries
+        'columns': the table header, e.g. ['V (V)', 'I (A)', 'P (W)']
+        'data':    float64 array of shape (n_points, len(columns))
+    Fields keep their column position: blank or unparseable values become
+    NaN, and only rows with more values than header columns are dropped.
+    keep_text=True also keeps the fields as read, one list of strings per
+    row, in 'text' (for writing the points back out unchanged). A collection
+    of 1-based sample positions instead keeps them for those samples only.
+    """
+    sample   = None
+    in_table = False
+    columns  = []
+    buf      = None
+    text     = None
+    position = 0
+    for raw in lines:
+        line = raw.strip()
+        for bom in BOMS:
+            if line.startswith(bom):
+                line = line[len(bom):]
+        if not line:
+            continue
+
+        fields = split_fields(line)
+        key = fields[0]
+
+        # Detect new sample
+        if key == SAMPLE_KEY or SAMPLE_LINE.match(key):
+            if sample is not None:
+                yield _close_sample(sample, columns, buf, text)
+            sample   = _new_sample(fields, source_file)
+            in_table = False
+            columns  = []
+            position += 1
+            buf      = array('d') if points else None
+            text     = [] if points and _keeps_text(keep_text, position) else None
+            continue
+
+        if sample is None:
+            continue
+
+        if key.lower() == TABLE_HEADER.lower():
+            in_table = True
+            columns  = [f for f in fields if f]
+            continue
+        if in_table and _is_number(key):
+            # An IV point, not metadata
+            if buf is not None:
+                row = _point_fields(fields, len(columns))
+                if row is not None:
+                    buf.extend(_point_row(row))
+                    if text is not None:
+                        text.append(row)
+            continue
+
+        # Metadata line (key-value pair)
+        if len(fields) > 1:
+            value = fields[1]
+            sample['metadata'][key] = missing if value == MISSING else value
+
+    # Add the final sample
+    if sample is not None:
+        yield _close_sample(sample, columns, buf, text)
+
+
+class IVCurveReader:
+    """
+    Iterate over the samples of one IV tracer CSV file, reading it line by line.
+
+        reader  = IVCurveReader(path)
+        samples = list(reader)
+        print(reader.line_count)
+
+    line_count is the number of lines read so far, so no second pass over
+    the file is needed to report its size. points/missing/keep_text are
+    passed on to iter_iv_samples.
+    """
+
+    def __init__(self, path, points=False, missing=None, keep_text=False):
+        self.path = path
+        self.points = points
+        self.missing = missing
+        self.keep_text = keep_text
+        self.line_count = 0
+
+    def __iter__(self):
+        self.line_count = 0
+        with open(self.path, 'r', encoding='utf-8-sig') as f:
+            yield from iter_iv_samples(self._counted(f), os.path.basename(self.path),
+                                       self.points, self.missing, self.keep_text)
+
+    def _counted(self, lines):
+        for line in lines:
+            self.line_count += 1
+            yield line
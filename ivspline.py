@@ -0,0 +1,166 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+from scipy.interpolate import BSpline, make_interp_spline
+
+CACHE_SIZE       = 64      # fitted splines kept in memory
+DISK_MIN_POINTS  = 2000    # only fits of at least this many points go to the disk tier
+_FORMAT          = 1       # bump when the on-disk layout changes
+
+
+def curve_key(x, y, k=3):
+    """Hash of the (x, y) arrays and the spline degree: the cache key of one fit."""
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    h = hashlib.sha1()
+    h.update(f"{_FORMAT}:{k}:{len(x)}:".encode())
+    h.update(x.tobytes())
+    h.update(y.tobytes())
+    return h.hexdigest()
+
+
+class CachedSpline:
+    """
+    A fitted interpolating spline, stored as its B-spline coefficients.
+
+    Called like an interp1d object. fill_value follows interp1d:
+    'extrapolate' continues the end polynomials, a (below, above) pair fills
+    voltages outside the fitted range. Data containing NaN gives NaN
+    everywhere, as interp1d does.
+    """
+
+    def __init__(self, t, c, k, x_min, x_max, fill_value='extrapolate'):
+        self.t, self.c, self.k = t, c, int(k)
+        self.x_min, self.x_max = x_min, x_max
+        self.fill_value = fill_value
+        self._spline = BSpline(t, c, self.k, extrapolate=True) if len(t) else None
+
+    def with_fill(self, fill_value):
+        """The same fit with a different fill_value (no refit)."""
+        return CachedSpline(self.t, self.c, self.k, self.x_min, self.x_max, fill_value)
+
+    def __call__(self, x_new):
+        x_new = np.asarray(x_new, dtype=float)
+        if self._spline is None:
+            return np.full(x_new.shape, np.nan)
+        y_new = self._spline(x_new)
+        if not (isinstance(self.fill_value, str) and self.fill_value == 'extrapolate'):
+            below, above = np.broadcast_to(self.fill_value, (2,))
+            y_new[x_new < self.x_min] = below
+            y_new[x_new > self.x_max] = above
+        return y_new
+
+    def evaluate_many(self, grids):
+        """Evaluate at several voltage grids in one call; returns one array per grid."""
+        grids = [np.asarray(g, dtype=float) for g in grids]
+        if not grids:
+            return []
+        values = self(np.concatenate([g.ravel() for g in grids]))
+        splits = np.cumsum([g.size for g in grids])[:-1]
+        return [v.reshape(g.shape) for v, g in zip(np.split(values, splits), grids)]
+
+
+def _fit(x, y, k):
+    """Fit exactly as interp1d(kind='cubic') does: stable sort on x, not-a-knot spline."""
+    if np.isnan(x).any() or np.isnan(y).any():
+        return CachedSpline(np.empty(0), np.empty(0), k, np.nan, np.nan)
+    order = np.argsort(x, kind='mergesort')
+    xs, ys = x[order], y[order]
+    spline = make_interp_spline(xs, ys, k=k, check_finite=False)
+    return CachedSpline(spline.t, spline.c, k, xs[0], xs[-1])
+
+
+class SplineCache:
+    """
+    Fitted splines keyed on a hash of the curve they were fitted to.
+
+    The memory tier holds the most recently used `maxsize` fits (LRU). With a
+    cache_dir, fits of at least `disk_min_points` points are also written
+    there as .npz files and reloaded by later runs instead of being refitted.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, cache_dir=None, disk_min_points=DISK_MIN_POINTS):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.disk_min_points = disk_min_points
+        self._memory = OrderedDict()
+        self.hits = self.disk_hits = self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _remember(self, key, spline):
+        self._memory[key] = spline
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _write(self, key, spline):
+        """Publish a fit atomically: unique temp file per writer, then os.replace."""
+        fd, tmp = tempfile.mkstemp(prefix=f"{key}.{os.getpid()}.", suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, t=spline.t, c=spline.c, k=spline.k,
+                         x_min=spline.x_min, x_max=spline.x_max)
+            os.replace(tmp, self._disk_path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, x, y, k=3):
+        """The fitted spline for (x, y), from memory, from disk, or freshly fitted."""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        key = curve_key(x, y, k)
+
+        spline = self._memory.get(key)
+        if spline is not None:
+            self.hits += 1
+            self._memory.move_to_end(key)
+            return spline
+
+        use_disk = self.cache_dir and len(x) >= self.disk_min_points
+        if use_disk and os.path.exists(self._disk_path(key)):
+            try:
+                with np.load(self._disk_path(key)) as f:
+                    spline = CachedSpline(f['t'], f['c'], int(f['k']),
+                                          float(f['x_min']), float(f['x_max']))
+                self.disk_hits += 1
+            except (OSError, KeyError, ValueError):
+                spline = None   # unreadable entry: refit and overwrite it
+
+        if spline is None:
+            self.misses += 1
+            spline = _fit(x, y, k)
+            if use_disk:
+                self._write(key, spline)
+
+        self._remember(key, spline)
+        return spline
+
+    def clear(self):
+        """Empty the memory tier (files on disk are kept)."""
+        self._memory.clear()
+
+
+_default_cache = SplineCache()
+
+
+def set_cache_dir(cache_dir):
+    """Give the shared cache an on-disk tier (None turns it off)."""
+    global _default_cache
+    _default_cache = SplineCache(_default_cache.maxsize, cache_dir, _default_cache.disk_min_points)
+
+
+def cubic_interpolator(x, y, fill_value='extrapolate', cache=None):
+    """
+    Drop-in for interp1d(x, y, kind='cubic', fill_value=...) with bounds_error
+    off, backed by the shared SplineCache: the same curve is only fitted once.
+    """
+    cache = cache or _default_cache
+    return cache.get(x, y, 3).with_fill(fill_value)
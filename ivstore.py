@@ -0,0 +1,126 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from ivparser import IVCurveReader
+
+# Summary sheets: (sheet name, store column, tracer metadata key, sheet column header)
+SHEETS = [
+    ('Vopen', 'vopen', 'Vopen (V)', 'Vopen (V)'),
+    ('Vmax',  'vmax',  'Vmaxp (V)', 'Vmax (V)'),
+    ('Imax',  'imax',  'Imaxp (A)', 'Imax (A)'),
+    ('Pmax',  'pmax',  'Pmax (W)',  'Pmax (W)'),
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_hash   TEXT PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    n_samples   INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,   -- ingestion order
+    file_hash   TEXT NOT NULL REFERENCES files(file_hash),
+    row_no      INTEGER NOT NULL,                    -- sample position in its file
+    source_file TEXT NOT NULL,
+    sample_no   TEXT NOT NULL,
+    date_time   TEXT NOT NULL,
+    vopen REAL, vmax REAL, imax REAL, pmax REAL,
+    UNIQUE (file_hash, row_no)
+);
+"""
+
+
+def open_store(path):
+    """Open (creating if needed) the SQLite sample store at path."""
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(samples)")]
+    if 'row_no' not in columns:
+        conn.close()
+        raise ValueError(f"{path} was created by an older version of ivstore; "
+                         "delete it to rebuild the store from the CSV files")
+    return conn
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of the file contents, so a renamed or copied file is still recognised."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _value(metadata, key):
+    """Metadata value as float, or None if missing or '-------'. Other text raises ValueError."""
+    value = metadata.get(key)
+    if not value or value == '-------':
+        return None
+    return float(value)
+
+
+def ingest_file(conn, path):
+    """
+    Add one tracer CSV to the store. Returns the number of samples added,
+    or None if a file with the same contents was ingested before.
+    The file and its samples are committed together, or not at all, so a
+    value that is not a number (ValueError) adds nothing and the file can be
+    ingested once it is fixed.
+
+    Every sample of the file is kept, repeats included. A sample without a
+    Sample No. is named Unknown_<n>, where n is the number of samples in
+    the store once this file is added. This is the running total the
+    combiner has always used, so a store built from an empty start names
+    them exactly as a full rebuild does.
+    """
+    digest = file_hash(path)
+    if conn.execute("SELECT 1 FROM files WHERE file_hash = ?", (digest,)).fetchone():
+        return None
+
+    samples = list(IVCurveReader(path))
+    unknown = f"Unknown_{store_counts(conn)[1] + len(samples)}"
+    rows = []
+    for row_no, sample in enumerate(samples):
+        m = sample['metadata']
+        rows.append((digest, row_no, sample['source_file'],
+                     m.get('Sample No.', unknown), m.get('Date & Time', 'Unknown'),
+                     *(_value(m, key) for _, _, key, _ in SHEETS)))
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO samples (file_hash, row_no, source_file, sample_no, date_time, "
+            "vopen, vmax, imax, pmax) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT INTO files VALUES (?, ?, ?, ?)",
+                     (digest, os.path.basename(path), len(rows),
+                      datetime.now().isoformat(timespec='seconds')))
+    return len(rows)
+
+
+def summary_sheets(conn):
+    """
+    The four summary sheets as DataFrames, queried from the whole store in
+    ingestion order: Source File, Sample No., Date & Time, value. Samples
+    without a value for a sheet are left out of that sheet; empty sheets are
+    omitted.
+    """
+    sheets = {}
+    for sheet, column, _, header in SHEETS:
+        df = pd.read_sql_query(
+            f'SELECT source_file AS "Source File", sample_no AS "Sample No.", '
+            f'date_time AS "Date & Time", {column} AS "{header}" '
+            f'FROM samples WHERE {column} IS NOT NULL ORDER BY seq', conn)
+        if not df.empty:
+            sheets[sheet] = df
+    return sheets
+
+
+def store_counts(conn):
+    """(files, samples) held in the store."""
+    files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+    samples = conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+    return files, samples
@@ -0,0 +1,260 @@
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+import pandas as pd
+
+# Optional: xlsxwriter is the fastest streaming xlsx backend; openpyxl's
+# write-only mode is used when it is not installed.
+try:
+    import xlsxwriter
+    XLSXWRITER_OK = True
+except ImportError:
+    XLSXWRITER_OK = False
+
+EXCEL_MAX_ROWS   = 1048576   # rows per sheet, header included
+MAX_COLUMN_WIDTH = 50
+WIDTH_PADDING    = 2
+
+
+def column_widths(df):
+    """
+    Excel column width for each column of df: the longest header or value
+    (as text) plus padding, capped at MAX_COLUMN_WIDTH. One vectorised string
+    length reduction per column instead of a Python loop over every cell.
+    Missing values count as 'None' (4 characters), as the empty cells did
+    when the widths were measured from the written worksheet.
+    """
+    widths = []
+    for col in df.columns:
+        lengths = df[col].astype(str).str.len().where(df[col].notna(), len('None'))
+        longest = max(len(str(col)), int(lengths.max()) if len(lengths) else 0)
+        widths.append(min(longest + WIDTH_PADDING, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _column_letter(idx):
+    """0 -> 'A', 25 -> 'Z', 26 -> 'AA'."""
+    letters = ''
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _rows(df):
+    """Rows of df as tuples, with NaN written as an empty cell."""
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def _write_xlsx_pandas(sheets, output_filepath):
+    """The original pd.ExcelWriter(openpyxl) path, with precomputed column widths."""
+    with pd.ExcelWriter(output_filepath, engine='openpyxl') as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+            worksheet = writer.sheets[sheet_name]
+            for idx, width in enumerate(column_widths(df)):
+                worksheet.column_dimensions[_column_letter(idx)].width = width
+
+
+def _write_xlsx_xlsxwriter(sheets, output_filepath):
+    """Stream rows through xlsxwriter in constant-memory mode."""
+    workbook = xlsxwriter.Workbook(output_filepath, {'constant_memory': True})
+    header_fmt = workbook.add_format({'bold': True, 'border': 1,
+                                      'align': 'center', 'valign': 'top'})
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+        for idx, width in enumerate(column_widths(df)):
+            worksheet.set_column(idx, idx, width)
+        worksheet.write_row(0, 0, [str(c) for c in df.columns], header_fmt)
+        for r, row in enumerate(_rows(df), 1):
+            worksheet.write_row(r, 0, row)
+    workbook.close()
+
+
+def _write_xlsx_openpyxl(sheets, output_filepath):
+    """Stream rows through an openpyxl write-only workbook."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    workbook = Workbook(write_only=True)
+    thin = Side(style='thin')
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        # Widths must be set before the first row is written
+        for idx, width in enumerate(column_widths(df)):
+            worksheet.column_dimensions[_column_letter(idx)].width = width
+        header = []
+        for col in df.columns:
+            cell = WriteOnlyCell(worksheet, value=str(col))
+            cell.font = Font(bold=True)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.alignment = Alignment(horizontal='center', vertical='top')
+            header.append(cell)
+        if header:
+            worksheet.append(header)
+        for row in _rows(df):
+            worksheet.append(row)
+    workbook.save(output_filepath)
+
+
+def _write_flat(sheets, output_filepath, fmt):
+    """One <stem>_<sheet>.csv / .parquet file per sheet, next to output_filepath."""
+    stem = os.path.splitext(output_filepath)[0]
+    paths = []
+    for sheet_name, df in sheets.items():
+        path = f"{stem}_{sheet_name}.{fmt}"
+        if fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def write_summary(sheets, output_filepath, fmt='xlsx', engine='fast'):
+    """
+    Write the summary sheets ({sheet name: DataFrame}, in order) and return
+    the list of files written.
+
+    fmt:    'xlsx'    - one workbook at output_filepath
+            'csv'     - one CSV per sheet, named <stem>_<sheet>.csv
+            'parquet' - one Parquet file per sheet (needs pyarrow or fastparquet;
+                        falls back to CSV if neither is installed)
+    engine: 'fast'    - streaming writer: xlsxwriter constant_memory if installed,
+                        otherwise openpyxl write-only
+            'pandas'  - pd.ExcelWriter with openpyxl, as before
+
+    A sheet with more rows than Excel allows makes the whole run fall back to CSV.
+    """
+    if fmt == 'xlsx':
+        too_big = [name for name, df in sheets.items() if len(df) + 1 > EXCEL_MAX_ROWS]
+        if too_big:
+            print(f"Warning: {', '.join(too_big)} exceed Excel's {EXCEL_MAX_ROWS} rows; "
+                  f"writing CSV files instead.")
+            fmt = 'csv'
+
+    if fmt == 'parquet':
+        try:
+            return _write_flat(sheets, output_filepath, 'parquet')
+        except ImportError:
+            print("Warning: Parquet output needs pyarrow or fastparquet; writing CSV files instead.")
+            fmt = 'csv'
+    if fmt == 'csv':
+        return _write_flat(sheets, output_filepath, 'csv')
+    if fmt != 'xlsx':
+        raise ValueError(f"Unknown output format: {fmt!r}")
+
+    if engine == 'pandas':
+        _write_xlsx_pandas(sheets, output_filepath)
+    elif engine == 'fast':
+        if XLSXWRITER_OK:
+            _write_xlsx_xlsxwriter(sheets, output_filepath)
+        else:
+            _write_xlsx_openpyxl(sheets, output_filepath)
+    else:
+        raise ValueError(f"Unknown Excel engine: {engine!r}")
+    return [output_filepath]
+
+
+def report_written(paths):
+    """Print the success banner for the files write_summary returned, with their sizes."""
+    print(f"\n{'='*60}")
+    if len(paths) == 1 and paths[0].endswith('.xlsx'):
+        print("EXCEL FILE CREATED SUCCESSFULLY!")
+        print(f"{'='*60}")
+        print(f"File saved as: {paths[0]}")
+        print(f"File size: {os.path.getsize(paths[0])} bytes")
+        return
+    fmt = os.path.splitext(paths[0])[1].lstrip('.').upper() if paths else 'OUTPUT'
+    print(f"{len(paths)} {fmt} FILES CREATED SUCCESSFULLY (one per sheet)!")
+    print(f"{'='*60}")
+    for path in paths:
+        print(f"File saved as: {path} ({os.path.getsize(path)} bytes)")
+
+
+# =============================================================================
+# CHEAP INTEGRITY CHECK (reads the workbook XML, not the cells)
+# =============================================================================
+
+_NS = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+       'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+       'p': 'http://schemas.openxmlformats.org/package/2006/relationships'}
+_DIMENSION = re.compile(rb'<dimension ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"')
+_ROW       = re.compile(rb'<row [^>]*?r="(\d+)"')
+_CELL      = re.compile(rb'<c [^>]*?r="([A-Z]+)\d+"')
+
+
+def _column_number(letters):
+    n = 0
+    for ch in letters.decode():
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def _sheet_size(zf, member):
+    """(rows, columns) of one worksheet: from its <dimension> tag if present,
+    otherwise by scanning row/cell references in the raw XML stream."""
+    with zf.open(member) as f:
+        head = f.read(4096)
+        m = _DIMENSION.search(head)
+        if m and m.group(3):
+            return int(m.group(4)), _column_number(m.group(3))
+        # Write-only writers leave the dimension out: stream the XML for the
+        # last row number and the widest cell reference.
+        rows, cols, tail, chunk = 0, 0, b'', head
+        while chunk:
+            data = tail + chunk
+            for r in _ROW.findall(data):
+                rows = max(rows, int(r))
+            for c in set(_CELL.findall(data)):
+                cols = max(cols, _column_number(c))
+            tail = data[-64:]
+            chunk = f.read(1 << 20)
+        return rows, cols
+
+
+def workbook_dimensions(path):
+    """{sheet name: (rows, columns)} of an xlsx file, in sheet order, read from
+    the workbook XML without loading any cell values."""
+    with zipfile.ZipFile(path) as zf:
+        workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+        rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+        targets = {rel.get('Id'): rel.get('Target') for rel in rels.findall('p:Relationship', _NS)}
+        dims = {}
+        for sheet in workbook.find('m:sheets', _NS):
+            target = targets[sheet.get(f"{{{_NS['r']}}}id")].lstrip('/')
+            member = target if target.startswith('xl/') else 'xl/' + target
+            dims[sheet.get('name')] = _sheet_size(zf, member)
+        return dims
+
+
+def check_workbook(path, sheets):
+    """
+    Compare a written workbook with the in-memory sheets it was written from.
+    Checks the sheet list and each sheet's size (header row + data rows,
+    columns). Returns a list of problems; an empty list means it matches.
+    """
+    try:
+        dims = workbook_dimensions(path)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        return [f"cannot read workbook structure: {e}"]
+
+    problems = []
+    if list(dims) != list(sheets):
+        problems.append(f"sheets {list(dims)} != expected {list(sheets)}")
+    for name, df in sheets.items():
+        if name not in dims:
+            continue
+        expected = (len(df) + 1, len(df.columns)) if len(df.columns) else (0, 0)
+        found = dims[name]
+        # An empty sheet may still be recorded as the single cell A1
+        if expected == (0, 0) and found in ((0, 0), (1, 1)):
+            continue
+        if found != expected:
+            problems.append(f"{name}: {found[0]} rows x {found[1]} cols, expected "
+                            f"{expected[0]} x {expected[1]}")
+    return problems
@@ -1,80 +1,56 @@
+import re
 import pandas as pd
 from pathlib import Path
-import re
 import matplotlib.pyplot as plt
 from datetime import datetime
 import numpy as np
+from ivparser import IVCurveReader, iter_iv_samples
+from plotout import finish_figure, plots_enabled
+
+# A field pd.to_numeric accepts: an integer, or a decimal / exponent / inf float
+INT_FIELD   = re.compile(r'[+-]?\d+')
+FLOAT_FIELD = re.compile(r'[+-]?((\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|inf(inity)?)', re.IGNORECASE)
 
 def parse_iv_file(file_path):
     """Parse IV curve file with metadata and multiple samples"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # More flexible sample pattern matching
-    sample_pattern = re.compile(r'Sample No\.\s*[\t,]\s*\d+', re.IGNORECASE)
-    sample_starts = [m.start() for m in sample_pattern.finditer(content)]
-    
-    if not sample_starts:
-        # Alternative pattern if the first one didn't match
-        sample_pattern = re.compile(r'^\s*Sample[\s,:-]*\d+', re.IGNORECASE | re.MULTILINE)
-        sample_starts = [m.start() for m in sample_pattern.finditer(content)]
-    
-    samples = []
-    for i, start_pos in enumerate(sample_starts):
-        end_pos = sample_starts[i+1] if i+1 < len(sample_starts) else len(content)
-        sample_content = content[start_pos:end_pos].strip()
-        if sample_content:
-            samples.append(parse_single_sample(sample_content))
-    
-    return samples
+    reader = IVCurveReader(file_path, points=True, missing='-------')
+    return [_add_power(sample) for sample in reader]
+
+def iter_samples_as_read(file_path, positions):
+    """Parse the file again, keeping the point fields as read for the samples at positions (1-based)"""
+    reader = IVCurveReader(file_path, points=True, missing='-------', keep_text=positions)
+    return (_add_power(sample) for sample in reader)
 
 def parse_single_sample(sample_content):
     """Parse a single sample's content into metadata and IV data"""
-    lines = [line.strip() for line in sample_content.split('\n') if line.strip()]
-    metadata = {}
-    data_lines = []
-    headers = None
-    
-    for line in lines:
-        # Handle both tab and comma separated values
-        if '\t' in line:
-            parts = [p.strip() for p in line.split('\t') if p.strip()]
-        else:
-            parts = [p.strip() for p in line.split(',') if p.strip()]
-        
-        if not parts:
-            continue
-            
-        if len(parts) == 2 and not any(x in parts[0].lower() for x in ['v (v)', 'i (a)', 'p (w)']):
-            metadata[parts[0]] = parts[1]
-        elif parts[0].lower().startswith(('v (v)', 'v,')):
-            headers = parts
-        elif headers and len(parts) == len(headers):
-            data_lines.append(parts)
-    
-    # Create DataFrame for IV data
-    if headers and data_lines:
-        df = pd.DataFrame(data_lines, columns=headers)
-        for col in df.columns:
-            try:
-                df[col] = pd.to_numeric(df[col])
-            except ValueError:
-                pass
-        
-        # Calculate power if not present
-        if 'P (W)' not in df.columns and 'V (V)' in df.columns and 'I (A)' in df.columns:
-            df['P (W)'] = df['V (V)'] * df['I (A)']
-    else:
-        df = pd.DataFrame()
-    
-    return {'metadata': metadata, 'data': df}
+    for sample in iter_iv_samples(sample_content.splitlines(), points=True, missing='-------'):
+        return _add_power(sample)
+    return {'metadata': {}, 'columns': [], 'data': np.empty((0, 0))}
+
+def _add_power(sample):
+    """Calculate power if not present; data stays one float64 array of V/I/P points"""
+    cols = sample['columns']
+    if 'P (W)' not in cols and 'V (V)' in cols and 'I (A)' in cols and sample['data'].size:
+        data = sample['data']
+        power = data[:, cols.index('V (V)')] * data[:, cols.index('I (A)')]
+        sample['data'] = np.column_stack([data, power])
+        sample['columns'] = cols + ['P (W)']
+    return sample
+
+def _column(sample, name):
+    """One column of a sample's point array, or None if it has no such column"""
+    if sample['data'].size == 0 or name not in sample['columns']:
+        return None
+    return sample['data'][:, sample['columns'].index(name)]
 
 def extract_key_parameters(samples):
     """Extract VOC, ISC, PMAX from samples"""
     results = []
     for sample in samples:
         metadata = sample['metadata']
-        data = sample['data']
+        V = _column(sample, 'V (V)')
+        I = _column(sample, 'I (A)')
+        P = _column(sample, 'P (W)')
         
         # Get timestamp
         timestamp_str = metadata.get('Date & Time', '')
@@ -90,8 +66,8 @@ def extract_key_parameters(samples):
                 voc = float(metadata['Vopen (V)'].replace('-------', 'NaN'))
             except (ValueError, AttributeError):
                 pass
-        elif not data.empty and 'V (V)' in data.columns:
-            voc = data['V (V)'].max()
+        elif V is not None and not np.isnan(V).all():
+            voc = np.nanmax(V)
         
         # Extract ISC (Short Circuit Current)
         isc = None
@@ -100,8 +76,8 @@ def extract_key_parameters(samples):
                 isc = float(metadata['Ishort (A)'].replace('-------', 'NaN'))
             except (ValueError, AttributeError):
                 pass
-        elif not data.empty and 'I (A)' in data.columns:
-            isc = data.loc[data['V (V)'].abs().idxmin(), 'I (A)']
+        elif V is not None and I is not None and not np.isnan(V).all():
+            isc = I[np.nanargmin(np.abs(V))]
         
         # Extract PMAX (Maximum Power)
         pmax = None
@@ -110,8 +86,8 @@ def extract_key_parameters(samples):
                 pmax = float(metadata['Pmax (W)'].replace('-------', 'NaN'))
             except (ValueError, AttributeError):
                 pass
-        elif not data.empty and 'P (W)' in data.columns:
-            pmax = data['P (W)'].max()
+        elif P is not None and not np.isnan(P).all():
+            pmax = np.nanmax(P)
         
         results.append({
             'timestamp': timestamp,
@@ -159,7 +135,31 @@ def plot_parameters(df, title_suffix=""):
     axes[3].set_xlabel('Time')
     
     plt.tight_layout()
-    plt.show()
+    finish_figure('_'.join(['parameters'] + title_suffix.strip('() ').lower().split()))
+
+def _typed_column(fields):
+    """A column of fields typed as pd.to_numeric would: all int, else all float, else as read"""
+    fields = [f.strip() for f in fields]
+    if all(INT_FIELD.fullmatch(f) for f in fields):
+        return [int(f) for f in fields]
+    if all(not f or FLOAT_FIELD.fullmatch(f) for f in fields):
+        return [float(f) if f else np.nan for f in fields]
+    return fields
+
+def _rows_as_read(sample):
+    """
+    The points as written out: the fields as read, each column numeric if all
+    of it parses (so '5' stays 5 and text stays text), plus the computed power;
+    one common type per row, as DataFrame rows have
+    """
+    cols = [_typed_column(c) for c in zip(*sample['text'])]
+    names = sample['columns'][:len(cols)]
+    if 'P (W)' not in names and 'V (V)' in names and 'I (A)' in names:
+        V, I = cols[names.index('V (V)')], cols[names.index('I (A)')]
+        cols.append([v * i for v, i in zip(V, I)])
+    if not any(isinstance(c[0], str) for c in cols) and any(isinstance(c[0], float) for c in cols):
+        cols = [[float(v) for v in c] for c in cols]
+    return zip(*cols)
 
 def write_sample(file, sample):
     """Write a sample to file with proper Excel-compatible CSV formatting"""
@@ -168,11 +168,12 @@ def write_sample(file, sample):
         file.write(f'"{key}","{value}"\n')
     
     # Write data with comma separation
-    if not sample['data'].empty:
+    if sample['data'].size:
         # Write headers
-        file.write(','.join(f'"{h}"' for h in sample['data'].columns) + '\n')
-        # Write data rows
-        for _, row in sample['data'].iterrows():
+        file.write(','.join(f'"{h}"' for h in sample['columns']) + '\n')
+        # Write data rows: the fields as read when kept, else the float points
+        rows = _rows_as_read(sample) if 'text' in sample else sample['data'].tolist()
+        for row in rows:
             file.write(','.join(f'"{v}"' if isinstance(v, str) else str(v) for v in row) + '\n')
     file.write("\n")  # Separate samples with blank line
 
@@ -287,7 +288,9 @@ def process_samples():
             mod_file.write('\ufeff')
             unmod_file.write('\ufeff')
             
-            for i, sample in enumerate(samples, 1):
+            # The point fields as read are only needed for the selected samples
+            selected = set(modified_samples) | set(unmodified_samples)
+            for i, sample in enumerate(iter_samples_as_read(file_path, selected), 1):
                 if i in modified_samples:
                     write_sample(mod_file, sample)
                 elif i in unmodified_samples:
@@ -301,12 +304,15 @@ def process_samples():
         modified_params = params_df.iloc[[i-1 for i in modified_samples]]
         unmodified_params = params_df.iloc[[i-1 for i in unmodified_samples]]
         
-        if not modified_params.empty:
-            print("\nPlotting Modified Samples...")
-            plot_parameters(modified_params, "(Modified Samples)")
-        if not unmodified_params.empty:
-            print("\nPlotting Unmodified Samples...")
-            plot_parameters(unmodified_params, "(Unmodified Samples)")
+        if not plots_enabled():
+            print("\nPlotting skipped (PLOT_MODE=off)")
+        else:
+            if not modified_params.empty:
+                print("\nPlotting Modified Samples...")
+                plot_parameters(modified_params, "(Modified Samples)")
+            if not unmodified_params.empty:
+                print("\nPlotting Unmodified Samples...")
+                plot_parameters(unmodified_params, "(Unmodified Samples)")
         
     except PermissionError:
         print(f"\nError: Could not write to output files. Please check permissions for:")
@@ -3,6 +3,7 @@ import sys
 import numpy as np
 import pandas as pd
 import warnings
+from ivparser import IVCurveReader
 warnings.filterwarnings('ignore')
 
 # Windows cp1252 fix
@@ -20,61 +21,21 @@ SEP  = "=" * 62
 SEP2 = "-" * 62
 
 # =============================================================================
-# 1. ROBUST CSV PARSER (UNCHANGED)
+# 1. ROBUST CSV PARSER (shared streaming reader in ivparser.py)
 # =============================================================================
 
 def parse_iv_csv(filepath):
     """
     Parse IV tracer CSV files in either quoted or unquoted format.
-    Strips surrounding quotes and trailing whitespace.
+    Streams the file through ivparser, one sample at a time.
     Returns list of sample dicts (metadata only).
     """
-    samples = []
+    return [_finalise(sample) for sample in IVCurveReader(filepath)]
 
-    with open(filepath, 'r', encoding='utf-8-sig') as f:
-        lines = f.readlines()
 
-    current = None
-
-    for raw_line in lines:
-        line = raw_line.strip()
-        if not line:
-            continue
-
-        cols = [c.strip().strip('"') for c in line.split(',')]
-        if not cols:
-            continue
-
-        key = cols[0]
-
-        if key == 'Sample No.':
-            if current is not None:
-                samples.append(_finalise(current))
-            current = {'_src': os.path.basename(filepath), '_meta': {}}
-            if len(cols) > 1:
-                current['_meta']['Sample No.'] = cols[1]
-            continue
-
-        if current is None:
-            continue
-
-        # Stop reading metadata once the numeric IV table begins
-        if key == 'V (V)':
-            continue
-
-        if len(cols) > 1:
-            value = cols[1]
-            current['_meta'][key] = None if value == '-------' else value
-
-    if current is not None:
-        samples.append(_finalise(current))
-
-    return samples
-
-
-def _finalise(raw):
-    """Convert raw metadata dict into a clean record."""
-    m = raw['_meta']
+def _finalise(sample):
+    """Convert a parsed sample's metadata dict into a clean record."""
+    m = sample['metadata']
 
     def fv(key):
         v = m.get(key)
@@ -92,7 +53,7 @@ def _finalise(raw):
         Pmax = Vmpp * Impp
 
     return {
-        'source_file': raw['_src'],
+        'source_file': sample['source_file'],
         'sample_no':   str(m.get('Sample No.', '?')),
         'date_time':   m.get('Date & Time', ''),
         'Voc':         fv('Vopen (V)'),
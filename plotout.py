@@ -0,0 +1,79 @@
+import os
+import matplotlib
+
+# How figures end, for every script that imports this module:
+#   show - plt.show() as before (blocks until the window is closed)
+#   save - Agg backend, figures written to PLOT_DIR and closed; never blocks
+#   off  - no figures are drawn at all, only the numeric results
+# Set with the PLOT_MODE / PLOT_DIR environment variables or configure().
+MODES            = ('show', 'save', 'off')
+DEFAULT_PLOT_DIR = 'plots'
+DEFAULT_DPI      = 150
+
+_mode = os.environ.get('PLOT_MODE', 'show').strip().lower()
+if _mode not in MODES:
+    print(f"Warning: unknown PLOT_MODE {_mode!r}, using 'show'")
+    _mode = 'show'
+_plot_dir = os.environ.get('PLOT_DIR') or DEFAULT_PLOT_DIR
+
+if _mode != 'show':
+    # Before any figure exists, so no GUI toolkit is ever loaded
+    matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+
+
+def configure(mode=None, plot_dir=None):
+    """Change the plot mode and/or output folder at run time (e.g. in a batch worker)."""
+    global _mode, _plot_dir
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown plot mode: {mode!r} (expected one of {MODES})")
+        _mode = mode
+        if mode != 'show':
+            plt.switch_backend('Agg')
+    if plot_dir is not None:
+        _plot_dir = plot_dir
+
+
+def plot_mode():
+    return _mode
+
+
+def plots_enabled():
+    """False in 'off' mode: callers should skip building figures altogether."""
+    return _mode != 'off'
+
+
+def figure_path(name):
+    """Where finish_figure(name) saves: name as given if it has a folder, else inside the plot dir; .png added if no extension."""
+    if not os.path.splitext(name)[1]:
+        name += '.png'
+    if os.path.dirname(name):
+        return name
+    return os.path.join(_plot_dir, name)
+
+
+def finish_figure(name=None, fig=None, dpi=DEFAULT_DPI):
+    """
+    End the current (or given) figure according to the plot mode.
+
+    show: plt.show(), as the scripts always did.
+    save: if name is given, save to figure_path(name); then close the figure.
+    off:  close the figure.
+
+    Scripts that already save their figure themselves call it without a
+    name. Returns the path written, or None.
+    """
+    fig = fig or plt.gcf()
+    if _mode == 'show':
+        plt.show()
+        return None
+    path = None
+    if _mode == 'save' and name:
+        path = figure_path(name)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+        print(f"Figure saved to: {path}")
+    plt.close(fig)
+    return path
@@ -1,7 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
-from scipy.interpolate import interp1d
+from ivmetrics import curve_metrics
+from ivspline import cubic_interpolator
+from plotout import finish_figure, plots_enabled
 
 # Load data while treating empty cells as separate datasets
 df = pd.read_excel(r"D:\bricks laid\2025 bitches\forpy1.py.xlsx")
@@ -35,15 +37,15 @@ if len(voltage_calib) == 0 or len(voltage_uncalib) == 0:
 # 4. Calculate Key Parameters (for each dataset separately)
 # ================================================
 def calculate_iv_parameters(voltage, current, name):
-    power = voltage * current
-    
-    max_power_idx = np.argmax(power)
+    # Isc/Voc are interpolated at the zero crossings (see ivmetrics.py)
+    m = curve_metrics(voltage, current)
     results = {
-        'Pmax': power[max_power_idx],
-        'Vmax': voltage[max_power_idx],
-        'Imax': current[max_power_idx],
-        'Isc': current[np.argmin(voltage)],
-        'Voc': voltage[np.argmin(current)]
+        'Pmax': m['Pmax'],
+        'Vmax': m['Vmpp'],
+        'Imax': m['Impp'],
+        'Isc': m['Isc'],
+        'Voc': m['Voc'],
+        'FF': m['FF']
     }
     
     # Print results
@@ -53,16 +55,17 @@ def calculate_iv_parameters(voltage, current, name):
     print(f"Current at Pmax (Imax): {results['Imax']:.4f} A")
     print(f"Short Circuit Current (Isc): {results['Isc']:.4f} A")
     print(f"Open Circuit Voltage (Voc): {results['Voc']:.4f} V")
+    print(f"Fill Factor (FF): {results['FF']:.4f}")
     
     return results
 
 calib_results = calculate_iv_parameters(voltage_calib, current_calib, "CALIBRATED")
 uncalib_results = calculate_iv_parameters(voltage_uncalib, current_uncalib, "UNCALIBRATED")
 
-interp_func = interp1d(
+# Cubic spline, fitted once per uncalibrated curve (see ivspline.py)
+interp_func = cubic_interpolator(
     voltage_uncalib, 
     current_uncalib, 
-    kind='cubic',  # 'linear' for faster but less smooth
     fill_value='extrapolate'  # Handles voltages outside the uncalibrated range
 )
 # Interpolate uncalibrated currents at calibrated voltages
@@ -90,33 +93,34 @@ max_rel_error = np.max(relative_error)
 # ======================
 # 4. PLOT RESULTS
 # ======================
-plt.figure(figsize=(12, 6))
+if plots_enabled():
+    plt.figure(figsize=(12, 6))
 
-# Plot IV curves
-plt.subplot(1, 2, 1)
-plt.plot(voltage_calib, current_calib, 'b-', label='Calibrated Tracer', linewidth=2)
-plt.plot(voltage_calib, interpolated_current, 'g--', label='Uncalibrated (Interpolated)', linewidth=1.5)
-plt.xlabel('Voltage (V)')
-plt.ylabel('Current (A)')
-plt.title('IV Curve Comparison')
-plt.legend()
-plt.grid(True)
+    # Plot IV curves
+    plt.subplot(1, 2, 1)
+    plt.plot(voltage_calib, current_calib, 'b-', label='Calibrated Tracer', linewidth=2)
+    plt.plot(voltage_calib, interpolated_current, 'g--', label='Uncalibrated (Interpolated)', linewidth=1.5)
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Current (A)')
+    plt.title('IV Curve Comparison')
+    plt.legend()
+    plt.grid(True)
 
 
 
 
-# Plot relative errors
-plt.subplot(1, 2, 2)
-plt.plot(voltage_calib, relative_error, 'k-', label='Relative Error (%)')
-plt.axhline(y=5, color='r', linestyle='--', label='5% Error Threshold')
-plt.xlabel('Voltage (V)')
-plt.ylabel('Error (%)')
-plt.title('Relative Error Analysis')
-plt.legend()
-plt.grid(True)
+    # Plot relative errors
+    plt.subplot(1, 2, 2)
+    plt.plot(voltage_calib, relative_error, 'k-', label='Relative Error (%)')
+    plt.axhline(y=5, color='r', linestyle='--', label='5% Error Threshold')
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Error (%)')
+    plt.title('Relative Error Analysis')
+    plt.legend()
+    plt.grid(True)
 
-plt.tight_layout()
-plt.show()
+    plt.tight_layout()
+    finish_figure('rcolumsfinderror_errors')
 
 # ======================
 # 5. PRINT ERROR STATISTICS
@@ -129,35 +133,36 @@ print(f"Max Relative Error: {max_rel_error:.2f} %")
 # ================================================
 # 5. Visualization (with interpolation if needed)
 # ================================================
-plt.figure(figsize=(14, 6))
-
-# IV Curve Plot
-plt.subplot(1, 2, 1)
-plt.plot(voltage_calib, current_calib, 'b-', label='Calibrated')
-plt.plot(voltage_uncalib, current_uncalib, 'ro', label='Uncalibrated')
-
-# Mark MPP points
-plt.plot(calib_results['Vmax'], calib_results['Imax'], 'bs', 
-         label=f'Calib MPP ({calib_results["Vmax"]:.2f}V, {calib_results["Imax"]:.2f}A)')
-plt.plot(uncalib_results['Vmax'], uncalib_results['Imax'], 'rs', 
-         label=f'Uncalib MPP ({uncalib_results["Vmax"]:.2f}V, {uncalib_results["Imax"]:.2f}A)')
-
-plt.xlabel('Voltage (V)')
-plt.ylabel('Current (A)')
-plt.title('IV Characteristics')
-plt.legend()
-plt.grid(True)
-
-# Power Curve Plot
-plt.subplot(1, 2, 2)
-plt.plot(voltage_calib, voltage_calib*current_calib, 'b-', label='Calibrated Power')
-plt.plot(voltage_uncalib, voltage_uncalib*current_uncalib, 'r-', label='Uncalibrated Power')
-
-plt.xlabel('Voltage (V)')
-plt.ylabel('Power (W)')
-plt.title('Power Characteristics')
-plt.legend()
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
+if plots_enabled():
+    plt.figure(figsize=(14, 6))
+
+    # IV Curve Plot
+    plt.subplot(1, 2, 1)
+    plt.plot(voltage_calib, current_calib, 'b-', label='Calibrated')
+    plt.plot(voltage_uncalib, current_uncalib, 'ro', label='Uncalibrated')
+
+    # Mark MPP points
+    plt.plot(calib_results['Vmax'], calib_results['Imax'], 'bs', 
+             label=f'Calib MPP ({calib_results["Vmax"]:.2f}V, {calib_results["Imax"]:.2f}A)')
+    plt.plot(uncalib_results['Vmax'], uncalib_results['Imax'], 'rs', 
+             label=f'Uncalib MPP ({uncalib_results["Vmax"]:.2f}V, {uncalib_results["Imax"]:.2f}A)')
+
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Current (A)')
+    plt.title('IV Characteristics')
+    plt.legend()
+    plt.grid(True)
+
+    # Power Curve Plot
+    plt.subplot(1, 2, 2)
+    plt.plot(voltage_calib, voltage_calib*current_calib, 'b-', label='Calibrated Power')
+    plt.plot(voltage_uncalib, voltage_uncalib*current_uncalib, 'r-', label='Uncalibrated Power')
+
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Power (W)')
+    plt.title('Power Characteristics')
+    plt.legend()
+    plt.grid(True)
+
+    plt.tight_layout()
+    finish_figure('rcolumsfinderror_curves')
@@ -2,6 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.interpolate import interp1d
 import pandas as pd
+from plotout import finish_figure, plots_enabled
 
 # ======================
 # 1. GENERATE SAMPLE DATA (REPLACE WITH YOUR DATA)
@@ -46,31 +47,32 @@ max_rel_error = np.max(relative_error)
 # ======================
 # 4. PLOT RESULTS
 # ======================
-plt.figure(figsize=(12, 6))
-
-# Plot IV curves
-plt.subplot(1, 2, 1)
-plt.plot(voltage_calib, current_calib, 'b-', label='Calibrated Tracer', linewidth=2)
-plt.plot(voltage_uncalib, current_uncalib, 'ro', label='Uncalibrated (Raw)', markersize=5)
-plt.plot(voltage_calib, interpolated_current, 'g--', label='Uncalibrated (Interpolated)', linewidth=1.5)
-plt.xlabel('Voltage (V)')
-plt.ylabel('Current (A)')
-plt.title('IV Curve Comparison')
-plt.legend()
-plt.grid(True)
-
-# Plot relative errors
-plt.subplot(1, 2, 2)
-plt.plot(voltage_calib, relative_error, 'k-', label='Relative Error (%)')
-plt.axhline(y=5, color='r', linestyle='--', label='5% Error Threshold')
-plt.xlabel('Voltage (V)')
-plt.ylabel('Error (%)')
-plt.title('Relative Error Analysis')
-plt.legend()
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
+if plots_enabled():
+    plt.figure(figsize=(12, 6))
+
+    # Plot IV curves
+    plt.subplot(1, 2, 1)
+    plt.plot(voltage_calib, current_calib, 'b-', label='Calibrated Tracer', linewidth=2)
+    plt.plot(voltage_uncalib, current_uncalib, 'ro', label='Uncalibrated (Raw)', markersize=5)
+    plt.plot(voltage_calib, interpolated_current, 'g--', label='Uncalibrated (Interpolated)', linewidth=1.5)
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Current (A)')
+    plt.title('IV Curve Comparison')
+    plt.legend()
+    plt.grid(True)
+
+    # Plot relative errors
+    plt.subplot(1, 2, 2)
+    plt.plot(voltage_calib, relative_error, 'k-', label='Relative Error (%)')
+    plt.axhline(y=5, color='r', linestyle='--', label='5% Error Threshold')
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Error (%)')
+    plt.title('Relative Error Analysis')
+    plt.legend()
+    plt.grid(True)
+
+    plt.tight_layout()
+    finish_figure('readscolumns')
 
 # ======================
 # 5. PRINT ERROR STATISTICS
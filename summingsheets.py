@@ -1,6 +1,13 @@
 import pandas as pd
 import re
 import os
+from ivparser import IVCurveReader
+from ivwriter import write_summary, check_workbook, report_written
+
+# Output settings
+OUTPUT_FORMAT = 'xlsx'   # 'xlsx', or 'csv' / 'parquet' (one file per sheet) for runs too large for Excel
+EXCEL_ENGINE  = 'fast'   # 'fast' = streaming writer (xlsxwriter or openpyxl write-only), 'pandas' = pd.ExcelWriter
+VERIFY_WORKBOOK = True  # check the written xlsx's sheet list and sizes (reads XML only, not cells)
 
 def get_file_path():
     """
@@ -22,70 +29,14 @@ def parse_iv_curve_file(filename):
     """
     Parse an IV curve file and extract metadata for all samples
     """
-    samples = []
-    current_sample = None
-    
-    # Read the entire file and remove BOM
-    with open(filename, 'r', encoding='utf-8-sig') as file:
-        content = file.read()
-    
-    # Process line by line
-    lines = content.split('\n')
-    for line_num, line in enumerate(lines, 1):
-        line = line.strip()
-        
-        # Skip empty lines
-        if not line:
-            continue
-            
-        # Detect new sample
-        if ('"Sample No."' in line and line.split(',')[0].endswith('"Sample No."')) or \
-           (line.startswith('"Sample No."') or line.startswith('\ufeff"Sample No."') or \
-            line.startswith('ï»¿"Sample No."')):
-            
-            # Save the current sample if it exists
-            if current_sample is not None:
-                samples.append(current_sample)
-            
-            # Start new sample
-            current_sample = {
-                'metadata': {},
-                'data': []
-            }
-            
-            # Clean the line from any BOM characters
-            clean_line = line.replace('\ufeff', '').replace('ï»¿', '').strip()
-            parts = clean_line.split(',')
-            if len(parts) >= 2:
-                sample_no = parts[1].strip('"')
-                current_sample['metadata']['Sample No.'] = sample_no
-            
-        elif current_sample is not None:
-            # Check if this is the data header line (skip data parsing since we only need metadata)
-            if line == '"V (V)","I (A)","P (W)"':
-                continue
-            
-            # Parse metadata lines (key-value pairs)
-            if line.startswith('"') and ',' in line:
-                parts = line.split(',', 1)
-                if len(parts) == 2:
-                    key = parts[0].strip('"')
-                    value = parts[1].strip('"')
-                    # Handle missing values
-                    if value == '-------':
-                        value = None
-                    current_sample['metadata'][key] = value
-
-    # Add the final sample
-    if current_sample is not None:
-        samples.append(current_sample)
-    
-    return samples
+    return list(IVCurveReader(filename))
 
 def create_excel_summary(samples, input_file_path, output_filename="iv_curve_summary.xlsx"):
     """
     Create Excel file with four sheets: Vopen, Vmax, Imax, Pmax
     Save in the same folder as the input file
+    Returns (output path, {sheet name: DataFrame}) so callers can summarise
+    the result without reading the file back
     """
     # Get the directory of the input file
     input_dir = os.path.dirname(input_file_path)
@@ -144,30 +95,11 @@ def create_excel_summary(samples, input_file_path, output_filename="iv_curve_sum
     df_imax = pd.DataFrame(imax_data)
     df_pmax = pd.DataFrame(pmax_data)
     
-    # Create Excel writer
-    with pd.ExcelWriter(output_filepath, engine='openpyxl') as writer:
-        # Write each DataFrame to a different sheet
-        df_vopen.to_excel(writer, sheet_name='Vopen', index=False)
-        df_vmax.to_excel(writer, sheet_name='Vmax', index=False)
-        df_imax.to_excel(writer, sheet_name='Imax', index=False)
-        df_pmax.to_excel(writer, sheet_name='Pmax', index=False)
-        
-        # Auto-adjust column widths
-        for sheet_name in writer.sheets:
-            worksheet = writer.sheets[sheet_name]
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+    # Write the four sheets (column widths are computed from the DataFrames)
+    sheets = {'Vopen': df_vopen, 'Vmax': df_vmax, 'Imax': df_imax, 'Pmax': df_pmax}
+    written = write_summary(sheets, output_filepath, OUTPUT_FORMAT, EXCEL_ENGINE)
     
-    return output_filepath
+    return written, sheets
 
 # Main execution
 if __name__ == "__main__":
@@ -185,44 +117,37 @@ if __name__ == "__main__":
     
     print(f"\nReading file: {input_file_path}")
     
+    written = []
     try:
-        # Read the file first to count lines
-        with open(input_file_path, 'r', encoding='utf-8-sig') as f:
-            lines = f.readlines()
-        print(f"File has {len(lines)} lines")
-        
-        # Parse the file
+        # Parse the file (single pass; the reader counts lines as it goes)
         print("\nParsing file and extracting metadata...")
-        samples = parse_iv_curve_file(input_file_path)
+        reader = IVCurveReader(input_file_path)
+        samples = list(reader)
+        print(f"File has {reader.line_count} lines")
         
         print(f"Found {len(samples)} samples")
         
         if samples:
             # Create Excel summary in the same folder as input file
-            excel_file = create_excel_summary(samples, input_file_path, "iv_curve_summary.xlsx")
+            written, sheets = create_excel_summary(samples, input_file_path, "iv_curve_summary.xlsx")
+            excel_file = written[0]
             
             # Show summary of what was extracted
-            print(f"\n{'='*60}")
-            print("EXCEL FILE CREATED SUCCESSFULLY!")
-            print(f"{'='*60}")
-            print(f"File saved as: {excel_file}")
-            print(f"File size: {os.path.getsize(excel_file)} bytes")
+            report_written(written)
             
-            # Show sample count for each sheet
-            print(f"\nSample counts per sheet:")
-            df_vopen = pd.read_excel(excel_file, sheet_name='Vopen')
-            df_vmax = pd.read_excel(excel_file, sheet_name='Vmax')
-            df_imax = pd.read_excel(excel_file, sheet_name='Imax')
-            df_pmax = pd.read_excel(excel_file, sheet_name='Pmax')
+            # Quick structural check of the workbook (no cell data is re-read)
+            if VERIFY_WORKBOOK and excel_file.endswith('.xlsx'):
+                problems = check_workbook(excel_file, sheets)
+                print("Workbook check: " + ("OK" if not problems else "; ".join(problems)))
             
-            print(f"  Vopen sheet: {len(df_vopen)} samples")
-            print(f"  Vmax sheet: {len(df_vmax)} samples")
-            print(f"  Imax sheet: {len(df_imax)} samples")
-            print(f"  Pmax sheet: {len(df_pmax)} samples")
+            # Show sample count for each sheet (from the DataFrames just written)
+            print(f"\nSample counts per sheet:")
+            for sheet_name, df in sheets.items():
+                print(f"  {sheet_name} sheet: {len(df)} samples")
             
             # Show first few rows of each sheet
             print(f"\nFirst few rows of Vopen sheet:")
-            print(df_vopen.head().to_string(index=False))
+            print(sheets['Vopen'].head().to_string(index=False))
             
             print(f"\nExcel file structure:")
             print("Each sheet has:")
@@ -242,6 +167,7 @@ if __name__ == "__main__":
         import traceback
         traceback.print_exc()
     
-    print("\nProcessing complete! The Excel file has been created.")
+    created = "" if written and not written[0].endswith('.xlsx') else " The Excel file has been created."
+    print("\nProcessing complete!" + created)
     print("Press Enter to exit...")
     input()
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from plotout import finish_figure, plots_enabled
 
 # Read Excel file
 df = pd.read_excel(r"D:\\PhD\\similarity\\temperatures\\day 2\\day 2 average.xlsx")
@@ -44,27 +45,28 @@ panel2_channels = [f"Channel - {i}" for i in range(11, 16) if f"Channel - {i}" i
 df['Panel1_Avg'] = df[panel1_channels].mean(axis=1)  # Mean of Channels 1-5
 df['Panel2_Avg'] = df[panel2_channels].mean(axis=1)  # Mean of Channels 11-15
 
-# Plotting
-plt.figure(figsize=(14, 8))
+if plots_enabled():
+    # Plotting
+    plt.figure(figsize=(14, 8))
 
-# Panel 1 Average (Channels 1-5)
-plt.subplot(2, 1, 1)
-plt.plot(df['Timestamp'], df['Panel1_Avg'], label='Panel 1 Average', color='blue', marker='o', markersize=3, linestyle='-')
-plt.title('Panel 1 Average Temperature (Channels 1-5)')
-plt.ylabel('Temperature (°C)')
-plt.ylim(10, 80)
-plt.legend()
-plt.grid(True)
+    # Panel 1 Average (Channels 1-5)
+    plt.subplot(2, 1, 1)
+    plt.plot(df['Timestamp'], df['Panel1_Avg'], label='Panel 1 Average', color='blue', marker='o', markersize=3, linestyle='-')
+    plt.title('Panel 1 Average Temperature (Channels 1-5)')
+    plt.ylabel('Temperature (°C)')
+    plt.ylim(10, 80)
+    plt.legend()
+    plt.grid(True)
 
-# Panel 2 Average (Channels 11-15)
-plt.subplot(2, 1, 2)
-plt.plot(df['Timestamp'], df['Panel2_Avg'], label='Panel 2 Average', color='red', marker='o', markersize=3, linestyle='-')
-plt.title('Panel 2 Average Temperature (Channels 11-15)')
-plt.xlabel('Time')
-plt.ylabel('Temperature (°C)')
-plt.ylim(10, 80)
-plt.legend()
-plt.grid(True)
+    # Panel 2 Average (Channels 11-15)
+    plt.subplot(2, 1, 2)
+    plt.plot(df['Timestamp'], df['Panel2_Avg'], label='Panel 2 Average', color='red', marker='o', markersize=3, linestyle='-')
+    plt.title('Panel 2 Average Temperature (Channels 11-15)')
+    plt.xlabel('Time')
+    plt.ylabel('Temperature (°C)')
+    plt.ylim(10, 80)
+    plt.legend()
+    plt.grid(True)
 
-plt.tight_layout()
-plt.show()
+    plt.tight_layout()
+    finish_figure('tempplotaverage')